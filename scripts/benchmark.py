@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Benchmark the table_builder API endpoints and write the results as JSON.
+
+For every requested table size a fresh dynamic table is created and filled through the bulk
+endpoint, then the script measures:
+
+* row inserts per second through CreateRowAPIView (one request per row),
+* latency and peak Python memory of ListRowsAPIView for a full listing, one keyset page and
+  an NDJSON export,
+* latency of TableUpdateAPIView adding a column to the populated table.
+
+Everything runs in-process with Django's test client against a throwaway test database created
+from the configured default database (PostgreSQL by default, or SQLite with ``--sqlite``).
+
+Example:
+
+    python scripts/benchmark.py --rows 1000,100000 --width 5 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+FIELD_TYPES = ["string", "number", "boolean"]
+TABLE_NAME = "benchmark_table"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", default="1000,100000,1000000", help="comma separated table sizes")
+    parser.add_argument("--width", type=int, default=3, help="number of columns of the benchmark table")
+    parser.add_argument("--inserts", type=int, default=1000, help="single row requests per table size")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions of every read benchmark")
+    parser.add_argument(
+        "--max-full-list",
+        type=int,
+        default=100000,
+        help="skip the unpaginated listing for tables larger than this",
+    )
+    parser.add_argument("--sqlite", action="store_true", help="run against a temporary SQLite database")
+    parser.add_argument("--output", help="file to write the JSON results to, stdout by default")
+    return parser.parse_args()
+
+
+def setup_django(sqlite_dir=None):
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "table_builder.settings")
+
+    import django
+    from django.conf import settings
+
+    # The benchmark writes as fast as it can from a single client
+    settings.TABLE_BUILDER_THROTTLE_RATES = {}
+
+    if sqlite_dir:
+        settings.DATABASES["default"] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": str(Path(sqlite_dir) / "benchmark.sqlite3"),
+            "TEST": {"NAME": str(Path(sqlite_dir) / "test_benchmark.sqlite3")},
+        }
+    django.setup()
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=BASE_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(durations):
+    return {"min": min(durations), "median": statistics.median(durations), "max": max(durations)}
+
+
+def measure(func, repeat=1):
+    """
+    Run ``func`` ``repeat`` times and return the duration summary and the peak traced memory.
+    """
+    durations = []
+    peak_memory = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+        peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {"seconds": summarize(durations), "peak_memory_bytes": peak_memory}
+
+
+def check(response, expected_status=200):
+    if response.status_code != expected_status:
+        raise RuntimeError(f"Unexpected {response.status_code} response: {getattr(response, 'data', response)}")
+    return response
+
+
+def make_row(index, columns):
+    values = {"string": f"value {index}", "number": index, "boolean": index % 2 == 0}
+    return {name: values[field_type] for name, field_type in columns.items()}
+
+
+def run_size(client, reverse, row_count, args):
+    columns = {f"col_{i}": FIELD_TYPES[i % len(FIELD_TYPES)] for i in range(args.width)}
+    table = {"table_name": TABLE_NAME, "field_titles": list(columns), "field_types": list(columns.values())}
+    check(client.post(reverse("table-create"), table, format="json"), 201)
+
+    results = {"rows": row_count, "width": args.width}
+
+    # Fill the table through the bulk endpoint
+    bulk_url = reverse("rows-bulk-create", args=[TABLE_NAME])
+    start = time.perf_counter()
+    for offset in range(0, row_count, 1000):
+        rows = [make_row(index, columns) for index in range(offset, min(offset + 1000, row_count))]
+        check(client.post(bulk_url, rows, format="json"))
+    bulk_seconds = time.perf_counter() - start
+    results["bulk_insert"] = {"seconds": bulk_seconds, "rows_per_second": row_count / bulk_seconds}
+
+    # Single row inserts, one request each
+    row_url = reverse("row-create", args=[TABLE_NAME])
+    start = time.perf_counter()
+    for index in range(args.inserts):
+        check(client.post(row_url, make_row(index, columns), format="json"))
+    insert_seconds = time.perf_counter() - start
+    results["create_row"] = {"seconds": insert_seconds, "rows_per_second": args.inserts / insert_seconds}
+
+    list_url = reverse("rows-list", args=[TABLE_NAME])
+    if row_count <= args.max_full_list:
+        results["list_rows"] = measure(lambda: check(client.get(list_url)), args.repeat)
+    results["list_rows_page"] = measure(lambda: check(client.get(list_url, {"limit": 100})), args.repeat)
+    results["export_ndjson"] = measure(
+        lambda: b"".join(check(client.get(list_url, {"format": "ndjson"})).streaming_content), args.repeat
+    )
+
+    update = {"field_titles": ["added_column"], "field_types": ["string"]}
+    results["update_table"] = measure(
+        lambda: check(client.put(reverse("table-update", args=[TABLE_NAME]), update, format="json"))
+    )
+    return results
+
+
+def drop_benchmark_table():
+    from django.db import connection
+
+    from table_builder_app import registry
+    from table_builder_app.models import DynamicModel
+
+    with connection.schema_editor() as schema_editor:
+        schema_editor.execute(f"DROP TABLE IF EXISTS table_builder_app_{TABLE_NAME}")
+    DynamicModel.objects.filter(name=TABLE_NAME).delete()
+    registry.invalidate(TABLE_NAME)
+
+
+def main():
+    args = parse_args()
+    # The SQLite databases are written to a directory removed once the benchmark is done
+    with tempfile.TemporaryDirectory() as sqlite_dir:
+        setup_django(sqlite_dir if args.sqlite else None)
+
+        from django.conf import settings
+        from django.db import connection
+        from django.test.utils import setup_test_environment
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+
+        from table_builder_app import registry
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            # The snapshot loaded at startup is the one of the configured database
+            registry.clear()
+            if getattr(settings, "TABLE_BUILDER_REGISTRY_SNAPSHOT", False):
+                registry.load_snapshot()
+
+            client = APIClient()
+            results = []
+            for row_count in [int(size) for size in args.rows.split(",") if size]:
+                try:
+                    results.append(run_size(client, reverse, row_count, args))
+                finally:
+                    drop_benchmark_table()
+        finally:
+            # The schema change listener keeps a session open on the test database
+            registry.stop_listener()
+            registry.clear()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+        },
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
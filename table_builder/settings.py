@@ -75,6 +75,9 @@ WSGI_APPLICATION = "table_builder.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Connections are kept open between requests and checked before reuse. For an in-process pool
+# instead, set "ENGINE" to "table_builder_app.backends.postgresql_pool", "CONN_MAX_AGE" to 0 and
+# optionally "OPTIONS": {"pool": {"min_size": 2, "max_size": 10}}.
 DATABASES = DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -83,10 +86,57 @@ DATABASES = DATABASES = {
         "PASSWORD": "password",
         "HOST": "localhost",
         "PORT": "5432",
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
 
+# Cache
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Rendered row listings, the least recently used entries are evicted first
+    "table_builder_results": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "table_builder_results",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
+}
+
+# Alias of the cache holding row listings, None disables the result cache
+TABLE_BUILDER_RESULT_CACHE = "table_builder_results"
+
+# Listings of more rows are not cached, so every entry of the result cache stays small
+TABLE_BUILDER_RESULT_CACHE_MAX_ROWS = 1000
+
+# Seconds idempotency keys of row writes are kept, see the purge_idempotency_keys command
+TABLE_BUILDER_IDEMPOTENCY_TTL = 24 * 60 * 60
+
+# Load the metadata of all tables at startup, see table_builder_app.registry
+TABLE_BUILDER_REGISTRY_SNAPSHOT = True
+
+# Seconds without progress after which a running schema job is given to another table_builder_worker
+TABLE_BUILDER_JOB_TIMEOUT = 60 * 60
+
+# Token buckets of row writes per client and per table: tokens refilled per second and bucket
+# size, see table_builder_app.throttling. The buckets are kept in TABLE_BUILDER_THROTTLE_CACHE,
+# which has to be shared between processes in production.
+TABLE_BUILDER_THROTTLE_RATES = {
+    "client": {"rate": 100, "burst": 200},
+    "table": {"rate": 500, "burst": 1000},
+}
+TABLE_BUILDER_THROTTLE_CACHE = "default"
+
+# Seconds row writes and schema changes wait for the advisory lock of their table, see
+# table_builder_app.locks
+TABLE_BUILDER_WRITE_LOCK_TIMEOUT = 2.0
+TABLE_BUILDER_SCHEMA_LOCK_TIMEOUT = 10.0
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -15,12 +15,26 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path
-from table_builder_app import views
+from table_builder_app import async_views, views
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", views.MetricsAPIView.as_view(), name="metrics"),
     path("api/table", views.TableCreateAPIView.as_view(), name="table-create"),
+    path("api/batch", views.BatchAPIView.as_view(), name="batch"),
+    path("api/jobs/<int:job_id>", views.SchemaJobAPIView.as_view(), name="schema-job"),
     path("api/table/<str:table_name>", views.TableUpdateAPIView.as_view(), name="table-update"),
     path("api/table/<str:table_name>/row", views.CreateRowAPIView.as_view(), name="row-create"),
     path("api/table/<str:table_name>/rows", views.ListRowsAPIView.as_view(), name="rows-list"),
+    path("api/table/<str:table_name>/stats", views.TableStatsAPIView.as_view(), name="table-stats"),
+    path("api/table/<str:table_name>/partitions", views.TablePartitionsAPIView.as_view(), name="table-partitions"),
+    path(
+        "api/table/<str:table_name>/partitions/<str:partition_name>",
+        views.TablePartitionAPIView.as_view(),
+        name="table-partition",
+    ),
+    path("api/table/<str:table_name>/query", views.QueryRowsAPIView.as_view(), name="rows-query"),
+    path("api/async/table/<str:table_name>/row", async_views.AsyncCreateRowView.as_view(), name="async-row-create"),
+    path("api/async/table/<str:table_name>/rows", async_views.AsyncListRowsView.as_view(), name="async-rows-list"),
+    path("api/table/<str:table_name>/rows/bulk", views.BulkCreateRowsAPIView.as_view(), name="rows-bulk-create"),
 ]
@@ -1,6 +1,23 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db import DatabaseError, connections
 
 
 class TableBuilderAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "table_builder_app"
+
+    def ready(self):
+        from . import registry
+
+        if not getattr(settings, "TABLE_BUILDER_REGISTRY_SNAPSHOT", False):
+            return
+
+        try:
+            registry.load_snapshot()
+        except DatabaseError:
+            # The database is unavailable or not migrated yet, tables are then looked up on demand
+            registry.clear()
+        finally:
+            # Forked workers must not share the connection of the process they were forked from
+            connections.close_all()
@@ -0,0 +1,250 @@
+"""
+Async-native row endpoints for ASGI deployments.
+
+On PostgreSQL the rows are written and read through a psycopg 3 ``AsyncConnectionPool``, so a
+request waiting on the database holds no worker thread. psycopg 3 also prepares statements that
+a connection executes repeatedly on its own. Other backends go through Django's sync connection
+in a thread.
+"""
+import asyncio
+import json
+import math
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, transaction
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from . import caching, idempotency, locks, metrics, registry
+from .partitions import ensure_partitions
+from .statements import generate_insert_query
+from .throttling import get_throttle_wait
+from .views import (
+    DEFAULT_PAGE_SIZE,
+    REPLAYED_HEADERS,
+    WRITE_THROTTLES,
+    generate_select_query,
+    get_page_params,
+    get_projection,
+)
+
+DEFAULT_POOL_OPTIONS = {"min_size": 1, "max_size": 20}
+
+# Pools are bound to the event loop they were opened in
+_pools = weakref.WeakKeyDictionary()
+
+
+def get_conninfo(settings_dict):
+    from psycopg.conninfo import make_conninfo
+
+    params = {
+        "dbname": settings_dict["NAME"],
+        "user": settings_dict["USER"],
+        "password": settings_dict["PASSWORD"],
+        "host": settings_dict["HOST"],
+        "port": settings_dict["PORT"],
+    }
+    # Like Django's connections, so text is decoded whatever the database encoding
+    return make_conninfo(client_encoding="UTF8", **{key: value for key, value in params.items() if value})
+
+
+async def get_pool():
+    """
+    Return the async connection pool of the running event loop, opening it on first use.
+    """
+    from django.db.backends.postgresql.psycopg_any import get_adapters_template
+    from psycopg_pool import AsyncConnectionPool
+
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        options = {**DEFAULT_POOL_OPTIONS, **getattr(settings, "TABLE_BUILDER_ASYNC_POOL", {})}
+        connection = connections["default"]
+        # Load values like Django's own connections do, e.g. jsonb as text
+        kwargs = {"context": get_adapters_template(settings.USE_TZ, connection.timezone)}
+        pool = _pools[loop] = AsyncConnectionPool(
+            get_conninfo(connection.settings_dict), kwargs=kwargs, open=False, **options
+        )
+        await pool.open()
+    return pool
+
+
+async def close_pool():
+    """
+    Close the pool of the running event loop, e.g. on ASGI lifespan shutdown.
+    """
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
+
+
+def pool_stats():
+    return {pool.name: pool.get_stats() for pool in list(_pools.values())}
+
+
+metrics.register_collector(lambda: metrics.expose_pool_stats("async", pool_stats()))
+
+
+async def execute(query, params, fetch=False):
+    """
+    Run ``query`` on the default database and return the fetched rows when ``fetch`` is true.
+    """
+    connection = connections["default"]
+    if connection.vendor != "postgresql":
+        return await sync_to_async(_execute_sync)(query, params, fetch)
+
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        cursor = await conn.execute(query, params)
+        return await cursor.fetchall() if fetch else None
+
+
+def _execute_sync(query, params, fetch):
+    with connections["default"].cursor() as cursor:
+        cursor.execute(query, params)
+        return cursor.fetchall() if fetch else None
+
+
+async def execute_in_transaction(statements, claim=None):
+    """
+    Run the ``(query, params)`` pairs of ``statements`` in one transaction on the default database.
+    With a ``claim`` statement, e.g. claiming an idempotency key, they only run when it affects a
+    row. Returns whether the statements ran.
+    """
+    connection = connections["default"]
+    if connection.vendor != "postgresql":
+        return await sync_to_async(_execute_in_transaction_sync)(statements, claim)
+
+    pool = await get_pool()
+    async with pool.connection() as conn, conn.transaction():
+        if claim is not None and (await conn.execute(*claim)).rowcount != 1:
+            return False
+        for query, params in statements:
+            await conn.execute(query, params)
+    return True
+
+
+def _execute_in_transaction_sync(statements, claim):
+    with transaction.atomic(), connections["default"].cursor() as cursor:
+        if claim is not None:
+            cursor.execute(*claim)
+            if cursor.rowcount != 1:
+                return False
+        for query, params in statements:
+            cursor.execute(query, params)
+    return True
+
+
+def table_not_found(table_name):
+    return JsonResponse({"error": f"A table with the name '{table_name}' does not exist."}, status=404)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncCreateRowView(View):
+    async def post(self, request, table_name):
+
+        # Check if table exist
+        table = await sync_to_async(registry.get_table_schema)(table_name)
+
+        if not table:
+            return table_not_found(table_name)
+
+        # The throttles of CreateRowAPIView, whose buckets are shared with it
+        wait = await sync_to_async(get_throttle_wait)(request, self, WRITE_THROTTLES)
+        if wait is not None:
+            return JsonResponse(
+                {"error": "Request was throttled."}, status=429, headers={"Retry-After": str(math.ceil(wait))}
+            )
+
+        try:
+            idempotency_key = idempotency.get_key(request)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        try:
+            data = json.loads(request.body)
+        except ValueError as e:
+            return JsonResponse({"error": f"JSON parse error - {e}"}, status=400)
+
+        serializer = table.serializer(data=data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=400)
+
+        if table.partition:
+            await sync_to_async(ensure_partitions)(connections["default"], table, [serializer.validated_data])
+
+        columns = tuple(serializer.validated_data)
+        query = generate_insert_query(connections["default"], table.db_table, columns)
+        params = table.get_db_prep_values(connections["default"], serializer.validated_data, columns)
+        response = {"success": "Row inserted"}
+        claim = None
+        if idempotency_key:
+            request_hash = idempotency.get_request_hash(data)
+            claim = idempotency.generate_claim_query(
+                connections["default"], table_name, idempotency_key, response, request_hash
+            )
+
+        statements = [(query, params), caching.generate_bump_query(connections["default"], table_name, row_delta=1)]
+        if connections["default"].vendor == "postgresql":
+            statements.insert(0, locks.generate_lock_query(connections["default"], table_name))
+
+        try:
+            inserted = await execute_in_transaction(statements, claim)
+        except Exception as e:
+            if locks.is_lock_timeout(e):
+                return JsonResponse(
+                    {"error": f"The table '{table_name}' is busy with a schema change, retry later."},
+                    status=503,
+                    headers={"Retry-After": str(locks.RETRY_AFTER)},
+                )
+            raise
+        if not inserted:
+            try:
+                stored = await sync_to_async(idempotency.get_response)(table_name, idempotency_key, request_hash)
+            except ValueError as e:
+                return JsonResponse({"error": str(e)}, status=422)
+            return JsonResponse(stored, headers=REPLAYED_HEADERS)
+
+        return JsonResponse(response)
+
+
+class AsyncListRowsView(View):
+    async def get(self, request, table_name):
+
+        # Check if table exist
+        table = await sync_to_async(registry.get_table_schema)(table_name)
+
+        if not table:
+            return table_not_found(table_name)
+
+        try:
+            fields = get_projection(request.GET.get("fields"), table.columns)
+            after, limit = get_page_params(request.GET)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        paginated = after is not None or limit is not None
+        if paginated and limit is None:
+            limit = DEFAULT_PAGE_SIZE
+
+        # Fetch one extra row to find out whether there is a next page
+        query, params = generate_select_query(
+            connections["default"], table.db_table, fields, after=after, limit=limit + 1 if paginated else None
+        )
+        rows = await execute(query, params, fetch=True)
+
+        next_after = None
+        if paginated and len(rows) > limit:
+            rows = rows[:limit]
+            next_after = rows[-1][0]
+
+        encode_row = table.get_row_encoder(fields)
+        results = [encode_row(row) for row in rows]
+
+        if paginated:
+            return JsonResponse({"results": results, "next": next_after})
+        return JsonResponse(results, safe=False)
@@ -0,0 +1,85 @@
+"""
+PostgreSQL backend that borrows its connections from an in-process psycopg 3 pool.
+
+Use it by setting ``ENGINE`` to ``"table_builder_app.backends.postgresql_pool"`` and, optionally,
+``OPTIONS["pool"]`` to keyword arguments of ``psycopg_pool.ConnectionPool`` (``min_size``,
+``max_size``, ``timeout``, ``max_idle``...) plus ``check``, which pings a borrowed connection before
+handing it to Django. Keep ``CONN_MAX_AGE`` at 0: closing the Django connection at the end of a
+request returns it to the pool instead of closing it.
+"""
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg import Error as DatabaseError
+from psycopg import IsolationLevel
+from psycopg_pool import ConnectionPool
+
+from table_builder_app import metrics
+
+DEFAULT_POOL_OPTIONS = {"min_size": 2, "max_size": 10, "check": True}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+        return conn_params
+
+    def get_pool_options(self):
+        return {**DEFAULT_POOL_OPTIONS, **self.settings_dict["OPTIONS"].get("pool", {})}
+
+    def get_pool(self, conn_params):
+        options = self.get_pool_options()
+        options.pop("check")
+        name = f"{self.alias}:{conn_params['dbname']}"
+
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                pool = _pools[name] = ConnectionPool(kwargs=conn_params, name=name, **options)
+        return pool
+
+    def get_new_connection(self, conn_params):
+        self.isolation_level = IsolationLevel(
+            self.settings_dict["OPTIONS"].get("isolation_level", IsolationLevel.READ_COMMITTED)
+        )
+        self.pool = self.get_pool(conn_params)
+        connection = self.pool.getconn()
+
+        if self.get_pool_options()["check"]:
+            try:
+                connection.execute("SELECT 1")
+                connection.rollback()
+            except DatabaseError:
+                # The pool discards broken connections that are given back
+                self.pool.putconn(connection)
+                connection = self.pool.getconn()
+
+        connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
+
+
+def close_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+def pool_stats():
+    """
+    Return ``{pool name: psycopg_pool statistics}`` for every open pool.
+    """
+    with _pools_lock:
+        return {name: pool.get_stats() for name, pool in _pools.items()}
+
+
+metrics.register_collector(lambda: metrics.expose_pool_stats("sync", pool_stats()))
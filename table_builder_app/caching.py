@@ -0,0 +1,81 @@
+"""
+Change tracking of dynamic tables for HTTP caching of row listings.
+
+Every write made through the views bumps ``DynamicModel.data_version`` and
+``data_modified_at``. Listings derive their ``ETag`` and ``Last-Modified`` validators from them,
+and the optional result cache (``TABLE_BUILDER_RESULT_CACHE``, the alias of a Django cache) keys
+rendered results by table, versions and query parameters, so stale entries are never read
+again and age out of the cache on their own. Only results of at most
+``TABLE_BUILDER_RESULT_CACHE_MAX_ROWS`` rows are cached, e.g. pages, so the size of the cache is
+bounded by its number of entries.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.db.models.functions import Now
+
+from .models import DynamicModel
+
+DEFAULT_RESULT_CACHE_MAX_ROWS = 1000
+
+
+def bump_data_version(table_name, row_delta=0):
+    """
+    Record that the rows of table ``table_name`` changed and that ``row_delta`` rows were added
+    (or removed, when negative). Call it in the transaction of the write so the row count stays exact.
+    """
+    DynamicModel.objects.filter(name=table_name).update(
+        data_version=F("data_version") + 1, data_modified_at=Now(), row_count=F("row_count") + row_delta
+    )
+
+
+def generate_bump_query(connection, table_name, row_delta=0):
+    """
+    ``bump_data_version`` as raw SQL, for connections outside of Django.
+    """
+    quote_name = connection.ops.quote_name
+    query = (
+        f"UPDATE {quote_name(DynamicModel._meta.db_table)} SET data_version = data_version + 1, "
+        f"data_modified_at = CURRENT_TIMESTAMP, row_count = row_count + %s WHERE name = %s"
+    )
+    return query, [row_delta, table_name]
+
+
+def get_data_version(table_name):
+    """
+    Return the ``(data_version, data_modified_at)`` pair of table ``table_name``, or None when
+    the table does not exist.
+    """
+    return DynamicModel.objects.filter(name=table_name).values_list("data_version", "data_modified_at").first()
+
+
+def get_variant_key(request):
+    """
+    Digest of everything besides the table data that the representation of ``request`` depends on.
+    """
+    query = sorted(request.query_params.lists())
+    variant = f"{query}:{request.accepted_renderer.format}:{request.accepted_media_type}"
+    return hashlib.md5(variant.encode(), usedforsecurity=False).hexdigest()[:16]
+
+
+def get_etag(table, data_version, variant_key):
+    return f'"{table.id}.{table.version}.{data_version}.{variant_key}"'
+
+
+def get_result_cache():
+    alias = getattr(settings, "TABLE_BUILDER_RESULT_CACHE", None)
+    return caches[alias] if alias else None
+
+
+def is_cacheable(data):
+    """
+    Return whether the listing ``data``, a list of rows or a page, is small enough to be cached.
+    """
+    rows = data["results"] if isinstance(data, dict) else data
+    return len(rows) <= getattr(settings, "TABLE_BUILDER_RESULT_CACHE_MAX_ROWS", DEFAULT_RESULT_CACHE_MAX_ROWS)
+
+
+def get_cache_key(table, data_version, variant_key):
+    return f"table_builder:rows:{table.name}:{table.id}:{table.version}:{data_version}:{variant_key}"
@@ -0,0 +1,105 @@
+"""
+Idempotency keys of row writes.
+
+Clients send an ``Idempotency-Key`` header with inserts they may retry. The key is claimed with
+``INSERT ... ON CONFLICT DO NOTHING`` on the unique ``(table_name, key)`` index of
+``IdempotencyKey``, in the same transaction as the write: a first request claims it and writes,
+a retry finds it taken and gets the stored response without writing. A retry arriving while
+the first request is still running waits on the index entry until that request commits or rolls
+back. Keys are stored with a hash of the request that claimed them, a key reused for a different
+request is answered with 422 instead of the response of the first one. Keys older than
+``TABLE_BUILDER_IDEMPOTENCY_TTL`` seconds are removed by the ``purge_idempotency_keys``
+management command.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+DEFAULT_TTL = 24 * 60 * 60
+
+_fields = {field.name: field for field in IdempotencyKey._meta.local_fields}
+
+
+def get_key(request):
+    """
+    Return the idempotency key of ``request`` or None. Raises ValueError for an invalid key.
+    """
+    key = request.headers.get(HEADER)
+    if key is None:
+        return None
+    if not key or len(key) > _fields["key"].max_length - 16:
+        raise ValueError(f"The {HEADER} header must be between 1 and {_fields['key'].max_length - 16} characters.")
+    return key
+
+
+def get_request_hash(data, *options):
+    """
+    Return the hash identifying a request by its parsed body ``data`` and the ``options`` changing
+    what a key stands for, e.g. the chunk size of bulk inserts.
+    """
+    encoded = json.dumps([data, *options], sort_keys=True, separators=(",", ":"), cls=DjangoJSONEncoder)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def generate_claim_query(connection, table_name, key, response, request_hash):
+    """
+    Return the ``(query, params)`` claiming ``key``, it inserts one row when the key is new.
+    """
+    quote_name = connection.ops.quote_name
+    values = {
+        "table_name": table_name,
+        "key": key,
+        "created_at": timezone.now(),
+        "response": response,
+        "request_hash": request_hash,
+    }
+    columns = ", ".join(quote_name(column) for column in values)
+    params = [_fields[column].get_db_prep_save(value, connection) for column, value in values.items()]
+
+    query = (
+        f"INSERT INTO {quote_name(IdempotencyKey._meta.db_table)} ({columns}) "
+        f"VALUES ({', '.join(['%s'] * len(values))}) "
+        f"ON CONFLICT ({quote_name('table_name')}, {quote_name('key')}) DO NOTHING"
+    )
+    return query, params
+
+
+def claim_key(connection, table_name, key, response, request_hash):
+    """
+    Claim ``key`` for a write to ``table_name`` answered with ``response``. Returns False when the
+    key was already used. Call it in the transaction of the write.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(*generate_claim_query(connection, table_name, key, response, request_hash))
+        return cursor.rowcount == 1
+
+
+def get_response(table_name, key, request_hash):
+    """
+    Return the response stored for ``key``. Raises ValueError when the key was claimed by another
+    request than the one of ``request_hash``.
+    """
+    stored = IdempotencyKey.objects.filter(table_name=table_name, key=key).values("response", "request_hash").first()
+    if stored is None:
+        return None
+    # Keys claimed before requests were hashed have no hash
+    if stored["request_hash"] and stored["request_hash"] != request_hash:
+        raise ValueError(f"The {HEADER} was already used for a different request.")
+    return stored["response"]
+
+
+def purge_expired_keys(ttl=None):
+    """
+    Delete the keys older than ``ttl`` seconds and return how many were deleted.
+    """
+    if ttl is None:
+        ttl = getattr(settings, "TABLE_BUILDER_IDEMPOTENCY_TTL", DEFAULT_TTL)
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=timezone.now() - timedelta(seconds=ttl)).delete()
+    return deleted
@@ -0,0 +1,111 @@
+"""
+Queue of schema changes processed by the ``table_builder_worker`` management command.
+
+Jobs are ``SchemaJob`` rows. A worker claims the oldest pending job with
+``SELECT ... FOR UPDATE SKIP LOCKED``, so workers in other threads or processes never take the
+same job, marks it running and commits, then runs the schema change outside of the claim's
+transaction. The jobs of one table run in order, never two at once. While a job runs, its worker
+refreshes ``started_at`` after every batch of a backfill and every index build. Jobs left running
+by a worker that stopped, without a refresh for ``TABLE_BUILDER_JOB_TIMEOUT`` seconds, are
+requeued up to ``MAX_ATTEMPTS`` runs; the schema changes are safe to run again after being
+interrupted.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import DynamicModel, SchemaJob
+from .schema import SchemaChangeError, create_table, update_table
+
+DEFAULT_JOB_TIMEOUT = 60 * 60
+MAX_ATTEMPTS = 3
+
+
+def enqueue_job(kind, table_name, payload):
+    return SchemaJob.objects.create(kind=kind, table_name=table_name, payload=payload)
+
+
+def claim_job():
+    """
+    Mark the oldest pending job running and return it, or None when no job can run. The jobs of a
+    table run one after the other: only the oldest pending job of a table without a running job
+    is claimed.
+    """
+    # A job claimed by a concurrent worker is still pending until that worker commits, so the jobs
+    # queued after it wait for it either way
+    earlier = SchemaJob.objects.filter(table_name=OuterRef("table_name"), status="pending", id__lt=OuterRef("id"))
+    with transaction.atomic():
+        job = (
+            SchemaJob.objects.select_for_update(skip_locked=True)
+            .filter(status="pending")
+            .exclude(Exists(earlier))
+            .exclude(table_name__in=SchemaJob.objects.filter(status="running").values("table_name"))
+            .order_by("id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = "running"
+        job.attempts += 1
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "attempts", "started_at"])
+    return job
+
+
+def heartbeat(job):
+    """
+    Show that ``job`` is still running, so that it is not requeued while its worker makes progress.
+    """
+    job.started_at = timezone.now()
+    SchemaJob.objects.filter(pk=job.pk, status="running").update(started_at=job.started_at)
+
+
+def run_job(job):
+    """
+    Run the schema change of the claimed ``job`` and record its outcome.
+    """
+    connection = connections["default"]
+    try:
+        if job.kind == "create":
+            create_table(connection, job.payload)
+            job.result = {"success": "Dynamic model created and applied"}
+        else:
+            table = DynamicModel.objects.filter(name=job.table_name).first()
+            if table is None:
+                raise SchemaChangeError(
+                    "problem with altering dynamic model", f"A table with the name '{job.table_name}' does not exist."
+                )
+            update_table(connection, table, job.payload, online=True, heartbeat=lambda: heartbeat(job))
+            job.result = {"success": "Dynamic model updated"}
+        job.status = "succeeded"
+    except SchemaChangeError as e:
+        job.status = "failed"
+        job.result = {"error": str(e.error), "description": e.description}
+    except Exception as e:
+        job.status = "failed"
+        job.result = {"error": str(e), "description": "problem with running schema job"}
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "result", "finished_at"])
+    return job
+
+
+def requeue_stale_jobs(timeout=None):
+    """
+    Requeue the jobs running without a heartbeat for longer than ``timeout`` seconds, or fail them
+    after ``MAX_ATTEMPTS`` runs. Returns the number of jobs changed.
+    """
+    if timeout is None:
+        timeout = getattr(settings, "TABLE_BUILDER_JOB_TIMEOUT", DEFAULT_JOB_TIMEOUT)
+    stale = SchemaJob.objects.filter(status="running", started_at__lt=timezone.now() - timedelta(seconds=timeout))
+
+    requeued = stale.filter(attempts__lt=MAX_ATTEMPTS).update(status="pending")
+    failed = stale.update(
+        status="failed",
+        finished_at=timezone.now(),
+        result={"error": "The job did not finish in time.", "description": "problem with running schema job"},
+    )
+    return requeued + failed
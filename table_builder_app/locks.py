@@ -0,0 +1,65 @@
+"""
+Per-table advisory locks between schema changes and row writes (PostgreSQL only).
+
+Schema changes take the exclusive transaction-level advisory lock of their table in every
+transaction running DDL on it, row writes take it shared in their write transaction. Both wait
+at most ``TABLE_BUILDER_SCHEMA_LOCK_TIMEOUT`` or ``TABLE_BUILDER_WRITE_LOCK_TIMEOUT`` seconds: the
+timeout is set as the transaction-local ``lock_timeout``, so it also bounds the waits on the
+table and row locks taken later in the transaction. Writers that time out are answered with
+503 and ``Retry-After`` instead of queueing behind a schema change and everything queued after it.
+"""
+from django.conf import settings
+
+# First key of the two-key advisory locks, the second one is the hash of the table name
+LOCK_NAMESPACE = 0x7462
+
+DEFAULT_WRITE_LOCK_TIMEOUT = 2.0
+DEFAULT_SCHEMA_LOCK_TIMEOUT = 10.0
+
+# Seconds after which clients should retry a write that timed out
+RETRY_AFTER = 1
+
+# SQLSTATE of lock_not_available
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+def generate_lock_query(connection, table_name, exclusive=False):
+    """
+    Return the ``(query, params)`` taking the advisory lock of ``table_name`` for the rest of the
+    current transaction, exclusive for schema changes and shared for writes.
+    """
+    if exclusive:
+        function = "pg_advisory_xact_lock"
+        timeout = getattr(settings, "TABLE_BUILDER_SCHEMA_LOCK_TIMEOUT", DEFAULT_SCHEMA_LOCK_TIMEOUT)
+    else:
+        function = "pg_advisory_xact_lock_shared"
+        timeout = getattr(settings, "TABLE_BUILDER_WRITE_LOCK_TIMEOUT", DEFAULT_WRITE_LOCK_TIMEOUT)
+
+    # The subquery sets the timeout before the lock is requested
+    query = (
+        f"SELECT {function}(%s, hashtext(%s)) "
+        f"FROM (SELECT set_config('lock_timeout', %s, true)) AS lock_timeout"
+    )
+    return query, [LOCK_NAMESPACE, table_name, str(int(timeout * 1000))]
+
+
+def lock_table(connection, table_name, exclusive=False):
+    """
+    Take the advisory lock of ``table_name`` in the current transaction. A no-op besides PostgreSQL.
+    """
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(*generate_lock_query(connection, table_name, exclusive))
+
+
+def is_lock_timeout(error):
+    """
+    Return whether ``error``, or the error it was raised from, is a lock wait timing out.
+    """
+    while error is not None:
+        # psycopg 3 exposes the SQLSTATE as ``sqlstate``, psycopg2 as ``pgcode``
+        if LOCK_NOT_AVAILABLE in (getattr(error, "sqlstate", None), getattr(error, "pgcode", None)):
+            return True
+        error = error.__cause__
+    return False
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from table_builder_app.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = "Delete idempotency keys older than TABLE_BUILDER_IDEMPOTENCY_TTL seconds."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ttl", type=int, help="age in seconds after which keys are deleted")
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_keys(options["ttl"])
+        self.stdout.write(f"Deleted {deleted} idempotency keys.")
@@ -0,0 +1,50 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from table_builder_app.jobs import claim_job, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "Run the queued schema changes of dynamic tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=1, help="number of jobs run at the same time")
+        parser.add_argument("--once", action="store_true", help="exit once no job is pending")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="seconds between checks for new jobs")
+
+    def handle(self, *args, **options):
+        if options["threads"] <= 1:
+            self.work(options["once"], options["poll_interval"])
+            return
+
+        threads = [
+            threading.Thread(target=self.work_in_thread, args=(options["once"], options["poll_interval"]), daemon=True)
+            for _ in range(options["threads"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def work_in_thread(self, once, poll_interval):
+        try:
+            self.work(once, poll_interval)
+        finally:
+            # Every thread has its own database connections
+            connections.close_all()
+
+    def work(self, once, poll_interval):
+        while True:
+            requeue_stale_jobs()
+            job = claim_job()
+            if job is None:
+                if once:
+                    return
+                time.sleep(poll_interval)
+                continue
+
+            run_job(job)
+            self.stdout.write(f"Job {job.id} ({job.kind} {job.table_name}) {job.status}.")
@@ -0,0 +1,210 @@
+"""
+In-process request metrics exposed in the Prometheus text format.
+
+``MetricsMiddleware`` (see ``table_builder_app.middleware``) starts a per-request recording, views
+add to it through ``phase`` and ``record_rows``, and at the end of the request the recording is
+folded into process-wide histograms and counters labelled with the endpoint (URL name). When
+the middleware is not installed the hooks do nothing and the metrics are not exposed.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+MIDDLEWARE = "table_builder_app.middleware.MetricsMiddleware"
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250)
+
+_current = contextvars.ContextVar("table_builder_request_metrics", default=None)
+
+
+class RequestRecording:
+    """
+    Measurements collected while serving one request.
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.rows = {}
+        self.query_count = 0
+        self.query_durations = []
+
+    def add_phase(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_query(self, seconds):
+        self.query_count += 1
+        self.query_durations.append(seconds)
+
+
+class Histogram:
+    def __init__(self, name, documentation, labels, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self._values = {}
+
+    def observe(self, value, *label_values):
+        series = self._values.get(label_values)
+        if series is None:
+            series = self._values[label_values] = [[0] * len(self.buckets), 0.0, 0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for label_values, (bucket_counts, total, count) in sorted(self._values.items()):
+            labels = _format_labels(self.labels, label_values)
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                bucket_labels = _format_labels(self.labels, label_values, le=bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {bucket_count}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, le='+Inf')} {count}")
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, documentation, labels):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values = {}
+
+    def inc(self, amount, *label_values):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+def _format_labels(names, values, le=None):
+    pairs = list(zip(names, values))
+    if le is not None:
+        pairs.append(("le", le))
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+_lock = threading.Lock()
+
+REQUESTS = Counter("table_builder_requests_total", "Requests served.", ("endpoint", "method", "status"))
+REQUEST_SECONDS = Histogram(
+    "table_builder_request_duration_seconds", "Time spent serving requests.", ("endpoint", "method")
+)
+PHASE_SECONDS = Histogram(
+    "table_builder_phase_duration_seconds", "Time spent in each phase of a request.", ("endpoint", "phase")
+)
+QUERIES = Histogram(
+    "table_builder_sql_queries_per_request", "SQL queries executed per request.", ("endpoint",), COUNT_BUCKETS
+)
+QUERY_SECONDS = Histogram("table_builder_sql_query_duration_seconds", "Duration of SQL queries.", ("endpoint",))
+ROWS = Counter("table_builder_rows_total", "Rows read from or written to dynamic tables.", ("endpoint", "direction"))
+
+METRICS = [REQUESTS, REQUEST_SECONDS, PHASE_SECONDS, QUERIES, QUERY_SECONDS, ROWS]
+
+# Callables returning extra exposition lines computed at scrape time
+_collectors = []
+
+
+def register_collector(collector):
+    _collectors.append(collector)
+
+
+def expose_pool_stats(kind, stats):
+    """
+    Format ``{pool name: psycopg_pool statistics}`` as one gauge per statistic.
+    """
+    lines = []
+    for pool_name, pool_stats in sorted(stats.items()):
+        for stat, value in sorted(pool_stats.items()):
+            labels = _format_labels(("kind", "pool"), (kind, pool_name))
+            lines.append(f"table_builder_db_pool_{stat}{labels} {value}")
+    return lines
+
+
+def start_request():
+    recording = RequestRecording()
+    return recording, _current.set(recording)
+
+
+def finish_request(token, recording, endpoint, method, status_code, seconds):
+    _current.reset(token)
+
+    with _lock:
+        REQUESTS.inc(1, endpoint, method, status_code)
+        REQUEST_SECONDS.observe(seconds, endpoint, method)
+        for phase_name, phase_seconds in recording.phases.items():
+            PHASE_SECONDS.observe(phase_seconds, endpoint, phase_name)
+        QUERIES.observe(recording.query_count, endpoint)
+        for query_seconds in recording.query_durations:
+            QUERY_SECONDS.observe(query_seconds, endpoint)
+        for direction, count in recording.rows.items():
+            ROWS.inc(count, endpoint, direction)
+
+
+def current_recording():
+    return _current.get()
+
+
+@contextmanager
+def phase(name):
+    """
+    Time the enclosed block as phase ``name`` of the current request.
+    """
+    recording = _current.get()
+    if recording is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recording.add_phase(name, time.perf_counter() - start)
+
+
+def record_rows(direction, count):
+    """
+    Count ``count`` rows read (``direction="read"``) or written (``"written"``) by the current request.
+    """
+    recording = _current.get()
+    if recording is not None:
+        recording.rows[direction] = recording.rows.get(direction, 0) + count
+
+
+def query_wrapper(execute, sql, params, many, context):
+    """
+    ``connection.execute_wrapper`` hook counting and timing the SQL of the current request.
+    """
+    recording = _current.get()
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if recording is not None:
+            recording.add_query(time.perf_counter() - start)
+
+
+def is_enabled():
+    return MIDDLEWARE in settings.MIDDLEWARE
+
+
+def render():
+    with _lock:
+        lines = [line for metric in METRICS for line in metric.expose()]
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,49 @@
+import time
+
+from django.db import connections
+
+from . import metrics
+
+
+class MetricsMiddleware:
+    """
+    Record latency, SQL queries and rows per endpoint for the ``/metrics`` endpoint.
+
+    Opt in by adding ``"table_builder_app.middleware.MetricsMiddleware"`` to ``MIDDLEWARE``, as
+    early as possible so the measured latency covers the other middleware too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recording, token = metrics.start_request()
+        start = time.perf_counter()
+
+        response = None
+        try:
+            with connections["default"].execute_wrapper(metrics.query_wrapper):
+                response = self.get_response(request)
+        finally:
+            status_code = response.status_code if response is not None else 500
+            metrics.finish_request(
+                token, recording, self.get_endpoint(request), request.method, status_code, time.perf_counter() - start
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook, time it as the render phase
+        recording = metrics.current_recording()
+        if recording is not None:
+            start = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: recording.add_phase("render", time.perf_counter() - start)
+            )
+        return response
+
+    @staticmethod
+    def get_endpoint(request):
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match is None or not resolver_match.url_name:
+            return "unmatched"
+        return resolver_match.url_name
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.3 on 2026-10-17 22:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("table_builder_app", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dynamicmodel",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
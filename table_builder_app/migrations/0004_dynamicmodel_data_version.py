@@ -0,0 +1,24 @@
+# Generated by Django 4.2.3 on 2026-10-17 23:08
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("table_builder_app", "0003_dynamicmodel_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dynamicmodel",
+            name="data_modified_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name="dynamicmodel",
+            name="data_version",
+            field=models.PositiveBigIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.3 on 2026-10-17 23:10
+
+from django.db import migrations, models
+
+
+def count_rows(apps, schema_editor):
+    DynamicModel = apps.get_model("table_builder_app", "DynamicModel")
+    connection = schema_editor.connection
+    existing_tables = set(connection.introspection.table_names())
+
+    for table in DynamicModel.objects.all():
+        # Django lowercases the table names of models
+        db_table = f"table_builder_app_{table.name.lower()}"
+        if db_table not in existing_tables:
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(db_table)}")
+            table.row_count = cursor.fetchone()[0]
+        table.save(update_fields=["row_count"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("table_builder_app", "0004_dynamicmodel_data_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dynamicmodel",
+            name="row_count",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(count_rows, migrations.RunPython.noop),
+    ]
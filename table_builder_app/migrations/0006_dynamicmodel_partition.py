@@ -0,0 +1,18 @@
+# Generated by Django 4.2.3 on 2026-10-17 23:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("table_builder_app", "0005_dynamicmodel_row_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dynamicmodel",
+            name="partition",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.3 on 2026-10-17 23:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("table_builder_app", "0008_schemajob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dynamicmodel",
+            name="search",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.3 on 2026-10-17 23:25
+
+from django.db import migrations
+
+# Notify the registries of all processes, see table_builder_app.registry. Row counter and data
+# version updates do not change the schema and are not notified.
+CREATE_TRIGGERS = """
+CREATE OR REPLACE FUNCTION table_builder_notify_schema_change() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        PERFORM pg_notify('table_builder_schema', OLD.name);
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        PERFORM pg_notify('table_builder_schema', NEW.name);
+    END IF;
+    RETURN NULL;
+END $$;
+
+CREATE TRIGGER table_builder_dynamicmodel_notify_insert_delete
+AFTER INSERT OR DELETE ON table_builder_app_dynamicmodel
+FOR EACH ROW EXECUTE FUNCTION table_builder_notify_schema_change();
+
+CREATE TRIGGER table_builder_dynamicmodel_notify_update
+AFTER UPDATE ON table_builder_app_dynamicmodel
+FOR EACH ROW WHEN (OLD.version IS DISTINCT FROM NEW.version OR OLD.name IS DISTINCT FROM NEW.name)
+EXECUTE FUNCTION table_builder_notify_schema_change();
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER IF EXISTS table_builder_dynamicmodel_notify_update ON table_builder_app_dynamicmodel;
+DROP TRIGGER IF EXISTS table_builder_dynamicmodel_notify_insert_delete ON table_builder_app_dynamicmodel;
+DROP FUNCTION IF EXISTS table_builder_notify_schema_change();
+"""
+
+
+def create_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_TRIGGERS)
+
+
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_TRIGGERS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("table_builder_app", "0009_dynamicmodel_search"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.3 on 2026-10-18 00:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("table_builder_app", "0010_dynamicmodel_notify"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="idempotencykey",
+            name="request_hash",
+            field=models.CharField(default="", max_length=64),
+        ),
+    ]
@@ -1,6 +1,105 @@
+from django.apps import apps
 from django.db import models
+from django.utils import timezone
+
+
+DECIMAL_MAX_DIGITS = 38
+DECIMAL_PLACES = 10
 
 
 class DynamicModel(models.Model):
     name = models.CharField(max_length=255)
     columns = models.JSONField()
+    # Bumped on every schema change so cached model and serializer classes can be invalidated
+    version = models.PositiveIntegerField(default=1)
+    # Secondary indexes as {"name": ..., "columns": [...], "unique": bool}
+    indexes = models.JSONField(default=list)
+    # Bumped on every write to the table's rows or schema, for HTTP validators and the result cache
+    data_version = models.PositiveBigIntegerField(default=1)
+    data_modified_at = models.DateTimeField(default=timezone.now)
+    # Exact number of rows, maintained in the same transaction as the writes made through the views.
+    # Rows written around the views make it drift, so it is not constrained to be positive.
+    row_count = models.BigIntegerField(default=0)
+    # Range partitioning as {"column": ..., "interval": ...}, see table_builder_app.partitions
+    partition = models.JSONField(null=True, blank=True)
+    # Full-text search as {"columns": [...], "config": ...}, see table_builder_app.search
+    search = models.JSONField(null=True, blank=True)
+
+
+class IdempotencyKey(models.Model):
+    """
+    Idempotency key of a row write, claimed in the transaction of the write. ``response`` is the
+    body returned for the write, so retries get the same answer, ``request_hash`` identifies the
+    request that claimed the key.
+    """
+
+    table_name = models.CharField(max_length=255)
+    key = models.CharField(max_length=255)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    response = models.JSONField()
+    request_hash = models.CharField(max_length=64, default="")
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["table_name", "key"], name="unique_idempotency_key")]
+
+
+class SchemaJob(models.Model):
+    """
+    Schema change of a dynamic table queued for the ``table_builder_worker`` command. ``payload``
+    is the validated data of the table serializer, ``result`` the body the endpoint would have
+    answered the change with.
+    """
+
+    KINDS = [("create", "create"), ("update", "update")]
+    STATUSES = [("pending", "pending"), ("running", "running"), ("succeeded", "succeeded"), ("failed", "failed")]
+
+    kind = models.CharField(max_length=16, choices=KINDS)
+    table_name = models.CharField(max_length=255)
+    payload = models.JSONField()
+    status = models.CharField(max_length=16, choices=STATUSES, default="pending")
+    result = models.JSONField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        # Workers only ever scan the pending jobs
+        indexes = [models.Index(fields=["id"], condition=models.Q(status="pending"), name="schema_job_pending_idx")]
+
+
+class DynamicModelMetaclass(models.base.ModelBase):
+    def __new__(cls, name, bases, attrs):
+        attrs["__module__"] = __name__
+        return super().__new__(cls, name, bases, attrs)
+
+
+# Model field of every column type. Columns are nullable so they can be added to populated
+# tables without a rewrite.
+FIELD_TYPES = {
+    "string": lambda: models.CharField(max_length=255, null=True),
+    "text": lambda: models.TextField(null=True),
+    "number": lambda: models.IntegerField(null=True),
+    "bigint": lambda: models.BigIntegerField(null=True),
+    "double": lambda: models.FloatField(null=True),
+    "decimal": lambda: models.DecimalField(max_digits=DECIMAL_MAX_DIGITS, decimal_places=DECIMAL_PLACES, null=True),
+    "boolean": lambda: models.BooleanField(null=True),
+    "date": lambda: models.DateField(null=True),
+    "timestamp": lambda: models.DateTimeField(null=True),
+    "json": lambda: models.JSONField(null=True),
+}
+
+
+def get_field_by_type(field_type):
+    try:
+        return FIELD_TYPES[field_type]()
+    except KeyError:
+        raise ValueError(f"Unsupported field type: {field_type}")
+
+
+def create_dynamic_model(model_name, columns):
+    # Forget a previous class for the same table, the app registry would otherwise warn and keep it alive
+    apps.all_models[DynamicModel._meta.app_label].pop(model_name.lower(), None)
+
+    model_fields = {column: get_field_by_type(field_type) for column, field_type in columns.items()}
+    return DynamicModelMetaclass(model_name, (models.Model,), model_fields)
@@ -0,0 +1,149 @@
+"""
+Declaratively partitioned dynamic tables (PostgreSQL only).
+
+A table created with a ``partition`` spec is range partitioned either on ``id``, in blocks of
+``interval`` ids, or on a timestamp column, by ``"day"`` or ``"month"`` (UTC). Partitions are
+created as data arrives: writers call ``ensure_partitions`` before inserting, which creates the
+partitions the new rows fall into, keeping one block ahead of the id sequence for ``id``
+partitioning. Old partitions can then be detached or dropped without touching the other rows,
+and queries filtering on the partition column only scan the matching partitions. The bounds of
+the existing partitions are cached with the table's schema, so removing a partition bumps the
+table's version to make every process load them again.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+
+from django.db.backends.utils import truncate_name
+from django.utils.dateparse import parse_datetime
+
+TIMESTAMP_INTERVALS = ("day", "month")
+
+_BOUND_RE = re.compile(r"FROM \('?([^')]*)'?\) TO \('?([^')]*)'?\)")
+
+
+def generate_create_table_query(connection, model_class, partition):
+    """
+    Return the ``CREATE TABLE ... PARTITION BY RANGE`` statement of ``model_class``. A primary key
+    of a partitioned table has to include the partition column, and the column cannot be null.
+    """
+    quote_name = connection.ops.quote_name
+    column = partition["column"]
+
+    definitions = []
+    for field in model_class._meta.local_fields:
+        if field.primary_key:
+            identity = "GENERATED BY DEFAULT AS IDENTITY"
+            definitions.append(f"{quote_name(field.column)} {field.db_type(connection)} {identity}")
+        else:
+            null = "NOT NULL" if field.column == column else "NULL"
+            definitions.append(f"{quote_name(field.column)} {field.db_type(connection)} {null}")
+
+    key = ["id"] if column == "id" else ["id", column]
+    definitions.append(f"PRIMARY KEY ({', '.join(quote_name(name) for name in key)})")
+
+    return (
+        f"CREATE TABLE {quote_name(model_class._meta.db_table)} ({', '.join(definitions)}) "
+        f"PARTITION BY RANGE ({quote_name(column)})"
+    )
+
+
+def get_bounds(partition, value):
+    """
+    Return the ``(start, end)`` range of the partition holding ``value`` of the partition column.
+    """
+    interval = partition["interval"]
+    if partition["column"] == "id":
+        start = value // interval * interval
+        return start, start + interval
+
+    value = value.astimezone(timezone.utc)
+    if interval == "day":
+        start = datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+        return start, start + timedelta(days=1)
+    start = datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+    return start, datetime(value.year + value.month // 12, value.month % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _format_bound(bound):
+    return str(bound) if isinstance(bound, int) else f"'{bound.isoformat()}'"
+
+
+def _parse_bound(text):
+    return int(text) if re.fullmatch(r"-?\d+", text) else parse_datetime(text)
+
+
+def get_partition_name(db_table, partition, start):
+    if partition["column"] == "id":
+        suffix = str(start // partition["interval"])
+    else:
+        suffix = start.strftime("%Y%m%d" if partition["interval"] == "day" else "%Y%m")
+    return truncate_name(f"{db_table}_p{suffix}", 63)
+
+
+def create_partition(connection, cursor, schema, start, end):
+    quote_name = connection.ops.quote_name
+    name = get_partition_name(schema.db_table, schema.partition, start)
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {quote_name(name)} PARTITION OF {quote_name(schema.db_table)} "
+        f"FOR VALUES FROM ({_format_bound(start)}) TO ({_format_bound(end)})"
+    )
+    schema.partition_bounds.add(start)
+
+
+def list_partitions(cursor, db_table):
+    """
+    Return the partitions of ``db_table`` ordered by their range, as dicts with the partition
+    name, range, size and estimated number of rows.
+    """
+    cursor.execute(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), pg_total_relation_size(c.oid), c.reltuples "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(%s)",
+        [db_table],
+    )
+    partitions = []
+    for name, bound, total_bytes, reltuples in cursor.fetchall():
+        match = _BOUND_RE.search(bound)
+        if match is None:
+            continue
+        partitions.append(
+            {
+                "name": name,
+                "from": _parse_bound(match.group(1)),
+                "to": _parse_bound(match.group(2)),
+                "total_bytes": total_bytes,
+                "estimated_row_count": int(reltuples) if reltuples >= 0 else None,
+            }
+        )
+    return sorted(partitions, key=lambda partition: partition["from"])
+
+
+def ensure_partitions(connection, schema, rows):
+    """
+    Create the partitions needed before writing ``rows`` (validated ``{column: value}`` mappings)
+    to table ``schema``: the ones holding their timestamps, or for ``id`` partitioning the ones
+    the next ids fall into plus one block of headroom for concurrent writers. Call it outside of
+    the write's transaction, so the partitions are committed even when the write fails.
+    """
+    partition = schema.partition
+    if partition is None:
+        return
+
+    with connection.cursor() as cursor:
+        if schema.partition_bounds is None:
+            schema.partition_bounds = {item["from"] for item in list_partitions(cursor, schema.db_table)}
+
+        if partition["column"] == "id":
+            cursor.execute(
+                "SELECT pg_sequence_last_value(pg_get_serial_sequence(%s, 'id')::regclass)", [schema.db_table]
+            )
+            last_id = cursor.fetchone()[0] or 0
+            end = get_bounds(partition, last_id + len(rows) + partition["interval"])[1]
+            # Blocks below the newest partition were dropped on purpose, they are not recreated
+            first = max(schema.partition_bounds, default=0)
+            needed = range(first, end, partition["interval"])
+        else:
+            values = (row.get(partition["column"]) for row in rows)
+            needed = {get_bounds(partition, value)[0] for value in values if value is not None}
+
+        for start in sorted(set(needed) - schema.partition_bounds):
+            create_partition(connection, cursor, schema, *get_bounds(partition, start))
@@ -0,0 +1,222 @@
+"""
+Compilation of validated row queries (see ``RowQuerySerializer``) into parameterized SQL.
+
+Column names are checked against the table's ``DynamicModel.columns`` and filter values are
+converted by the table's dynamic serializer fields, so only known identifiers end up in the SQL
+text and every value travels as a query parameter.
+"""
+from rest_framework import serializers
+
+COMPARISON_OPERATORS = {"eq": "=", "ne": "<>", "lt": "<", "lte": "<=", "gt": ">", "gte": ">="}
+
+NUMERIC_TYPES = {"number", "bigint", "double", "decimal"}
+
+# Field types of the results of sum and avg by the type of their column, min and max keep it
+SUM_TYPES = {"number": "bigint", "bigint": "bigint", "double": "double", "decimal": "decimal"}
+AVG_TYPES = {"number": "double", "bigint": "double", "double": "double", "decimal": "decimal"}
+
+# Ids per statement of an ids selection on backends without a parameter limit
+SELECTION_CHUNK_SIZE = 1000
+
+
+def _check_column(schema, column, key):
+    if column != "id" and column not in schema.columns:
+        raise serializers.ValidationError({key: [f"Unknown column '{column}'."]})
+
+
+def _get_column_type(schema, column):
+    return "bigint" if column == "id" else schema.columns[column]
+
+
+def _convert_value(connection, schema, field, column, value):
+    try:
+        value = field.run_validation(value)
+    except serializers.ValidationError as e:
+        raise serializers.ValidationError({"filters": [f"Invalid value for '{column}': {' '.join(e.detail)}"]})
+    if column == "id":
+        return value
+    return schema.model_fields[column].get_db_prep_value(value, connection)
+
+
+def compile_filters(connection, schema, filters):
+    """
+    Return a ``(where_clause, params)`` pair combining ``filters`` with AND. The clause is empty
+    when there are no filters.
+    """
+    fields = schema.serializer().fields
+    clauses = []
+    params = []
+
+    for query_filter in filters:
+        column, op, value = query_filter["column"], query_filter["op"], query_filter["value"]
+        _check_column(schema, column, "filters")
+
+        field = serializers.IntegerField() if column == "id" else fields[column]
+        quoted = connection.ops.quote_name(column)
+
+        if op == "isnull":
+            clauses.append(f"{quoted} IS NULL" if value else f"{quoted} IS NOT NULL")
+        elif op == "in":
+            if not isinstance(value, list) or not value:
+                raise serializers.ValidationError(
+                    {"filters": [f"The 'in' filter on '{column}' needs a non-empty list."]}
+                )
+            clauses.append(f"{quoted} IN ({', '.join(['%s'] * len(value))})")
+            params.extend(_convert_value(connection, schema, field, column, item) for item in value)
+        else:
+            clauses.append(f"{quoted} {COMPARISON_OPERATORS[op]} %s")
+            params.append(_convert_value(connection, schema, field, column, value))
+
+    return " AND ".join(clauses), params
+
+
+def compile_query(connection, schema, query):
+    """
+    Compile a validated row query into ``(sql, params, result_columns, result_types)``, the result
+    types being the field types the result columns are encoded as.
+    """
+    quote_name = connection.ops.quote_name
+    where, params = compile_filters(connection, schema, query.get("filters", []))
+    group_by = query.get("group_by", [])
+    aggregates = query.get("aggregates", [])
+
+    if group_by or aggregates:
+        for column in group_by:
+            _check_column(schema, column, "group_by")
+
+        select = [quote_name(column) for column in group_by]
+        result_columns = list(group_by)
+        result_types = [_get_column_type(schema, column) for column in group_by]
+
+        for aggregate in aggregates:
+            function, column = aggregate["function"], aggregate.get("column")
+            if column is None:
+                select.append("COUNT(*)")
+                result_columns.append(function)
+                result_types.append("bigint")
+                continue
+
+            _check_column(schema, column, "aggregates")
+            if function in ("sum", "avg") and schema.columns.get(column) not in NUMERIC_TYPES:
+                raise serializers.ValidationError(
+                    {"aggregates": [f"The '{function}' aggregate needs a number column, '{column}' is not one."]}
+                )
+            select.append(f"{function.upper()}({quote_name(column)})")
+            result_columns.append(f"{function}_{column}")
+            column_type = _get_column_type(schema, column)
+            if function == "sum":
+                column_type = SUM_TYPES[column_type]
+            elif function == "avg":
+                column_type = AVG_TYPES[column_type]
+            elif function == "count":
+                column_type = "bigint"
+            result_types.append(column_type)
+
+        default_order = group_by
+    else:
+        fields = query.get("fields") or list(schema.columns)
+        for column in fields:
+            _check_column(schema, column, "fields")
+
+        result_columns = ["id", *[field for field in fields if field != "id"]]
+        result_types = [_get_column_type(schema, column) for column in result_columns]
+        select = [quote_name(column) for column in result_columns]
+        default_order = ["id"]
+
+    order_by = []
+    for term in query.get("order_by") or default_order:
+        column = term.lstrip("-")
+        if column not in result_columns:
+            raise serializers.ValidationError({"order_by": [f"Cannot order by '{column}', it is not in the result."]})
+        # Aggregates are ordered by their position in the select list
+        position = result_columns.index(column) + 1
+        order_by.append(f"{position} DESC" if term.startswith("-") else str(position))
+
+    sql = f"SELECT {', '.join(select)} FROM {quote_name(schema.db_table)}"
+    if where:
+        sql += f" WHERE {where}"
+    if group_by:
+        sql += f" GROUP BY {', '.join(quote_name(column) for column in group_by)}"
+    if order_by:
+        sql += f" ORDER BY {', '.join(order_by)}"
+    sql += " LIMIT %s"
+    params.append(query["limit"])
+
+    return sql, params, result_columns, result_types
+
+
+def compile_selection(connection, schema, selection):
+    """
+    Return a ``(where_clause, params)`` pair selecting rows by ``ids`` or by ``filters``.
+    """
+    if "ids" in selection:
+        return f"id IN ({', '.join(['%s'] * len(selection['ids']))})", list(selection["ids"])
+    return compile_filters(connection, schema, selection["filters"])
+
+
+def split_selection(connection, selection, reserved=0):
+    """
+    Split an ``ids`` selection into selections small enough for one statement each, within the
+    backend's parameter limit once ``reserved`` parameters are taken by the rest of the statement.
+    Filter selections are returned whole.
+    """
+    if "ids" not in selection:
+        return [selection]
+
+    ids = selection["ids"]
+    chunk_size = SELECTION_CHUNK_SIZE
+    if connection.features.max_query_params:
+        chunk_size = max(1, connection.features.max_query_params - reserved)
+    return [{"ids": ids[start : start + chunk_size]} for start in range(0, len(ids), chunk_size)]
+
+
+def convert_values(schema, values, key="values"):
+    """
+    Validate a ``{column: value}`` mapping against the table columns, for partial updates.
+    """
+    unknown_columns = [column for column in values if column not in schema.columns]
+    if unknown_columns:
+        raise serializers.ValidationError({key: [f"Unknown columns: {', '.join(unknown_columns)}."]})
+
+    serializer = schema.serializer(data=values, partial=True)
+    if not serializer.is_valid():
+        raise serializers.ValidationError({key: serializer.errors})
+    return serializer.validated_data
+
+
+def compile_update(connection, schema, values, selection):
+    """
+    Compile a single set-based ``UPDATE`` setting ``values`` on the selected rows.
+    """
+    values = convert_values(schema, values)
+    where, params = compile_selection(connection, schema, selection)
+    assignments = ", ".join(f"{connection.ops.quote_name(column)} = %s" for column in values)
+    return f"UPDATE {connection.ops.quote_name(schema.db_table)} SET {assignments} WHERE {where}", [
+        *schema.get_db_prep_values(connection, values),
+        *params,
+    ]
+
+
+def compile_batch_update(connection, schema, columns, rows):
+    """
+    Compile an ``UPDATE ... FROM (VALUES ...)`` giving every row of ``rows`` (``[id, *values]``
+    sequences ordered like ``columns``) its own values in one statement. PostgreSQL only.
+    """
+    quote_name = connection.ops.quote_name
+    casts = ["bigint", *(schema.model._meta.get_field(column).db_type(connection) for column in columns)]
+    row_sql = "(" + ", ".join(f"%s::{cast}" for cast in casts) + ")"
+    assignments = ", ".join(f"{quote_name(column)} = v.{quote_name(column)}" for column in columns)
+    aliases = ", ".join(quote_name(column) for column in ["id", *columns])
+    db_table = quote_name(schema.db_table)
+
+    sql = (
+        f"UPDATE {db_table} SET {assignments} "
+        f"FROM (VALUES {', '.join([row_sql] * len(rows))}) AS v ({aliases}) "
+        f"WHERE {db_table}.id = v.id"
+    )
+    return sql, [value for row in rows for value in row]
+
+
+def compile_delete(connection, schema, selection):
+    where, params = compile_selection(connection, schema, selection)
+    return f"DELETE FROM {connection.ops.quote_name(schema.db_table)} WHERE {where}", params
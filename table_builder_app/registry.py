@@ -0,0 +1,338 @@
+"""
+Process-wide cache of the classes and metadata needed to serve a dynamic table.
+
+Entries are keyed by table name and tagged with the ``DynamicModel`` primary key and schema
+version. Schema changes made in this process invalidate their entry directly. With
+``TABLE_BUILDER_REGISTRY_SNAPSHOT`` the metadata of all tables is loaded when the app starts
+(``load_snapshot``), so lookups, including those of missing tables, are answered from memory.
+
+Changes made by other workers are picked up in two ways. On PostgreSQL triggers on
+``DynamicModel`` send a ``NOTIFY`` on ``CHANNEL`` with the table name, which a thread of every
+process using the snapshot listens to. Otherwise, and while the listener is not connected, a
+fingerprint of all versions is compared with the database at most once every
+``TABLE_BUILDER_REGISTRY_CHECK_INTERVAL`` seconds. Set ``TABLE_BUILDER_REGISTRY_LISTEN`` to False
+where ``LISTEN`` is unavailable, e.g. behind a transaction pooling proxy.
+"""
+import json
+import os
+import select
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count, Max, Sum
+
+from .models import DynamicModel, create_dynamic_model
+from .serializers import SERIALIZER_FIELDS, create_dynamic_serializer
+
+DEFAULT_CHECK_INTERVAL = 2.0
+
+# Channel of the schema change notifications, see migration 0010
+CHANNEL = "table_builder_schema"
+
+# Seconds between attempts to reconnect the listener
+LISTENER_RETRY_INTERVAL = 5.0
+
+# Most row encoders cached per table, projections beyond them are compiled for every request
+MAX_ROW_ENCODERS = 64
+
+# Fields of DynamicModel that TableSchema is built from
+SCHEMA_FIELDS = ("id", "name", "columns", "version", "partition", "search")
+
+_lock = threading.RLock()
+_tables = {}
+# Metadata of every table by name when the snapshot is loaded, None for entries to read again
+_snapshot = None
+_fingerprint = None
+_last_check = 0.0
+
+_listener = {"pid": None, "thread": None, "stop": None, "connected": False, "resync": False}
+
+
+class TableSchema:
+    """
+    Cached model class, serializer class and column metadata of one dynamic table.
+    """
+
+    def __init__(self, table):
+        self.id = table.id
+        self.name = table.name
+        self.version = table.version
+        self.columns = dict(table.columns)
+        self.partition = table.partition
+        self.search = table.search
+        # Lower bounds of the existing partitions, loaded on the first write
+        self.partition_bounds = None
+        self.model = create_dynamic_model(table.name, self.columns)
+        # Lowercased like the table Django created, raw queries quote it
+        self.db_table = self.model._meta.db_table
+        self.serializer = create_dynamic_serializer(self.columns)
+        self._row_encoders = {}
+        self.model_fields = {column: self.model._meta.get_field(column) for column in self.columns}
+        # Raw cursors return json columns as text, the model field would decode them in the ORM
+        self.db_converters = {
+            column: _decode_json for column, field_type in self.columns.items() if field_type == "json"
+        }
+
+    def get_row_encoder(self, fields):
+        """
+        Return a function turning a raw ``(id, *fields)`` row into the item the dynamic serializer
+        would render for it. Rows read back from the table are trusted, so only the columns whose
+        raw values differ from their representation are converted and nothing is validated.
+        """
+        key = tuple(fields)
+        encoder = self._row_encoders.get(key)
+        if encoder is None:
+            encoder = _compile_row_encoder(
+                ["id", *fields], [None, *(_get_read_converter(self.columns[field]) for field in fields)]
+            )
+            # Clients choose the projections, so only the first ones are kept
+            if len(self._row_encoders) < MAX_ROW_ENCODERS:
+                self._row_encoders[key] = encoder
+        return encoder
+
+    def get_result_encoder(self, names, types):
+        """
+        Return a function turning a raw row of a query selecting ``names``, of the field types
+        ``types``, into its item, like ``get_row_encoder`` for listings. Sums of integer columns
+        are numeric on PostgreSQL, integer results are converted to int.
+        """
+        converters = [
+            int if field_type in ("number", "bigint") else _get_read_converter(field_type) for field_type in types
+        ]
+        return _compile_row_encoder(names, converters)
+
+    def get_db_prep_values(self, connection, data, columns=None):
+        """
+        Return the values of the ``{column: value}`` mapping ``data`` prepared for a raw query, in
+        the order of ``columns`` (the keys of ``data`` by default).
+        """
+        return [
+            self.model_fields[column].get_db_prep_save(data[column], connection) for column in columns or data
+        ]
+
+    def from_db(self, columns, rows):
+        """
+        Convert raw ``rows`` whose values are ordered like ``columns`` to Python values.
+        """
+        converters = [
+            (index, self.db_converters[column]) for index, column in enumerate(columns) if column in self.db_converters
+        ]
+        if not converters:
+            return rows
+
+        converted = []
+        for row in rows:
+            row = list(row)
+            for index, converter in converters:
+                row[index] = converter(row[index])
+            converted.append(row)
+        return converted
+
+
+def get_table_schema(name):
+    """
+    Return the ``TableSchema`` of table ``name`` or None when the table does not exist.
+    """
+    _check_for_changes()
+
+    schema = _tables.get(name)
+    if schema is not None:
+        return schema
+
+    with _lock:
+        schema = _tables.get(name)
+        if schema is None:
+            if _snapshot is not None and name not in _snapshot:
+                return None
+
+            table = _snapshot.get(name) if _snapshot is not None else None
+            if table is None:
+                table = DynamicModel.objects.only(*SCHEMA_FIELDS).filter(name=name).first()
+                if _snapshot is not None:
+                    if table is None:
+                        del _snapshot[name]
+                    else:
+                        _snapshot[name] = table
+            if table is None:
+                return None
+            schema = _tables[name] = TableSchema(table)
+    return schema
+
+
+def invalidate(name):
+    """
+    Drop the cached entry of table ``name``, it is rebuilt on the next lookup.
+    """
+    with _lock:
+        _tables.pop(name, None)
+        if _snapshot is not None:
+            _snapshot[name] = None
+
+
+def clear():
+    global _snapshot, _fingerprint
+
+    with _lock:
+        _tables.clear()
+        _snapshot = None
+        _fingerprint = None
+
+
+def load_snapshot():
+    """
+    Load the metadata of all tables, lookups of tables missing from it no longer query the database.
+    """
+    global _snapshot, _fingerprint
+
+    with _lock:
+        _snapshot = {}
+        _fingerprint = _get_fingerprint()
+        _sync()
+
+
+def _get_read_converter(field_type):
+    """
+    Return a callable giving a non-null raw value of a ``field_type`` column its serializer
+    representation, or None when the raw value already is it.
+    """
+    if field_type in ("string", "text", "number", "bigint"):
+        return None
+    if field_type == "json":
+        return json.loads
+    if field_type == "boolean":
+        # SQLite returns booleans as integers
+        return bool
+    if field_type == "double":
+        return float
+
+    field = SERIALIZER_FIELDS[field_type]()
+    if field_type == "decimal":
+        return field.to_representation
+    # Dates and timestamps are strings on SQLite and timestamps are normalized to the current time zone
+    return lambda value: field.to_representation(field.to_internal_value(value))
+
+
+def _compile_row_encoder(names, converters):
+    conversions = [(index, names[index], converter) for index, converter in enumerate(converters) if converter]
+
+    if not conversions:
+        return lambda row: dict(zip(names, row))
+
+    def encode_row(row):
+        item = dict(zip(names, row))
+        for index, name, converter in conversions:
+            value = row[index]
+            if value is not None:
+                item[name] = converter(value)
+        return item
+
+    return encode_row
+
+
+def _decode_json(value):
+    return None if value is None else json.loads(value)
+
+
+def _get_fingerprint():
+    # Changes with every table created, deleted or changed, at the cost of a single row query
+    fingerprint = DynamicModel.objects.aggregate(count=Count("id"), versions=Sum("version"), last_id=Max("id"))
+    return tuple(fingerprint.values())
+
+
+def _sync():
+    """
+    Drop the entries whose table changed and read the snapshot again. Call it holding ``_lock``.
+    """
+    global _snapshot
+
+    if _snapshot is None:
+        tables = DynamicModel.objects.values_list("id", "name", "version")
+        current = {name: (pk, version) for pk, name, version in tables}
+    else:
+        _snapshot = {table.name: table for table in DynamicModel.objects.only(*SCHEMA_FIELDS)}
+        current = {name: (table.id, table.version) for name, table in _snapshot.items()}
+
+    for name, schema in list(_tables.items()):
+        if current.get(name) != (schema.id, schema.version):
+            del _tables[name]
+
+
+def _check_for_changes():
+    global _fingerprint, _last_check
+
+    if _snapshot is not None and getattr(settings, "TABLE_BUILDER_REGISTRY_LISTEN", True) and _start_listener():
+        if _listener["resync"]:
+            # Notifications sent before the listener connected were missed
+            with _lock:
+                _listener["resync"] = False
+                _sync()
+        return
+
+    interval = getattr(settings, "TABLE_BUILDER_REGISTRY_CHECK_INTERVAL", DEFAULT_CHECK_INTERVAL)
+    now = time.monotonic()
+    if (not _tables and _snapshot is None) or now - _last_check < interval:
+        return
+
+    with _lock:
+        _last_check = now
+        fingerprint = _get_fingerprint()
+        if fingerprint != _fingerprint:
+            _fingerprint = fingerprint
+            _sync()
+
+
+def _start_listener():
+    """
+    Start the notification listener of this process on PostgreSQL and return whether it is connected.
+    """
+    connection = connections["default"]
+    if connection.vendor != "postgresql":
+        return False
+
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+    if not is_psycopg3:
+        return False
+
+    # Threads do not survive a fork, every worker process starts its own
+    if _listener["pid"] != os.getpid():
+        with _lock:
+            if _listener["pid"] != os.getpid():
+                stop = threading.Event()
+                thread = threading.Thread(
+                    target=_listen, args=(connection.get_connection_params(), stop), name=CHANNEL, daemon=True
+                )
+                _listener.update(pid=os.getpid(), thread=thread, stop=stop, connected=False)
+                thread.start()
+    return _listener["connected"]
+
+
+def stop_listener():
+    thread, stop = _listener["thread"], _listener["stop"]
+    _listener.update(pid=None, thread=None, stop=None, connected=False)
+    if thread is not None:
+        stop.set()
+        thread.join()
+
+
+def _listen(params, stop):
+    import psycopg
+
+    while not stop.is_set():
+        try:
+            with psycopg.connect(**params, autocommit=True) as conn:
+                conn.add_notify_handler(lambda notify: invalidate(notify.payload))
+                conn.execute(f"LISTEN {CHANNEL}")
+                _listener.update(connected=True, resync=True)
+                while not stop.is_set():
+                    # Received notifications are handled by the next command on the connection
+                    if select.select([conn], [], [], 1.0)[0]:
+                        conn.execute("SELECT 1")
+        except psycopg.Error:
+            pass
+        finally:
+            # Changes made while reconnecting are found by polling
+            _listener["connected"] = False
+        stop.wait(LISTENER_RETRY_INTERVAL)
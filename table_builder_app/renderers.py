@@ -0,0 +1,305 @@
+import csv
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import DECIMAL_MAX_DIGITS, DECIMAL_PLACES
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the standard library encoder is used without it
+    orjson = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pyarrow is optional, the Arrow and Parquet exports are only offered with it
+    pyarrow = None
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+class RowStreamRenderer(BaseRenderer):
+    """
+    Base class for renderers that can encode table rows incrementally.
+
+    ``render_rows`` receives the column names, an iterable of row batches (lists of tuples) and the
+    field types of the columns, and yields encoded chunks, so a view can hand it to a
+    ``StreamingHttpResponse``. Keyword arguments come from ``get_stream_options``. ``render`` is
+    still used for regular responses such as errors.
+    """
+
+    def get_stream_options(self, query_params):
+        """
+        Return the format specific options of an export, raising ValueError for invalid parameters.
+        """
+        return {}
+
+    def render_rows(self, columns, batches, types=None):
+        raise NotImplementedError("RowStreamRenderer subclasses must implement render_rows()")
+
+
+def _orjson_default(value):
+    # Types orjson does not encode natively (Decimal, lazy strings, ...) as DRF would
+    return JSONEncoder().default(value)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` encoding with orjson, which is much faster on large row lists. Indented output
+    for clients that ask for it is left to ``JSONRenderer``.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=_orjson_default, option=ORJSON_OPTIONS)
+
+
+# Renderers to put before the default ones of views returning many rows
+FAST_JSON_RENDERERS = [ORJSONRenderer] if orjson else []
+
+
+class NDJSONRenderer(RowStreamRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        items = data if isinstance(data, list) else [data]
+        return "".join(json.dumps(item, cls=JSONEncoder) + "\n" for item in items).encode(self.charset)
+
+    def render_rows(self, columns, batches, types=None):
+        if orjson:
+            for batch in batches:
+                yield b"".join(
+                    orjson.dumps(dict(zip(columns, row)), default=_orjson_default, option=ORJSON_OPTIONS) + b"\n"
+                    for row in batch
+                )
+            return
+        for batch in batches:
+            yield "".join(json.dumps(dict(zip(columns, row)), cls=JSONEncoder) + "\n" for row in batch)
+
+
+class _EchoBuffer:
+    """
+    File-like object whose ``write`` returns the value instead of storing it.
+    """
+
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(RowStreamRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        items = data if isinstance(data, list) else [data]
+        columns = list(items[0]) if items else []
+        writer = csv.writer(_EchoBuffer())
+        lines = [writer.writerow(columns)]
+        lines.extend(writer.writerow([_encode_cell(item.get(column)) for column in columns]) for item in items)
+        return "".join(lines).encode(self.charset)
+
+    def render_rows(self, columns, batches, types=None):
+        writer = csv.writer(_EchoBuffer())
+        yield writer.writerow(columns)
+        json_indexes = [index for index, field_type in enumerate(types or []) if field_type == "json"]
+        for batch in batches:
+            if json_indexes:
+                batch = [_encode_json_cells(row, json_indexes) for row in batch]
+            yield "".join(writer.writerow(row) for row in batch)
+
+
+def _encode_cell(value):
+    # Values of json columns are written as JSON rather than as their Python repr
+    return json.dumps(value, cls=JSONEncoder) if isinstance(value, (dict, list)) else value
+
+
+def _encode_json_cells(row, json_indexes):
+    row = list(row)
+    for index in json_indexes:
+        if row[index] is not None:
+            row[index] = json.dumps(row[index], cls=JSONEncoder)
+    return row
+
+
+# Arrow types of the field types, json columns are exported as their text
+ARROW_TYPES = (
+    {
+        "string": pyarrow.string(),
+        "text": pyarrow.string(),
+        "number": pyarrow.int32(),
+        "bigint": pyarrow.int64(),
+        "double": pyarrow.float64(),
+        "decimal": pyarrow.decimal128(DECIMAL_MAX_DIGITS, DECIMAL_PLACES),
+        "boolean": pyarrow.bool_(),
+        "date": pyarrow.date32(),
+        "timestamp": pyarrow.timestamp("us", tz="UTC"),
+        "json": pyarrow.string(),
+    }
+    if pyarrow
+    else {}
+)
+
+
+def _encode_json(value):
+    return None if value is None else json.dumps(value, cls=JSONEncoder)
+
+
+def _to_bool(value):
+    # SQLite returns booleans as integers
+    return None if value is None else bool(value)
+
+
+def _to_date(value):
+    # SQLite returns dates as strings when it does not know the column's type
+    return value if value is None or isinstance(value, date) else parse_date(value)
+
+
+def _to_timestamp(value):
+    # SQLite returns timestamps as naive datetimes or strings of their UTC time
+    if value is not None and not isinstance(value, datetime):
+        value = parse_datetime(value)
+    if value is not None and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _to_decimal(value):
+    # SQLite returns decimals as floats or integers, Arrow only takes Decimal values of the column's scale
+    if value is None or isinstance(value, Decimal):
+        return value
+    return Decimal(str(value)).quantize(Decimal(1).scaleb(-DECIMAL_PLACES))
+
+
+# Conversions of raw values Arrow does not take as they are
+ARROW_CONVERTERS = {
+    "json": _encode_json,
+    "boolean": _to_bool,
+    "date": _to_date,
+    "timestamp": _to_timestamp,
+    "decimal": _to_decimal,
+}
+
+
+class _ChunkSink:
+    """
+    Write-only file-like object collecting what is written until it is taken. The position keeps
+    counting across ``take`` calls, Parquet writers record offsets into the file with ``tell``.
+    """
+
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+class ColumnarRenderer(RowStreamRenderer):
+    """
+    Base class of the Arrow based formats. Each batch of rows read from the cursor becomes one
+    Arrow record batch typed after the table columns, encoded and yielded before the next batch
+    is read. The ``compression`` parameter selects one of ``compressions``.
+    """
+
+    charset = None
+    render_style = "binary"
+    compressions = ()
+    default_compression = None
+
+    def open_writer(self, sink, schema, compression):
+        raise NotImplementedError("ColumnarRenderer subclasses must implement open_writer()")
+
+    def get_stream_options(self, query_params):
+        compression = query_params.get("compression", self.default_compression)
+        if compression not in self.compressions:
+            raise ValueError(f"compression must be one of: {', '.join(self.compressions)}.")
+        return {"compression": compression}
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Responses other than row exports, e.g. errors, are written with inferred types
+        if data is None:
+            return b""
+        table = pyarrow.Table.from_pylist(data if isinstance(data, list) else [data])
+        sink = _ChunkSink()
+        with self.open_writer(sink, table.schema, self.default_compression) as writer:
+            writer.write_table(table)
+        return sink.take()
+
+    def render_rows(self, columns, batches, types=None, compression=None):
+        schema = pyarrow.schema([(column, ARROW_TYPES[field_type]) for column, field_type in zip(columns, types)])
+        converters = [ARROW_CONVERTERS.get(field_type) for field_type in types]
+
+        sink = _ChunkSink()
+        with self.open_writer(sink, schema, compression or self.default_compression) as writer:
+            for batch in batches:
+                arrays = [
+                    pyarrow.array(values if converter is None else map(converter, values), type=field.type)
+                    for values, field, converter in zip(zip(*batch), schema, converters)
+                ]
+                writer.write_batch(pyarrow.RecordBatch.from_arrays(arrays, schema=schema))
+                yield sink.take()
+        yield sink.take()
+
+
+class ArrowRenderer(ColumnarRenderer):
+    """
+    Arrow IPC streaming format, record batch buffers optionally compressed with LZ4 or Zstandard.
+    """
+
+    media_type = "application/vnd.apache.arrow.stream"
+    format = "arrow"
+    compressions = ("none", "lz4", "zstd")
+    default_compression = "none"
+
+    def open_writer(self, sink, schema, compression):
+        options = pyarrow.ipc.IpcWriteOptions(compression=None if compression == "none" else compression)
+        return pyarrow.ipc.new_stream(sink, schema, options=options)
+
+
+class ParquetRenderer(ColumnarRenderer):
+    """
+    Parquet file with one row group per batch of rows, the footer is written after the last one.
+    """
+
+    media_type = "application/vnd.apache.parquet"
+    format = "parquet"
+    compressions = ("none", "snappy", "gzip", "zstd", "lz4", "brotli")
+    default_compression = "snappy"
+
+    def open_writer(self, sink, schema, compression):
+        return pyarrow.parquet.ParquetWriter(sink, schema, compression=compression)
+
+
+# Renderers of the columnar exports, offered when pyarrow is installed
+COLUMNAR_RENDERERS = [ArrowRenderer, ParquetRenderer] if pyarrow else []
@@ -0,0 +1,406 @@
+"""
+Schema changes of dynamic tables.
+
+``create_table`` and ``update_table`` run the DDL of the table endpoints, either inside the
+request or from a ``SchemaJob`` picked up by the ``table_builder_worker`` command. With
+``online=True`` a column type change on PostgreSQL does not rewrite the table under an exclusive
+lock: a shadow column of the new type is added, kept in sync by a trigger and backfilled in
+batches of ``ONLINE_BATCH_SIZE`` rows, one short transaction each, and only the final swap of the
+two columns locks the table, for a catalog update.
+"""
+from django.db import transaction
+from django.db.backends.utils import truncate_name
+from django.db.models import F
+from django.db.models.functions import Now
+from rest_framework import serializers
+
+from . import metrics, registry
+from .locks import lock_table
+from .models import DynamicModel, create_dynamic_model, get_field_by_type
+from .partitions import generate_create_table_query
+from .search import generate_add_search_queries, generate_drop_search_query, prepare_search
+
+# Rows converted per transaction by the backfill of online column type changes
+ONLINE_BATCH_SIZE = 5000
+
+# Fields of DynamicModel written by schema changes, row writers keep updating the others meanwhile
+SCHEMA_UPDATE_FIELDS = ["columns", "indexes", "search", "version", "data_version", "data_modified_at"]
+
+
+class SchemaChangeError(Exception):
+    """
+    A schema change that failed, ``description`` tells which step failed and ``error`` why.
+    """
+
+    def __init__(self, description, error):
+        super().__init__(f"{description}: {error}")
+        self.description = description
+        self.error = error
+
+
+def get_db_table(table_name):
+    return f"{DynamicModel._meta.app_label}_{table_name.lower()}"
+
+
+def get_columns(field_titles, field_types):
+    """
+    Return the ``{column: type}`` mapping of the field titles and types of the table serializers.
+    """
+    return {title.lower().replace(" ", "_"): field_type for title, field_type in zip(field_titles, field_types)}
+
+
+def combine_columns(existing_columns, new_columns):
+    combined_dict = dict(existing_columns)
+    for key, value in new_columns.items():
+        if key in combined_dict:
+            combined_dict[key] = new_columns[key]
+        else:
+            combined_dict[key] = value
+    return combined_dict
+
+
+def alter_dynamic_table(schema_editor, model_class, existing_columns, new_columns):
+    """
+    Bring the table of ``model_class`` (built from ``existing_columns``) in line with ``new_columns``
+    by issuing only ADD COLUMN / ALTER COLUMN TYPE statements. Columns missing from ``new_columns``
+    are kept.
+    """
+    for column, field_type in new_columns.items():
+        new_field = get_field_by_type(field_type)
+        new_field.set_attributes_from_name(column)
+        new_field.model = model_class
+
+        if column not in existing_columns:
+            schema_editor.add_field(model_class, new_field)
+        elif existing_columns[column] != field_type:
+            old_field = model_class._meta.get_field(column)
+            schema_editor.alter_field(model_class, old_field, new_field)
+
+
+def prepare_indexes(connection, db_table, indexes, columns, existing=()):
+    """
+    Normalize index specs from the table serializers: column titles are converted like field titles,
+    checked against ``columns`` and every index gets a name. A name must not be taken by another
+    relation, nor by an index of ``existing`` with other columns.
+    """
+    prepared = []
+    for index in indexes:
+        index_columns = [column.lower().replace(" ", "_") for column in index["columns"]]
+        unknown_columns = [column for column in index_columns if column != "id" and column not in columns]
+        if unknown_columns:
+            raise serializers.ValidationError({"indexes": [f"Unknown columns: {', '.join(unknown_columns)}."]})
+
+        name = index.get("name")
+        if not name:
+            suffix = "uniq" if index["unique"] else "idx"
+            name = truncate_name(f"{db_table}_{'_'.join(index_columns)}_{suffix}", connection.ops.max_name_length())
+        prepared.append({"name": name, "columns": index_columns, "unique": index["unique"]})
+
+    names = [index["name"] for index in prepared]
+    existing = {index["name"]: index for index in existing}
+    for index in prepared:
+        name = index["name"]
+        if names.count(name) > 1:
+            raise serializers.ValidationError({"indexes": [f"The index name '{name}' is given more than once."]})
+        if name in existing:
+            if (existing[name]["columns"], existing[name]["unique"]) != (index["columns"], index["unique"]):
+                raise serializers.ValidationError({"indexes": [f"The index '{name}' exists with other columns."]})
+        elif is_name_taken(connection, db_table, name):
+            raise serializers.ValidationError({"indexes": [f"The index name '{name}' is already used."]})
+    return prepared
+
+
+def is_name_taken(connection, db_table, name):
+    """
+    Return whether ``name`` is taken by a relation other than an index of ``db_table``, an index
+    left by an interrupted run being recorded rather than built again. Only PostgreSQL is checked,
+    elsewhere a clash fails when the index is built.
+    """
+    if connection.vendor != "postgresql":
+        return False
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_class LEFT JOIN pg_index ON indexrelid = pg_class.oid "
+            "WHERE pg_class.oid = to_regclass(%s) AND indrelid IS DISTINCT FROM to_regclass(%s)",
+            [quote_name(name), quote_name(db_table)],
+        )
+        return cursor.fetchone() is not None
+
+
+def generate_create_index_query(connection, db_table, index, concurrently=False):
+    quote_name = connection.ops.quote_name
+    unique = "UNIQUE " if index["unique"] else ""
+    concurrently = "CONCURRENTLY " if concurrently else ""
+    columns = ", ".join(quote_name(column) for column in index["columns"])
+    return (
+        f"CREATE {unique}INDEX {concurrently}{quote_name(index['name'])} "
+        f"ON {quote_name(db_table)} ({columns})"
+    )
+
+
+def create_index(connection, db_table, index, partitioned=False):
+    """
+    Build ``index`` on an existing table. On PostgreSQL, outside of a transaction, the index is built
+    with CREATE INDEX CONCURRENTLY so that writes to the table are not blocked while it is built.
+    """
+    # Indexes of partitioned tables cannot be built concurrently
+    concurrently = connection.vendor == "postgresql" and not connection.in_atomic_block and not partitioned
+
+    try:
+        with connection.schema_editor(atomic=not concurrently) as schema_editor:
+            schema_editor.execute(generate_create_index_query(connection, db_table, index, concurrently))
+    except Exception:
+        if concurrently and is_invalid_index(connection, db_table, index["name"]):
+            # A failed concurrent build leaves an invalid index behind
+            with connection.schema_editor(atomic=False) as schema_editor:
+                schema_editor.execute(f"DROP INDEX {connection.ops.quote_name(index['name'])}")
+        raise
+
+
+def is_invalid_index(connection, db_table, name):
+    """
+    Return whether ``name`` is an invalid index of ``db_table``. Index names are unique per schema,
+    a build failing on a name taken by another table must not drop that table's index.
+    """
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_index WHERE indexrelid = to_regclass(%s) AND indrelid = to_regclass(%s) "
+            "AND NOT indisvalid",
+            [quote_name(name), quote_name(db_table)],
+        )
+        return cursor.fetchone() is not None
+
+
+def get_locked_table(table):
+    """
+    Read the ``DynamicModel`` of ``table`` again, its row locked until the end of the transaction.
+    Schema changes work from this copy, so the metadata a concurrent change of the same table
+    committed meanwhile is not overwritten.
+    """
+    return DynamicModel.objects.select_for_update().get(pk=table.pk)
+
+
+def create_table(connection, data):
+    """
+    Create the dynamic table described by ``data``, the validated data of ``TableCreateSerializer``.
+    """
+    model_name = data["table_name"]
+    columns = get_columns(data["field_titles"], data["field_types"])
+    partition = data.get("partition")
+
+    # Create the dynamic model class using the custom metaclass
+    model_class = create_dynamic_model(model_name, columns)
+    indexes = prepare_indexes(connection, model_class._meta.db_table, data.get("indexes", []), columns)
+    search = prepare_search(data.get("search"), columns)
+
+    try:
+        with metrics.phase("schema_editor"), connection.schema_editor() as schema_editor:
+            lock_table(connection, model_name, exclusive=True)
+            if partition:
+                schema_editor.execute(generate_create_table_query(connection, model_class, partition))
+            else:
+                schema_editor.create_model(model_class)
+            # The table is still empty, so its indexes are built in the same transaction
+            for index in indexes:
+                schema_editor.execute(generate_create_index_query(connection, model_class._meta.db_table, index))
+            if search:
+                for statement in generate_add_search_queries(connection, model_class._meta.db_table, search):
+                    schema_editor.execute(statement)
+    except Exception as e:
+        raise SchemaChangeError("problem with creating dynamic model", e)
+
+    # Store the dynamically created model's app label and model name
+    try:
+        DynamicModel(name=model_name, columns=columns, indexes=indexes, partition=partition, search=search).save()
+    except Exception as e:
+        raise SchemaChangeError("problem with saving dynamic model context", e)
+
+    registry.invalidate(model_name)
+
+
+def update_table(connection, table, data, online=False, heartbeat=None):
+    """
+    Add the columns and indexes of ``data``, the validated data of ``TableUpdateSerializer``, to
+    ``table``, change the type of its existing columns and replace its search spec. With ``online``
+    the type changes are made with ``change_column_type_online`` on PostgreSQL. ``heartbeat`` is
+    called after every step of a long change, e.g. to show that its job is still running.
+    """
+    # Alter the existing table in place so its rows are kept
+    try:
+        # The schema editor runs in a single transaction, the metadata update included
+        with metrics.phase("schema_editor"), connection.schema_editor() as schema_editor:
+            lock_table(connection, table.name, exclusive=True)
+            table = get_locked_table(table)
+            all_columns, new_indexes, search, type_changes = plan_update(connection, table, data, online)
+
+            # The search column is computed from the searched columns, so it is rebuilt when they change type
+            altered = {column for column in table.columns if table.columns[column] != all_columns[column]}
+            searched = set(table.search["columns"]) if table.search else set()
+            rebuild_search = search != table.search or bool(searched & altered)
+
+            # Create the dynamic model class for the current table layout using the custom metaclass
+            model_class = create_dynamic_model(table.name, table.columns)
+            if rebuild_search and table.search:
+                schema_editor.execute(generate_drop_search_query(connection, model_class._meta.db_table))
+            alter_dynamic_table(schema_editor, model_class, table.columns, all_columns)
+            if rebuild_search and search:
+                for statement in generate_add_search_queries(connection, model_class._meta.db_table, search):
+                    schema_editor.execute(statement)
+            table.columns = all_columns
+            table.search = search
+            table.version += 1
+            table.data_version = F("data_version") + 1
+            table.data_modified_at = Now()
+            table.save(update_fields=SCHEMA_UPDATE_FIELDS)
+    except (serializers.ValidationError, SchemaChangeError):
+        raise
+    except Exception as e:
+        raise SchemaChangeError("problem with altering dynamic model", e)
+
+    registry.invalidate(table.name)
+
+    for column, field_type in type_changes.items():
+        try:
+            with metrics.phase("schema_editor"):
+                dropped_indexes = change_column_type_online(connection, table, column, field_type, heartbeat=heartbeat)
+        except Exception as e:
+            raise SchemaChangeError("problem with altering dynamic model", e)
+        finally:
+            registry.invalidate(table.name)
+        # Dropping the old column dropped its indexes, they are rebuilt on the new one
+        new_indexes = dropped_indexes + new_indexes
+
+    if new_indexes:
+        # An interrupted run of the same change may have built some of them without recording them
+        with connection.cursor() as cursor:
+            built_indexes = connection.introspection.get_constraints(cursor, model_class._meta.db_table)
+
+    # Indexes are built after the columns are committed so they can be built concurrently
+    for index in new_indexes:
+        if index["name"] not in built_indexes:
+            try:
+                with metrics.phase("schema_editor"):
+                    create_index(connection, model_class._meta.db_table, index, partitioned=bool(table.partition))
+            except Exception as e:
+                raise SchemaChangeError("problem with creating index", e)
+
+        with transaction.atomic(using=connection.alias):
+            table = get_locked_table(table)
+            table.indexes = table.indexes + [index]
+            table.save(update_fields=["indexes"])
+        if heartbeat:
+            heartbeat()
+
+
+def plan_update(connection, table, data, online):
+    """
+    Return the ``(columns, new_indexes, search, type_changes)`` that ``update_table`` gives
+    ``table``, ``type_changes`` being the columns whose type is changed online afterwards.
+    """
+    all_columns = combine_columns(table.columns, get_columns(data["field_titles"], data["field_types"]))
+
+    existing_indexes = {index["name"] for index in table.indexes}
+    new_indexes = [
+        index
+        for index in prepare_indexes(
+            connection, get_db_table(table.name), data.get("indexes", []), all_columns, table.indexes
+        )
+        if index["name"] not in existing_indexes
+    ]
+    search = prepare_search(data["search"], all_columns) if "search" in data else table.search
+
+    type_changes = {}
+    if online and connection.vendor == "postgresql":
+        type_changes = {
+            column: field_type
+            for column, field_type in all_columns.items()
+            if column in table.columns and table.columns[column] != field_type
+        }
+        if table.partition and table.partition["column"] in type_changes:
+            raise SchemaChangeError("problem with altering dynamic model", "The partition column cannot change type.")
+        if search and set(search["columns"]) & set(type_changes):
+            raise SchemaChangeError(
+                "problem with altering dynamic model", "Searched columns cannot change type online."
+            )
+        all_columns = {**all_columns, **{column: table.columns[column] for column in type_changes}}
+
+    return all_columns, new_indexes, search, type_changes
+
+
+def change_column_type_online(connection, table, column, field_type, batch_size=ONLINE_BATCH_SIZE, heartbeat=None):
+    """
+    Change the type of ``column`` of ``table`` to ``field_type`` while the table stays writable
+    (PostgreSQL only). Returns the index specs of ``table`` that covered the column: they are
+    dropped with the old column and removed from ``table.indexes``, for the caller to rebuild.
+    ``heartbeat`` is called after every batch of the backfill.
+    """
+    quote_name = connection.ops.quote_name
+    max_length = connection.ops.max_name_length()
+    db_table = get_db_table(table.name)
+    db_type = get_field_by_type(field_type).db_type(connection)
+
+    old = quote_name(column)
+    new = quote_name(truncate_name(f"{column}__new", max_length))
+    function = quote_name(truncate_name(f"{db_table}_{column}_sync", max_length))
+    trigger = quote_name(truncate_name(f"{db_table}_{column}_sync_trigger", max_length))
+    quoted_table = quote_name(db_table)
+
+    def drop_shadow_column():
+        with connection.schema_editor(atomic=False) as schema_editor:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {quoted_table}")
+            schema_editor.execute(f"DROP FUNCTION IF EXISTS {function}()")
+            schema_editor.execute(f"ALTER TABLE {quoted_table} DROP COLUMN IF EXISTS {new}")
+
+    # Left behind when a worker stopped in the middle of the same change
+    drop_shadow_column()
+
+    try:
+        # The trigger converts the rows written from now on, the backfill the rows written before
+        with connection.schema_editor() as schema_editor:
+            lock_table(connection, table.name, exclusive=True)
+            schema_editor.execute(f"ALTER TABLE {quoted_table} ADD COLUMN {new} {db_type} NULL")
+            schema_editor.execute(
+                f"CREATE FUNCTION {function}() RETURNS trigger LANGUAGE plpgsql AS "
+                f"$$ BEGIN NEW.{new} := NEW.{old}::{db_type}; RETURN NEW; END $$"
+            )
+            schema_editor.execute(
+                f"CREATE TRIGGER {trigger} BEFORE INSERT OR UPDATE ON {quoted_table} "
+                f"FOR EACH ROW EXECUTE FUNCTION {function}()"
+            )
+
+        last_id = 0
+        while True:
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {quoted_table} SET {new} = {old}::{db_type} WHERE id IN "
+                    f"(SELECT id FROM {quoted_table} WHERE id > %s ORDER BY id LIMIT %s) RETURNING id",
+                    [last_id, batch_size],
+                )
+                ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                break
+            last_id = max(ids)
+            if heartbeat:
+                heartbeat()
+
+        with connection.schema_editor() as schema_editor:
+            lock_table(connection, table.name, exclusive=True)
+            table = get_locked_table(table)
+            dropped_indexes = [index for index in table.indexes if column in index["columns"]]
+            schema_editor.execute(f"DROP TRIGGER {trigger} ON {quoted_table}")
+            schema_editor.execute(f"DROP FUNCTION {function}()")
+            schema_editor.execute(f"ALTER TABLE {quoted_table} DROP COLUMN {old}")
+            schema_editor.execute(f"ALTER TABLE {quoted_table} RENAME COLUMN {new} TO {old}")
+            table.columns = {**table.columns, column: field_type}
+            table.indexes = [index for index in table.indexes if column not in index["columns"]]
+            table.version += 1
+            table.data_version = F("data_version") + 1
+            table.data_modified_at = Now()
+            table.save(update_fields=SCHEMA_UPDATE_FIELDS)
+    except Exception:
+        drop_shadow_column()
+        raise
+
+    return dropped_indexes
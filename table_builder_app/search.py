@@ -0,0 +1,106 @@
+"""
+Full-text search of dynamic tables (PostgreSQL only).
+
+A table created or updated with a ``search`` spec, ``{"columns": [...], "config": ...}``, gets a
+stored generated ``tsvector`` column, ``SEARCH_COLUMN``, over those string columns and a GIN
+index on it. The ``q`` parameter of the row listing is parsed with ``websearch_to_tsquery`` and
+matched against the column, so a search is a lookup in the GIN index; the matches are ordered by
+``ts_rank`` and paginated with ``offset`` and ``limit``.
+"""
+from django.db.backends.utils import truncate_name
+from rest_framework import serializers
+
+SEARCH_COLUMN = "_search"
+
+# Column types that can be searched
+SEARCH_TYPES = {"string", "text"}
+
+
+def prepare_search(search, columns):
+    """
+    Normalize a search spec from the table serializers: column titles are converted like field
+    titles and checked against ``columns``. Returns None when no column is searched.
+    """
+    if not search or not search["columns"]:
+        return None
+
+    search_columns = [column.lower().replace(" ", "_") for column in search["columns"]]
+    invalid_columns = [column for column in search_columns if columns.get(column) not in SEARCH_TYPES]
+    if invalid_columns:
+        raise serializers.ValidationError(
+            {"search": [f"Only string and text columns can be searched: {', '.join(invalid_columns)}."]}
+        )
+    if SEARCH_COLUMN in columns:
+        raise serializers.ValidationError({"search": [f"Tables with a '{SEARCH_COLUMN}' column cannot be searched."]})
+    return {"columns": search_columns, "config": search["config"]}
+
+
+def get_search_index_name(connection, db_table):
+    return truncate_name(f"{db_table}_search_idx", connection.ops.max_name_length())
+
+
+def generate_add_search_queries(connection, db_table, search):
+    """
+    Return the statements adding the search column of ``search`` and its GIN index to ``db_table``.
+    """
+    quote_name = connection.ops.quote_name
+    document = " || ' ' || ".join(f"coalesce({quote_name(column)}, '')" for column in search["columns"])
+    # The config is a validated identifier, a regconfig literal keeps the expression immutable
+    vector = f"to_tsvector('{search['config']}'::regconfig, {document})"
+    return [
+        f"ALTER TABLE {quote_name(db_table)} ADD COLUMN {quote_name(SEARCH_COLUMN)} tsvector "
+        f"GENERATED ALWAYS AS ({vector}) STORED",
+        f"CREATE INDEX {quote_name(get_search_index_name(connection, db_table))} "
+        f"ON {quote_name(db_table)} USING gin ({quote_name(SEARCH_COLUMN)})",
+    ]
+
+
+def generate_drop_search_query(connection, db_table):
+    # The GIN index is dropped with the column
+    quote_name = connection.ops.quote_name
+    return f"ALTER TABLE {quote_name(db_table)} DROP COLUMN IF EXISTS {quote_name(SEARCH_COLUMN)}"
+
+
+def get_search_params(query_params, max_limit):
+    """
+    Parse the ``offset`` and ``limit`` pagination parameters of searches. A missing limit is None.
+    """
+    limit = query_params.get("limit")
+    try:
+        offset = int(query_params.get("offset", 0))
+        limit = int(limit) if limit is not None else None
+    except ValueError:
+        raise ValueError("offset and limit must be integers.")
+
+    if offset < 0:
+        raise ValueError("offset must not be negative.")
+    if limit is not None and not 1 <= limit <= max_limit:
+        raise ValueError(f"limit must be between 1 and {max_limit}.")
+    return offset, limit
+
+
+def generate_search_query(connection, schema, columns, q, offset=0, limit=None):
+    """
+    Build a parameterized SELECT of ``id`` and ``columns`` of the rows of ``schema`` matching the
+    web search syntax query ``q``, best matches first.
+    """
+    quote_name = connection.ops.quote_name
+    select_list = ", ".join(quote_name(column) for column in ["id", *columns])
+    search_column = quote_name(SEARCH_COLUMN)
+
+    query = (
+        f"SELECT {select_list} FROM {quote_name(schema.db_table)}, "
+        f"websearch_to_tsquery(%s::regconfig, %s) AS _search_query "
+        f"WHERE {search_column} @@ _search_query "
+        f"ORDER BY ts_rank({search_column}, _search_query) DESC, id"
+    )
+    params = [schema.search["config"], q]
+
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    if offset:
+        query += " OFFSET %s"
+        params.append(offset)
+
+    return query, params
@@ -1,17 +1,53 @@
 from rest_framework import serializers
 from django.db import connection
-from .models import DynamicModel
+from .models import DECIMAL_MAX_DIGITS, DECIMAL_PLACES, FIELD_TYPES, DynamicModel, SchemaJob
+from .partitions import TIMESTAMP_INTERVALS
+
+# Serializer field of every column type, matching the range of the model field
+SERIALIZER_FIELDS = {
+    "string": lambda: serializers.CharField(max_length=255),
+    "text": lambda: serializers.CharField(),
+    "number": lambda: serializers.IntegerField(min_value=-(2**31), max_value=2**31 - 1),
+    "bigint": lambda: serializers.IntegerField(min_value=-(2**63), max_value=2**63 - 1),
+    "double": lambda: serializers.FloatField(),
+    "decimal": lambda: serializers.DecimalField(max_digits=DECIMAL_MAX_DIGITS, decimal_places=DECIMAL_PLACES),
+    "boolean": lambda: serializers.BooleanField(),
+    "date": lambda: serializers.DateField(),
+    "timestamp": lambda: serializers.DateTimeField(),
+    "json": lambda: serializers.JSONField(),
+}
+
+
+class IndexSerializer(serializers.Serializer):
+    columns = serializers.ListField(child=serializers.CharField(), min_length=1)
+    unique = serializers.BooleanField(default=False)
+    name = serializers.RegexField(r"^[A-Za-z_][A-Za-z0-9_]*$", max_length=63, required=False)
+
+
+class PartitionSerializer(serializers.Serializer):
+    column = serializers.CharField(default="id")
+    # Ids per partition for "id", "day" or "month" for a timestamp column
+    interval = serializers.JSONField()
+
+
+class SearchSerializer(serializers.Serializer):
+    # Searched string columns, none disables the search
+    columns = serializers.ListField(child=serializers.CharField())
+    # Text search configuration, e.g. "english"
+    config = serializers.RegexField(r"^[a-z_]+$", max_length=63, default="simple")
 
 
 class TableUpdateSerializer(serializers.Serializer):
     field_types = serializers.ListField(child=serializers.CharField())
     field_titles = serializers.ListField(child=serializers.CharField())
+    indexes = IndexSerializer(many=True, required=False)
+    search = SearchSerializer(required=False)
 
     def validate_field_types(self, value):
         for field_type in value:
-            if field_type not in ["string", "number", "boolean"]:
+            if field_type not in FIELD_TYPES:
                 raise serializers.ValidationError(
-                    "Invalid field type. Field types must be 'string', 'number', or 'boolean'."
+                    f"Invalid field type. Field types must be one of: {', '.join(FIELD_TYPES)}."
                 )
         return value
 
@@ -27,13 +63,41 @@ class TableUpdateSerializer(serializers.Serializer):
 
 
 class TableCreateSerializer(TableUpdateSerializer):
-    table_name = serializers.CharField()
+    # An identifier short enough for the prefixed table name to fit the 63 characters of PostgreSQL
+    table_name = serializers.RegexField(r"^[A-Za-z_][A-Za-z0-9_]*$", max_length=45)
+    partition = PartitionSerializer(required=False)
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+
+        partition = attrs.get("partition")
+        if partition:
+            titles = [title.lower().replace(" ", "_") for title in attrs["field_titles"]]
+            column_type = dict(zip(titles, attrs["field_types"])).get(partition["column"])
+            interval = partition["interval"]
+
+            error = None
+            if partition["column"] == "id":
+                if not isinstance(interval, int) or isinstance(interval, bool) or interval < 1:
+                    error = "The interval of id partitions must be a positive integer."
+            elif column_type == "timestamp":
+                if interval not in TIMESTAMP_INTERVALS:
+                    error = f"The interval of timestamp partitions must be one of: {', '.join(TIMESTAMP_INTERVALS)}."
+            else:
+                error = "Tables can be partitioned on id or on a timestamp column."
+
+            if error:
+                raise serializers.ValidationError({"partition": [error]})
+
+        return attrs
 
     def validate_table_name(self, value):
         # Check if a table with the given name already exists
         table_exists = DynamicModel.objects.filter(name=value).first()
         if table_exists:
             raise serializers.ValidationError(f"A table with the name '{value}' already exists.")
+        if SchemaJob.objects.filter(kind="create", table_name=value, status__in=["pending", "running"]).exists():
+            raise serializers.ValidationError(f"A table with the name '{value}' is being created.")
         return value
 
 
@@ -41,16 +105,86 @@ def create_dynamic_serializer(columns):
     fields = {}
     for column, column_type in columns.items():
         field_name = column.lower().replace(" ", "_")
-        if column_type == "string":
-            field = serializers.CharField()
-        elif column_type == "number":
-            field = serializers.FloatField()
-        elif column_type == "boolean":
-            field = serializers.BooleanField()
-        else:
-            field = serializers.CharField()  # Customize based on your specific column types
-
-        fields[field_name] = field
+        fields[field_name] = SERIALIZER_FIELDS[column_type]()
 
     DynamicSerializer = type("DynamicSerializer", (serializers.Serializer,), fields)
     return DynamicSerializer
+
+
+class QueryFilterSerializer(serializers.Serializer):
+    column = serializers.CharField()
+    op = serializers.ChoiceField(choices=["eq", "ne", "lt", "lte", "gt", "gte", "in", "isnull"], default="eq")
+    value = serializers.JSONField()
+
+
+class QueryAggregateSerializer(serializers.Serializer):
+    function = serializers.ChoiceField(choices=["count", "sum", "avg", "min", "max"])
+    column = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        if attrs["function"] != "count" and "column" not in attrs:
+            raise serializers.ValidationError(f"The '{attrs['function']}' aggregate requires a column.")
+        return attrs
+
+
+class RowQuerySerializer(serializers.Serializer):
+    fields = serializers.ListField(child=serializers.CharField(), required=False)
+    filters = QueryFilterSerializer(many=True, required=False)
+    order_by = serializers.ListField(child=serializers.CharField(), required=False)
+    group_by = serializers.ListField(child=serializers.CharField(), required=False)
+    aggregates = QueryAggregateSerializer(many=True, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=10000, default=1000)
+
+
+class RowSelectionSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    filters = QueryFilterSerializer(many=True, required=False, allow_empty=False)
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filters" in attrs):
+            raise serializers.ValidationError("Provide either ids or filters to select rows.")
+        return attrs
+
+
+class RowUpdateSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    filters = QueryFilterSerializer(many=True, required=False, allow_empty=False)
+    values = serializers.DictField(required=False, allow_empty=False)
+    rows = serializers.ListField(child=serializers.DictField(), required=False, allow_empty=False)
+
+    def validate(self, attrs):
+        if "rows" in attrs:
+            if set(attrs) != {"rows"}:
+                raise serializers.ValidationError("rows cannot be combined with ids, filters or values.")
+            for row in attrs["rows"]:
+                if not isinstance(row.get("id"), int) or isinstance(row.get("id"), bool):
+                    raise serializers.ValidationError("Every row needs an integer id.")
+        elif "values" not in attrs:
+            raise serializers.ValidationError("Provide values to set on the selected rows, or rows.")
+        elif ("ids" in attrs) == ("filters" in attrs):
+            raise serializers.ValidationError("Provide either ids or filters to select rows.")
+        return attrs
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=["insert", "update", "delete"])
+    table = serializers.CharField()
+    # The row of an insert, or the columns set by an update
+    values = serializers.DictField(required=False)
+    # The row changed by an update
+    id = serializers.IntegerField(required=False)
+    # The rows removed by a delete
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+
+    def validate(self, attrs):
+        required = {"insert": ["values"], "update": ["id", "values"], "delete": ["ids"]}[attrs["op"]]
+        missing = [field for field in required if field not in attrs]
+        if missing:
+            raise serializers.ValidationError(f"A {attrs['op']} operation requires {' and '.join(missing)}.")
+        if attrs["op"] == "update" and not attrs["values"]:
+            raise serializers.ValidationError("An update operation requires values.")
+        return attrs
+
+
+class BatchSerializer(serializers.Serializer):
+    operations = BatchOperationSerializer(many=True, allow_empty=False)
@@ -0,0 +1,73 @@
+"""
+Parameterized insert statements for dynamic tables.
+
+Statements are cached per table and column set. On PostgreSQL they are additionally ``PREPARE``d
+once per database connection so repeated inserts skip parsing and planning on the server. The
+statement name includes the table id and schema version, so a schema change simply makes the
+next insert prepare a new statement.
+"""
+import functools
+import hashlib
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def generate_insert_query(connection, table_name, columns, placeholder="%s"):
+    """
+    Return a parameterized ``INSERT`` of ``columns`` into ``table_name``. ``placeholder`` is a
+    format string receiving the 1-based parameter position, e.g. ``"${}"`` for ``PREPARE``.
+    """
+    quote_name = connection.ops.quote_name
+    return _build_insert_query(quote_name(table_name), tuple(quote_name(column) for column in columns), placeholder)
+
+
+# Keyed on strings only, connections are per thread and must not be kept alive by the cache
+@functools.lru_cache(maxsize=1024)
+def _build_insert_query(quoted_table, quoted_columns, placeholder):
+    placeholders = ", ".join(placeholder.format(position) for position in range(1, len(quoted_columns) + 1))
+    return f"INSERT INTO {quoted_table} ({', '.join(quoted_columns)}) VALUES ({placeholders})"
+
+
+def get_statement_name(table, columns):
+    key = f"{table.db_table}:{table.id}:{table.version}:{','.join(columns)}"
+    return f"table_builder_insert_{hashlib.md5(key.encode()).hexdigest()[:16]}"
+
+
+def prepare_insert(connection, cursor, table, columns):
+    """
+    Make sure the insert of ``columns`` into ``table`` is prepared on the current connection and
+    return the name of the prepared statement.
+    """
+    name = get_statement_name(table, columns)
+    prepared = connection.__dict__.get("table_builder_prepared")
+    if prepared is None:
+        # A pooled connection can come back with statements prepared by an earlier borrower
+        cursor.execute("SELECT name FROM pg_prepared_statements")
+        prepared = connection.__dict__["table_builder_prepared"] = {row[0] for row in cursor.fetchall()}
+
+    if name not in prepared:
+        cursor.execute(f"PREPARE {name} AS {generate_insert_query(connection, table.db_table, columns, '${}')}")
+        prepared.add(name)
+    return name
+
+
+def execute_insert(connection, table, data):
+    """
+    Insert one row given as a ``{column: value}`` mapping into the dynamic ``table``.
+    """
+    columns = tuple(data)
+    params = table.get_db_prep_values(connection, data, columns)
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            name = prepare_insert(connection, cursor, table, columns)
+            cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(columns))})", params)
+        else:
+            cursor.execute(generate_insert_query(connection, table.db_table, columns), params)
+
+
+@receiver(connection_created)
+def forget_prepared_statements(sender, connection, **kwargs):
+    # Prepared statements belong to the server session, which may or may not be the previous one
+    connection.__dict__.pop("table_builder_prepared", None)
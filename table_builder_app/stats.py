@@ -0,0 +1,85 @@
+"""
+Size and column statistics of dynamic tables.
+
+The row count is the exact counter kept on ``DynamicModel``. On PostgreSQL the planner
+statistics add the estimated row count (``pg_class.reltuples``), the on-disk size and per-column
+null fraction, distinct values and value range (``pg_stats``), all of which are only as fresh as
+the last ``ANALYZE``. Other databases report the exact row count only.
+"""
+
+# Column types whose values can be ordered, so the range of their statistics is meaningful
+ORDERED_TYPES = {"string", "text", "number", "bigint", "double", "decimal", "date", "timestamp"}
+
+
+def get_table_stats(connection, schema, table, analyze=False):
+    """
+    Return the statistics of the dynamic table ``schema`` whose ``DynamicModel`` is ``table``.
+    Runs ``ANALYZE`` on the table first when ``analyze`` is true.
+    """
+    stats = {
+        "row_count": table.row_count,
+        "estimated_row_count": None,
+        "total_bytes": None,
+        "table_bytes": None,
+        "data_version": table.data_version,
+        "last_modified": table.data_modified_at,
+        "columns": {
+            column: {"type": field_type, "null_fraction": None, "distinct": None, "min": None, "max": None}
+            for column, field_type in schema.columns.items()
+        },
+    }
+    if connection.vendor != "postgresql":
+        return stats
+
+    with connection.cursor() as cursor:
+        if analyze:
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(schema.db_table)}")
+
+        cursor.execute(
+            "SELECT reltuples, pg_total_relation_size(oid), pg_relation_size(oid) FROM pg_class "
+            "WHERE oid = to_regclass(%s)",
+            [schema.db_table],
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return stats
+
+        reltuples, stats["total_bytes"], stats["table_bytes"] = row
+        # reltuples is -1 until the table is vacuumed or analyzed for the first time
+        if reltuples >= 0:
+            stats["estimated_row_count"] = int(reltuples)
+
+        cursor.execute(
+            "SELECT attname, null_frac, n_distinct FROM pg_stats "
+            "WHERE schemaname = current_schema() AND tablename = %s",
+            [schema.db_table],
+        )
+        for column, null_fraction, n_distinct in cursor.fetchall():
+            if column not in stats["columns"]:
+                continue
+            # A negative n_distinct is the ratio of distinct values to rows
+            if n_distinct < 0:
+                n_distinct = -n_distinct * max(reltuples, 0)
+            stats["columns"][column].update(null_fraction=null_fraction, distinct=round(n_distinct))
+
+            if schema.columns[column] in ORDERED_TYPES:
+                minimum, maximum = get_column_range(connection, cursor, schema, column)
+                stats["columns"][column].update(min=minimum, max=maximum)
+
+    return stats
+
+
+def get_column_range(connection, cursor, schema, column):
+    """
+    Estimate the smallest and largest value of ``column`` from its histogram bounds and most
+    common values, which together cover the sampled range.
+    """
+    db_type = schema.model_fields[column].db_type(connection)
+    cursor.execute(
+        f"SELECT min(value), max(value) FROM pg_stats, unnest("
+        f"coalesce(histogram_bounds::text::{db_type}[], '{{}}') || "
+        f"coalesce(most_common_vals::text::{db_type}[], '{{}}')) AS value "
+        f"WHERE schemaname = current_schema() AND tablename = %s AND attname = %s",
+        [schema.db_table, column],
+    )
+    return cursor.fetchone()
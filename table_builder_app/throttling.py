@@ -0,0 +1,168 @@
+"""
+Token bucket throttles of row writes.
+
+Every client and every table has a bucket of ``burst`` tokens refilled at ``rate`` tokens per
+second, a write takes one token and is answered with 429 and ``Retry-After`` when the bucket is
+empty. Buckets are configured per scope in ``TABLE_BUILDER_THROTTLE_RATES`` and kept in the Django
+cache ``TABLE_BUILDER_THROTTLE_CACHE``, which has to be shared between processes (e.g. Redis or
+Memcached) for the limits to apply to a deployment rather than to each process. Reads are not
+throttled.
+
+Concurrent requests only change a bucket with atomic cache operations: tokens are taken with
+``decr``, and the refill of every interval is made by the one request that ``add``s the
+interval's key, so a bucket never hands out more tokens than it holds.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+# Shortest interval between two refills of a bucket, in seconds
+MIN_REFILL_INTERVAL = 0.1
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_bucket(self):
+        """
+        Return the ``{"rate": ..., "burst": ...}`` of the scope, or None when it is not throttled.
+        """
+        return getattr(settings, "TABLE_BUILDER_THROTTLE_RATES", {}).get(self.scope)
+
+    def get_cache_keys(self, request, view):
+        """
+        Return the keys of the buckets the request takes a token from.
+        """
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        if request.method in SAFE_METHODS:
+            return True
+
+        bucket = self.get_bucket()
+        keys = self.get_cache_keys(request, view) if bucket else []
+        if not keys:
+            return True
+
+        cache = caches[getattr(settings, "TABLE_BUILDER_THROTTLE_CACHE", "default")]
+        interval = self.get_refill_interval(bucket)
+        now = time.time()
+
+        taken = []
+        for key in keys:
+            if not self.take_token(cache, key, bucket, interval, now):
+                # Tokens already taken from the other buckets are given back
+                for taken_key in taken:
+                    self.give_back_token(cache, taken_key)
+                self.wait_seconds = interval - now % interval
+                return False
+            taken.append(key)
+        return True
+
+    def get_refill_interval(self, bucket):
+        """
+        Return the seconds between two refills: the time ``rate`` takes to refill a whole number of
+        tokens, at least ``MIN_REFILL_INTERVAL``, so that refills add exactly ``rate`` tokens per second.
+        """
+        return math.ceil(bucket["rate"] * MIN_REFILL_INTERVAL) / bucket["rate"]
+
+    def take_token(self, cache, key, bucket, interval, now):
+        # A bucket left alone for burst / rate seconds is full again and needs no entry
+        timeout = math.ceil(bucket["burst"] / bucket["rate"] + interval)
+        tokens_key = f"{key}:tokens"
+        refilled_key = f"{key}:refilled"
+
+        slot = int(now // interval)
+        if cache.add(f"{key}:slot:{slot}", True, timeout=math.ceil(interval) + 1):
+            self.refill(cache, tokens_key, refilled_key, bucket, interval, slot, timeout)
+
+        try:
+            tokens = cache.decr(tokens_key)
+        except ValueError:
+            # A new bucket starts full
+            if cache.add(tokens_key, bucket["burst"] - 1, timeout=timeout):
+                return True
+            tokens = cache.decr(tokens_key)
+
+        if tokens < 0:
+            self.give_back_token(cache, key)
+            return False
+        return True
+
+    def give_back_token(self, cache, key):
+        try:
+            cache.incr(f"{key}:tokens")
+        except ValueError:
+            # Expired meanwhile, the bucket starts full again
+            pass
+
+    def refill(self, cache, tokens_key, refilled_key, bucket, interval, slot, timeout):
+        """
+        Add the tokens of the intervals since the last refill, made once per interval.
+        """
+        if cache.add(refilled_key, slot, timeout=timeout):
+            return
+        last_slot = cache.get(refilled_key, slot)
+        cache.set(refilled_key, slot, timeout=timeout)
+
+        # interval * rate is a whole number of tokens, the rounding only drops float errors
+        tokens = round((slot - last_slot) * interval * bucket["rate"])
+        if tokens <= 0:
+            return
+        try:
+            tokens = cache.incr(tokens_key, tokens)
+        except ValueError:
+            return
+        if tokens > bucket["burst"]:
+            cache.decr(tokens_key, tokens - bucket["burst"])
+        cache.touch(tokens_key, timeout=timeout)
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class ClientRateThrottle(TokenBucketThrottle):
+    scope = "client"
+
+    def get_cache_keys(self, request, view):
+        user = getattr(request, "user", None)
+        client = user.pk if user is not None and user.is_authenticated else self.get_ident(request)
+        return [f"table_builder:throttle:client:{client}"]
+
+
+class TableRateThrottle(TokenBucketThrottle):
+    """
+    Throttles the table of the ``table_name`` URL argument, or the tables returned by the view's
+    ``get_throttled_tables(request)``, e.g. those of a batch.
+    """
+
+    scope = "table"
+
+    def get_cache_keys(self, request, view):
+        table_name = view.kwargs.get("table_name")
+        if table_name:
+            table_names = [table_name]
+        elif hasattr(view, "get_throttled_tables"):
+            table_names = view.get_throttled_tables(request)
+        else:
+            table_names = []
+        return [f"table_builder:throttle:table:{table_name}" for table_name in table_names]
+
+
+def get_throttle_wait(request, view, throttle_classes):
+    """
+    Check the throttles of a view that is not a DRF view. Returns None when the request is
+    allowed, or the seconds to wait before retrying it.
+    """
+    for throttle_class in throttle_classes:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, view):
+            return throttle.wait()
+    return None
@@ -1,47 +1,239 @@
-from .models import DynamicModel
-
-
-from django.db import connections, models
-from .serializers import TableCreateSerializer, TableUpdateSerializer, create_dynamic_serializer
+from .models import DynamicModel, SchemaJob
+
+
+from django.db import connections, transaction
+from django.db.models import F
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from .serializers import (
+    BatchSerializer,
+    RowQuerySerializer,
+    RowSelectionSerializer,
+    RowUpdateSerializer,
+    TableCreateSerializer,
+    TableUpdateSerializer,
+)
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
-
-
-class DynamicModelMetaclass(models.base.ModelBase):
-    def __new__(cls, name, bases, attrs):
-        attrs["__module__"] = __name__
-        return super().__new__(cls, name, bases, attrs)
-
-
-def get_field_by_type(field_type):
-    if field_type == "string":
-        return models.CharField(max_length=255)
-    elif field_type == "number":
-        return models.IntegerField()
-    elif field_type == "boolean":
-        return models.BooleanField()
-    else:
-        raise ValueError(f"Unsupported field type: {field_type}")
+from rest_framework import serializers, status
+from rest_framework.parsers import JSONParser
+from rest_framework.settings import api_settings
+
+from . import caching, idempotency, locks, metrics, registry
+from .query import (
+    compile_batch_update,
+    compile_delete,
+    compile_query,
+    compile_update,
+    convert_values,
+    split_selection,
+)
+from .parsers import NDJSONParser
+from .renderers import COLUMNAR_RENDERERS, FAST_JSON_RENDERERS, CSVRenderer, NDJSONRenderer, RowStreamRenderer
+from .jobs import enqueue_job
+from .partitions import ensure_partitions, list_partitions
+from .search import generate_search_query, get_search_params, prepare_search
+from .schema import (
+    SchemaChangeError,
+    combine_columns,
+    create_table,
+    get_columns,
+    get_db_table,
+    prepare_indexes,
+    update_table,
+)
+from .statements import execute_insert
+from .stats import get_table_stats
+from .throttling import ClientRateThrottle, TableRateThrottle
+
+# Maximum number of rows validated and written together by the bulk endpoint
+BULK_CHUNK_SIZE = 1000
+
+# Maximum number of operations of one request to the batch endpoint
+MAX_BATCH_OPERATIONS = 10000
+
+# Page sizes for keyset pagination of ListRowsAPIView
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Number of rows fetched per round trip from the server-side cursor of streaming exports
+EXPORT_CHUNK_SIZE = 2000
+
+# Set on responses answered from a previous request with the same idempotency key
+REPLAYED_HEADERS = {"Idempotent-Replayed": "true"}
+
+# Throttles of the views writing rows, see table_builder_app.throttling
+WRITE_THROTTLES = [ClientRateThrottle, TableRateThrottle]
+
+
+def is_async(request):
+    return request.query_params.get("async", "").lower() in ("1", "true", "yes")
+
+
+def table_busy(table_name):
+    """
+    Answer a write that timed out waiting for a schema change of table ``table_name``.
+    """
+    return Response(
+        {"error": f"The table '{table_name}' is busy with a schema change, retry later."},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(locks.RETRY_AFTER)},
+    )
+
+
+def needs_search_support(connection, data):
+    return bool(data.get("search", {}).get("columns")) and connection.vendor != "postgresql"
+
+
+def job_accepted(job):
+    """
+    Answer a schema change queued as ``job`` with its status URL.
+    """
+    status_url = reverse("schema-job", args=[job.id])
+    return Response(
+        {"job": job.id, "status": job.status, "status_url": status_url},
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": status_url},
+    )
+
+
+def insert_rows(connection, table_name, columns, rows):
+    """
+    Insert ``rows`` (sequences of values ordered like ``columns``) using parameterized multi-row
+    INSERT statements, split so a statement never exceeds the backend's parameter limit.
+    """
+    quoted_columns = ", ".join(connection.ops.quote_name(column) for column in columns)
+    row_placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+
+    batch_size = len(rows)
+    if connection.features.max_query_params:
+        batch_size = max(1, connection.features.max_query_params // max(1, len(columns)))
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start : start + batch_size]
+            placeholders = ", ".join([row_placeholder] * len(batch))
+            params = [value for row in batch for value in row]
+            cursor.execute(
+                f"INSERT INTO {connection.ops.quote_name(table_name)} ({quoted_columns}) VALUES {placeholders}", params
+            )
 
 
-def combine_columns(existing_columns, new_columns):
-    combined_dict = dict(existing_columns)
-    for key, value in new_columns.items():
-        if key in combined_dict:
-            combined_dict[key] = new_columns[key]
+def generate_batch_updates(connection, table, rows):
+    """
+    Return ``(query, params, many)`` statements giving every row of ``rows`` (dicts with an
+    ``id``) its own values. Rows are grouped by the columns they set; on PostgreSQL each group is
+    sent as batched ``UPDATE ... FROM (VALUES ...)`` statements, elsewhere as one parameterized
+    ``UPDATE`` executed for all rows of the group.
+    """
+    groups = {}
+    for row in rows:
+        values = convert_values(table, {key: value for key, value in row.items() if key != "id"}, key="rows")
+        if values:
+            groups.setdefault(tuple(values), []).append([row["id"], *table.get_db_prep_values(connection, values)])
+    return generate_grouped_updates(connection, table, groups)
+
+
+def generate_grouped_updates(connection, table, groups):
+    """
+    Return the ``(query, params, many)`` statements of ``groups``, lists of ``[id, *values]`` rows
+    prepared for the database and keyed by the columns they set.
+    """
+    statements = []
+    for columns, group in groups.items():
+        if connection.vendor == "postgresql":
+            batch_size = min(BULK_CHUNK_SIZE, (connection.features.max_query_params or 65535) // (len(columns) + 1))
+            for offset in range(0, len(group), batch_size):
+                query, params = compile_batch_update(connection, table, columns, group[offset : offset + batch_size])
+                statements.append((query, params, False))
         else:
-            combined_dict[key] = value
-    return combined_dict
-
-
-def generate_insert_query(table_name, data):
-    columns = ", ".join(data.keys())
-    values = ", ".join([f"'{value}'" if isinstance(value, str) else str(value) for value in data.values()])
-
-    insert_query = f"INSERT INTO {table_name} ({columns}) VALUES ({values});"
-    return insert_query
+            assignments = ", ".join(f"{connection.ops.quote_name(column)} = %s" for column in columns)
+            query = f"UPDATE {connection.ops.quote_name(table.db_table)} SET {assignments} WHERE id = %s"
+            statements.append((query, [[*values, row_id] for row_id, *values in group], True))
+    return statements
+
+
+def get_projection(fields_param, columns):
+    """
+    Return the column names requested by a comma separated ``fields`` query parameter, validated
+    against ``columns``, without duplicates. All columns are returned when no fields are requested.
+    """
+    if not fields_param:
+        return list(columns)
+
+    fields = [field.strip() for field in fields_param.split(",") if field.strip() and field.strip() != "id"]
+    fields = list(dict.fromkeys(fields))
+    unknown_fields = [field for field in fields if field not in columns]
+    if unknown_fields:
+        raise ValueError(f"Unknown fields: {', '.join(unknown_fields)}.")
+    return fields
+
+
+def get_page_params(query_params):
+    """
+    Parse the ``after`` cursor and ``limit`` keyset pagination parameters. Missing values are None.
+    """
+    after = query_params.get("after")
+    limit = query_params.get("limit")
+
+    try:
+        after = int(after) if after is not None else None
+        limit = int(limit) if limit is not None else None
+    except ValueError:
+        raise ValueError("after and limit must be integers.")
+
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}.")
+    return after, limit
+
+
+def generate_select_query(connection, table_name, columns, after=None, limit=None):
+    """
+    Build a parameterized SELECT of ``id`` and ``columns`` ordered by ``id``, starting after the
+    ``after`` cursor so that every page is an index range scan on the primary key.
+    """
+    select_list = ", ".join(connection.ops.quote_name(column) for column in ["id", *columns])
+    query = f"SELECT {select_list} FROM {connection.ops.quote_name(table_name)}"
+    params = []
+
+    if after is not None:
+        query += " WHERE id > %s"
+        params.append(after)
+
+    query += " ORDER BY id"
+
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+
+    return query, params
+
+
+def fetch_row_batches(connection, query, params, batch_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the rows of ``query`` in lists of at most ``batch_size`` rows, read through a server-side
+    cursor on PostgreSQL so memory stays flat regardless of the table size.
+    """
+    # The named cursor must live inside a transaction, otherwise it is declared WITH HOLD and
+    # PostgreSQL materializes the whole result when the implicit transaction commits.
+    with transaction.atomic(using=connection.alias), connection.chunked_cursor() as cursor:
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
+
+def set_validators(response, etag, last_modified):
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(last_modified)
+    # Clients may keep listings but have to revalidate them before reuse
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 
 class TableCreateAPIView(APIView):
@@ -49,38 +241,29 @@ class TableCreateAPIView(APIView):
         serializer = TableCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        field_types = serializer.validated_data["field_types"]
-        field_titles = serializer.validated_data["field_titles"]
-        model_name = serializer.validated_data["table_name"]
-
-        # Generate fields dynamically based on the provided field types and titles
-        model_fields = {}
-        dynamic_fileds = {}
-        for index, field_title in enumerate(field_titles):
-            field_type = field_types[index]
-            model_fields[field_title.lower().replace(" ", "_")] = get_field_by_type(field_type)
-            dynamic_fileds[field_title.lower().replace(" ", "_")] = field_type
-
-        # Create the dynamic model class using the custom metaclass
-        model_class = DynamicModelMetaclass(model_name, (models.Model,), model_fields)
-
         # Get the default database connection
         connection = connections["default"]
 
-        schema_editor = connection.schema_editor()
+        partition = serializer.validated_data.get("partition")
+        if partition and connection.vendor != "postgresql":
+            return Response({"partition": ["Partitioned tables need PostgreSQL."]}, status=status.HTTP_400_BAD_REQUEST)
 
-        with connection.schema_editor() as schema_editor:
-            try:
-                schema_editor.create_model(model_class)
-            except Exception as e:
-                return Response({"error": str(e), "description": "problem with creating dynamic model"}, status=500)
+        if needs_search_support(connection, serializer.validated_data):
+            return Response({"search": ["Full-text search needs PostgreSQL."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        if is_async(request):
+            model_name = serializer.validated_data["table_name"]
+            columns = get_columns(serializer.validated_data["field_titles"], serializer.validated_data["field_types"])
+            prepare_indexes(connection, get_db_table(model_name), serializer.validated_data.get("indexes", []), columns)
+            prepare_search(serializer.validated_data.get("search"), columns)
+            return job_accepted(enqueue_job("create", model_name, serializer.validated_data))
 
-        # Store the dynamically created model's app label and model name
         try:
-            dynamic_model = DynamicModel(name=model_name, columns=dynamic_fileds)
-            dynamic_model.save()
-        except Exception as e:
-            return Response({"error": str(e), "description": "problem with saving dynamic model context"}, status=500)
+            create_table(connection, serializer.validated_data)
+        except SchemaChangeError as e:
+            if locks.is_lock_timeout(e.error):
+                return table_busy(serializer.validated_data["table_name"])
+            return Response({"error": str(e.error), "description": e.description}, status=500)
 
         return Response({"success": "Dynamic model created and applied"}, status=status.HTTP_201_CREATED)
 
@@ -90,9 +273,6 @@ class TableUpdateAPIView(APIView):
         serializer = TableUpdateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        field_types = serializer.validated_data["field_types"]
-        field_titles = serializer.validated_data["field_titles"]
-
         connection = connections["default"]
 
         # Check if table exist
@@ -103,98 +283,727 @@ class TableUpdateAPIView(APIView):
                 {"error": f"A table with the name '{table_name}' does not exist."}, status=status.HTTP_404_NOT_FOUND
             )
 
-        # Generate fields dynamically based on the provided field types and titles
-        new_colimns = {}
-        for index, field_title in enumerate(field_titles):
-            field_type = field_types[index]
-            new_colimns[field_title.lower().replace(" ", "_")] = field_type
-
-        all_columns = combine_columns(table.columns, new_colimns)
+        if needs_search_support(connection, serializer.validated_data):
+            return Response({"search": ["Full-text search needs PostgreSQL."]}, status=status.HTTP_400_BAD_REQUEST)
 
-        model_fields = {}
-        for column, type in all_columns.items():
-            model_fields[column] = get_field_by_type(type)
-
-        # Create the dynamic model class using the custom metaclass
-        model_class = DynamicModelMetaclass(table_name, (models.Model,), model_fields)
+        if is_async(request):
+            columns = combine_columns(
+                table.columns,
+                get_columns(serializer.validated_data["field_titles"], serializer.validated_data["field_types"]),
+            )
+            prepare_indexes(
+                connection,
+                get_db_table(table_name),
+                serializer.validated_data.get("indexes", []),
+                columns,
+                table.indexes,
+            )
+            prepare_search(serializer.validated_data.get("search"), columns)
+            return job_accepted(enqueue_job("update", table_name, serializer.validated_data))
 
-        # Get the default database connection
-        connection = connections["default"]
+        try:
+            update_table(connection, table, serializer.validated_data)
+        except SchemaChangeError as e:
+            if locks.is_lock_timeout(e.error):
+                return table_busy(table_name)
+            return Response({"error": str(e.error), "description": e.description}, status=500)
 
-        schema_editor = connection.schema_editor()
+        return Response({"success": "Dynamic model updated"})
 
-        # Delete existing table
-        with connection.schema_editor() as schema_editor:
-            schema_editor.execute(f"DROP TABLE table_builder_app_{table_name};")
-            schema_editor.create_model(model_class)
 
-        table.columns = all_columns
-        table.save()
+class SchemaJobAPIView(APIView):
+    def get(self, request, job_id):
+        job = SchemaJob.objects.filter(id=job_id).first()
+        if not job:
+            return Response({"error": f"A job with the id {job_id} does not exist."}, status=status.HTTP_404_NOT_FOUND)
 
-        return Response({"success": "Dynamic model updated"})
+        return Response(
+            {
+                "job": job.id,
+                "kind": job.kind,
+                "table_name": job.table_name,
+                "status": job.status,
+                "result": job.result,
+                "attempts": job.attempts,
+                "created_at": job.created_at,
+                "started_at": job.started_at,
+                "finished_at": job.finished_at,
+            }
+        )
 
 
 class CreateRowAPIView(APIView):
+    throttle_classes = WRITE_THROTTLES
+
     def post(self, request, table_name):
 
         # Check if table exist
-        table = DynamicModel.objects.filter(name=table_name).first()
+        with metrics.phase("metadata"):
+            table = registry.get_table_schema(table_name)
 
         if not table:
             return Response(
                 {"error": f"A table with the name '{table_name}' does not exist."}, status=status.HTTP_404_NOT_FOUND
             )
 
-        dynamic_serializer = create_dynamic_serializer(table.columns)
-        serializer = dynamic_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        try:
+            idempotency_key = idempotency.get_key(request)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        request_hash = idempotency.get_request_hash(request.data) if idempotency_key else None
 
-        connection = connections["default"]
+        with metrics.phase("validation"):
+            serializer = table.serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
 
         # Get the default database connection
         connection = connections["default"]
 
-        schema_editor = connection.schema_editor()
+        ensure_partitions(connection, table, [serializer.validated_data])
+
+        # Insert in dynamic table, unless a previous request with the same idempotency key did
+        data = {"success": "Row inserted"}
+        try:
+            with transaction.atomic(using=connection.alias):
+                replayed = idempotency_key and not idempotency.claim_key(
+                    connection, table_name, idempotency_key, data, request_hash
+                )
+                if not replayed:
+                    locks.lock_table(connection, table_name)
+                    execute_insert(connection, table, serializer.validated_data)
+                    caching.bump_data_version(table_name, row_delta=1)
+        except Exception as e:
+            if locks.is_lock_timeout(e):
+                return table_busy(table_name)
+            raise
+
+        if replayed:
+            try:
+                stored = idempotency.get_response(table_name, idempotency_key, request_hash)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            return Response(stored, headers=REPLAYED_HEADERS)
 
-        # Insert in dynamic table
-        with connection.schema_editor() as schema_editor:
-            schema_editor.execute(generate_insert_query(f"table_builder_app_{table_name}", serializer.validated_data))
+        metrics.record_rows("written", 1)
 
-        return Response({"success": "Row inserted"})
+        return Response(data)
 
 
 class ListRowsAPIView(APIView):
+    renderer_classes = [
+        *FAST_JSON_RENDERERS,
+        *api_settings.DEFAULT_RENDERER_CLASSES,
+        NDJSONRenderer,
+        CSVRenderer,
+        *COLUMNAR_RENDERERS,
+    ]
+    throttle_classes = WRITE_THROTTLES
+
     def get(self, request, table_name):
 
         # Check if table exist
-        table = DynamicModel.objects.filter(name=table_name).first()
+        with metrics.phase("metadata"):
+            table = registry.get_table_schema(table_name)
 
         if not table:
             return Response(
                 {"error": f"A table with the name '{table_name}' does not exist."}, status=status.HTTP_404_NOT_FOUND
             )
 
-        dynamic_serializer = create_dynamic_serializer(table.columns)
+        # Full-text search with ?q=, ranked and paginated by offset
+        q = request.query_params.get("q")
+        stream = isinstance(request.accepted_renderer, RowStreamRenderer)
+        try:
+            fields = get_projection(request.query_params.get("fields"), table.columns)
+            if q is None:
+                after, limit = get_page_params(request.query_params)
+            else:
+                offset, limit = get_search_params(request.query_params, MAX_PAGE_SIZE)
+            stream_options = request.accepted_renderer.get_stream_options(request.query_params) if stream else {}
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if q is not None and not table.search:
+            return Response(
+                {"error": f"Full-text search is not enabled for the table '{table_name}'."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        connection = connections["default"]
+        # Listings of unchanged data are answered with 304 Not Modified
+        with metrics.phase("metadata"):
+            versions = caching.get_data_version(table_name)
+
+        if not versions:
+            return Response(
+                {"error": f"A table with the name '{table_name}' does not exist."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        data_version, data_modified_at = versions
+        variant_key = caching.get_variant_key(request)
+        etag = caching.get_etag(table, data_version, variant_key)
+        last_modified = int(data_modified_at.timestamp())
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return set_validators(not_modified, etag, last_modified)
 
         # Get the default database connection
         connection = connections["default"]
 
+        # Stream exports (?format=ndjson / csv / arrow / parquet) straight from the cursor
+        if stream:
+            if q is None:
+                query, params = generate_select_query(connection, table.db_table, fields, after=after, limit=limit)
+            else:
+                query, params = generate_search_query(connection, table, fields, q, offset, limit)
+            batches = (table.from_db(["id", *fields], batch) for batch in fetch_row_batches(connection, query, params))
+            types = ["bigint", *(table.columns[field] for field in fields)]
+            response = StreamingHttpResponse(
+                request.accepted_renderer.render_rows(["id", *fields], batches, types, **stream_options),
+                content_type=request.accepted_renderer.media_type,
+            )
+            return set_validators(response, etag, last_modified)
+
+        result_cache = caching.get_result_cache()
+        cache_key = caching.get_cache_key(table, data_version, variant_key)
+        data = result_cache.get(cache_key) if result_cache else None
+
+        if data is None:
+            try:
+                if q is None:
+                    data = self.read_rows(connection, table, fields, after, limit)
+                else:
+                    data = self.search_rows(connection, table, fields, q, offset, limit)
+            except Exception as e:
+                return Response({"error": str(e)}, status=500)
+
+            # Full listings of large tables would take the memory of many pages
+            if result_cache and caching.is_cacheable(data):
+                result_cache.set(cache_key, data)
+
+        return set_validators(Response(data), etag, last_modified)
+
+    def read_rows(self, connection, table, fields, after, limit):
+        paginated = after is not None or limit is not None
+        if paginated and limit is None:
+            limit = DEFAULT_PAGE_SIZE
+
         # Get data from table
         with connection.cursor() as cursor:
+            # Fetch one extra row to find out whether there is a next page
+            query, params = generate_select_query(
+                connection,
+                table.db_table,
+                fields,
+                after=after,
+                limit=limit + 1 if paginated else None,
+            )
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+        next_after = None
+        if paginated and len(rows) > limit:
+            rows = rows[:limit]
+            next_after = rows[-1][0]
+
+        metrics.record_rows("read", len(rows))
+
+        with metrics.phase("serialization"):
+            encode_row = table.get_row_encoder(fields)
+            results = [encode_row(row) for row in rows]
+
+        if paginated:
+            return {"results": results, "next": next_after}
+        return results
+
+    def search_rows(self, connection, table, fields, q, offset, limit):
+        limit = limit or DEFAULT_PAGE_SIZE
+
+        with connection.cursor() as cursor:
+            # Fetch one extra row to find out whether there is a next page
+            cursor.execute(*generate_search_query(connection, table, fields, q, offset, limit + 1))
+            rows = cursor.fetchall()
+
+        next_offset = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_offset = offset + limit
+
+        metrics.record_rows("read", len(rows))
+
+        with metrics.phase("serialization"):
+            encode_row = table.get_row_encoder(fields)
+            results = [encode_row(row) for row in rows]
+
+        return {"results": results, "next": next_offset}
+
+    def patch(self, request, table_name):
+
+        # Check if table exist
+        with metrics.phase("metadata"):
+            table = registry.get_table_schema(table_name)
+
+        if not table:
+            return Response(
+                {"error": f"A table with the name '{table_name}' does not exist."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        serializer = RowUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Get the default database connection
+        connection = connections["default"]
+
+        with metrics.phase("validation"):
+            if "rows" in serializer.validated_data:
+                statements = generate_batch_updates(connection, table, serializer.validated_data["rows"])
+            else:
+                values = serializer.validated_data["values"]
+                statements = [
+                    (*compile_update(connection, table, values, selection), False)
+                    for selection in split_selection(connection, serializer.validated_data, reserved=len(values))
+                ]
+
+        # Rows whose partition column changes move to partitions that may not exist yet
+        if table.partition and table.partition["column"] != "id":
+            rows = serializer.validated_data.get("rows") or [serializer.validated_data["values"]]
+            ensure_partitions(
+                connection,
+                table,
+                [convert_values(table, {key: value for key, value in row.items() if key != "id"}) for row in rows],
+            )
+
+        updated = 0
+        try:
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                locks.lock_table(connection, table_name)
+                for query, params, many in statements:
+                    if many:
+                        cursor.executemany(query, params)
+                    else:
+                        cursor.execute(query, params)
+                    updated += cursor.rowcount
+                if updated:
+                    caching.bump_data_version(table_name)
+        except Exception as e:
+            if locks.is_lock_timeout(e):
+                return table_busy(table_name)
+            return Response({"error": str(e)}, status=500)
+
+        metrics.record_rows("written", updated)
+
+        return Response({"updated": updated})
+
+    def delete(self, request, table_name):
+
+        # Check if table exist
+        with metrics.phase("metadata"):
+            table = registry.get_table_schema(table_name)
+
+        if not table:
+            return Response(
+                {"error": f"A table with the name '{table_name}' does not exist."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        serializer = RowSelectionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Get the default database connection
+        connection = connections["default"]
+
+        statements = [
+            compile_delete(connection, table, selection)
+            for selection in split_selection(connection, serializer.validated_data)
+        ]
+
+        deleted = 0
+        try:
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                locks.lock_table(connection, table_name)
+                for query, params in statements:
+                    cursor.execute(query, params)
+                    deleted += cursor.rowcount
+                if deleted:
+                    caching.bump_data_version(table_name, row_delta=-deleted)
+        except Exception as e:
+            if locks.is_lock_timeout(e):
+                return table_busy(table_name)
+            return Response({"error": str(e)}, status=500)
+
+        metrics.record_rows("written", deleted)
+
+        return Response({"deleted": deleted})
+
+
+class BulkCreateRowsAPIView(APIView):
+    parser_classes = [JSONParser, NDJSONParser]
+    throttle_classes = WRITE_THROTTLES
+
+    def post(self, request, table_name):
+
+        # Check if table exist
+        with metrics.phase("metadata"):
+            table = registry.get_table_schema(table_name)
+
+        if not table:
+            return Response(
+                {"error": f"A table with the name '{table_name}' does not exist."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response({"error": "Expected a list of rows."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            chunk_size = min(int(request.query_params.get("chunk_size", BULK_CHUNK_SIZE)), BULK_CHUNK_SIZE)
+        except ValueError:
+            return Response({"error": "chunk_size must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        chunk_size = max(chunk_size, 1)
+
+        # Every chunk is claimed with its own key, "<Idempotency-Key>:<chunk>", bound to the rows of
+        # the chunk and the chunk size. Retries can fix the failed chunks and resend the whole request.
+        try:
+            idempotency_key = idempotency.get_key(request)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        dynamic_serializer = table.serializer
+        columns = list(table.columns)
+
+        # Get the default database connection
+        connection = connections["default"]
+
+        inserted = 0
+        chunks = []
+        for chunk_index, start in enumerate(range(0, len(rows), chunk_size)):
+            chunk = rows[start : start + chunk_size]
+            report = {"chunk": chunk_index, "rows": len(chunk), "inserted": 0}
+
+            serializer = dynamic_serializer(data=chunk, many=True)
+            with metrics.phase("validation"):
+                valid = serializer.is_valid()
+            if not valid:
+                # Report errors by position in the request so clients can resubmit failing rows
+                report["errors"] = {
+                    start + index: errors for index, errors in enumerate(serializer.errors) if errors
+                }
+                chunks.append(report)
+                continue
+
+            values = [table.get_db_prep_values(connection, row, columns) for row in serializer.validated_data]
+            chunk_key = f"{idempotency_key}:{chunk_index}" if idempotency_key else None
+            request_hash = idempotency.get_request_hash(chunk, chunk_size) if idempotency_key else None
             try:
+                ensure_partitions(connection, table, serializer.validated_data)
+                with transaction.atomic():
+                    replayed = chunk_key and not idempotency.claim_key(
+                        connection, table_name, chunk_key, {**report, "inserted": len(values)}, request_hash
+                    )
+                    if not replayed:
+                        locks.lock_table(connection, table_name)
+                        insert_rows(connection, table.db_table, columns, values)
+                        caching.bump_data_version(table_name, row_delta=len(values))
+            except Exception as e:
+                if locks.is_lock_timeout(e):
+                    # The following chunks would wait for the schema change as well
+                    if not inserted:
+                        return table_busy(table_name)
+                    report["error"] = "The table is busy with a schema change, retry later."
+                    chunks.append(report)
+                    break
+                report["error"] = str(e)
+                chunks.append(report)
+                continue
+
+            if replayed:
+                try:
+                    report = {**idempotency.get_response(table_name, chunk_key, request_hash), "replayed": True}
+                except ValueError as e:
+                    if not inserted:
+                        return Response({"error": str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+                    report["error"] = str(e)
+                    chunks.append(report)
+                    continue
+            else:
+                report["inserted"] = len(values)
+                metrics.record_rows("written", len(values))
+            inserted += report["inserted"]
+            chunks.append(report)
+
+        failed = any("errors" in chunk or "error" in chunk for chunk in chunks)
+        if not failed:
+            response_status = status.HTTP_200_OK
+        elif inserted:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
 
-                cursor.execute(f"SELECT * FROM table_builder_app_{table_name};")
-                rows = cursor.fetchall()
-                columns = [col[0] for col in cursor.description]
+        return Response({"inserted": inserted, "chunks": chunks}, status=response_status)
+
+
+class BatchAPIView(APIView):
+    """
+    Insert, update and delete rows of several tables in one transaction. Operations are grouped by
+    table and sent as batched statements: inserts by column set, updates by the columns they set.
+    """
+
+    throttle_classes = WRITE_THROTTLES
+
+    def get_throttled_tables(self, request):
+        """
+        Return the existing tables written by the batch, each takes a token of its table throttle.
+        """
+        operations = request.data.get("operations") if isinstance(request.data, dict) else None
+        if not isinstance(operations, list):
+            return []
+        table_names = {operation.get("table") for operation in operations if isinstance(operation, dict)}
+        return sorted(
+            table_name
+            for table_name in table_names
+            if isinstance(table_name, str) and registry.get_table_schema(table_name)
+        )
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        operations = serializer.validated_data["operations"]
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            return Response(
+                {"error": f"A batch holds at most {MAX_BATCH_OPERATIONS} operations."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Get the default database connection
+        connection = connections["default"]
+
+        # Validate every operation before writing anything, errors are reported by position
+        tables = {}
+        errors = {}
+        with metrics.phase("validation"):
+            for index, operation in enumerate(operations):
+                table_name = operation["table"]
+                if table_name not in tables:
+                    table = registry.get_table_schema(table_name)
+                    tables[table_name] = table and {"schema": table, "inserts": {}, "updates": {}, "deletes": set()}
+
+                group = tables[table_name]
+                if group is None:
+                    errors[index] = [f"A table with the name '{table_name}' does not exist."]
+                    continue
+
+                try:
+                    if operation["op"] == "insert":
+                        row_serializer = group["schema"].serializer(data=operation["values"])
+                        row_serializer.is_valid(raise_exception=True)
+                        row = row_serializer.validated_data
+                        group["inserts"].setdefault(tuple(row), []).append(row)
+                    elif operation["op"] == "update":
+                        # Later updates of the same row win
+                        values = convert_values(group["schema"], operation["values"])
+                        group["updates"].setdefault(operation["id"], {}).update(values)
+                    else:
+                        group["deletes"].update(operation["ids"])
+                except serializers.ValidationError as e:
+                    errors[index] = e.detail
+
+        if errors:
+            return Response({"operations": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        for group in tables.values():
+            rows = [row for rows in group["inserts"].values() for row in rows]
+            partition = group["schema"].partition
+            if partition and partition["column"] != "id":
+                rows += list(group["updates"].values())
+            ensure_partitions(connection, group["schema"], rows)
+
+        counts = {}
+        try:
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                # Tables are written in a fixed order so concurrent batches lock them in the same order
+                for table_name in sorted(tables):
+                    locks.lock_table(connection, table_name)
+                    counts[table_name] = self.write_table(connection, cursor, tables[table_name])
+                    if any(counts[table_name].values()):
+                        row_delta = counts[table_name]["inserted"] - counts[table_name]["deleted"]
+                        caching.bump_data_version(table_name, row_delta=row_delta)
+        except Exception as e:
+            if locks.is_lock_timeout(e):
+                return table_busy(table_name)
+            return Response({"error": str(e)}, status=500)
+
+        totals = {key: sum(count[key] for count in counts.values()) for key in ("inserted", "updated", "deleted")}
+        metrics.record_rows("written", sum(totals.values()))
+
+        return Response({**totals, "tables": counts})
+
+    def write_table(self, connection, cursor, group):
+        table = group["schema"]
+        count = {"inserted": 0, "updated": 0, "deleted": 0}
+
+        for columns, rows in group["inserts"].items():
+            values = [table.get_db_prep_values(connection, row, columns) for row in rows]
+            insert_rows(connection, table.db_table, columns, values)
+            count["inserted"] += len(rows)
+
+        updates = {}
+        for row_id, values in sorted(group["updates"].items()):
+            updates.setdefault(tuple(values), []).append([row_id, *table.get_db_prep_values(connection, values)])
+        for query, params, many in generate_grouped_updates(connection, table, updates):
+            if many:
+                cursor.executemany(query, params)
+            else:
+                cursor.execute(query, params)
+            count["updated"] += cursor.rowcount
+
+        for selection in split_selection(connection, {"ids": sorted(group["deletes"])}):
+            cursor.execute(*compile_delete(connection, table, selection))
+            count["deleted"] += cursor.rowcount
+
+        return count
+
+
+class QueryRowsAPIView(APIView):
+    renderer_classes = [*FAST_JSON_RENDERERS, *api_settings.DEFAULT_RENDERER_CLASSES]
+
+    def post(self, request, table_name):
+
+        # Check if table exist
+        with metrics.phase("metadata"):
+            table = registry.get_table_schema(table_name)
+
+        if not table:
+            return Response(
+                {"error": f"A table with the name '{table_name}' does not exist."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        serializer = RowQuerySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Get the default database connection
+        connection = connections["default"]
 
-                data = []
-                for row in rows:
-                    data.append(dict(zip(columns, row)))
+        query, params, columns, types = compile_query(connection, table, serializer.validated_data)
 
-                serializer = dynamic_serializer(data=data, many=True)
-                serializer.is_valid()
-                return Response(serializer.data)
+        with connection.cursor() as cursor:
+            try:
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
             except Exception as e:
                 return Response({"error": str(e)}, status=500)
+
+        metrics.record_rows("read", len(rows))
+
+        # Encoded like listings, e.g. decimals as exact strings
+        with metrics.phase("serialization"):
+            encode_row = table.get_result_encoder(columns, types)
+            results = [encode_row(row) for row in rows]
+
+        return Response({"results": results})
+
+
+class TableStatsAPIView(APIView):
+    def get(self, request, table_name):
+
+        # Check if table exist
+        with metrics.phase("metadata"):
+            schema = registry.get_table_schema(table_name)
+            table = DynamicModel.objects.filter(name=table_name).first()
+
+        if not schema or not table:
+            return Response(
+                {"error": f"A table with the name '{table_name}' does not exist."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        # Refresh the planner statistics first with ?analyze=true
+        analyze = request.query_params.get("analyze", "").lower() in ("1", "true", "yes")
+
+        try:
+            stats = get_table_stats(connections["default"], schema, table, analyze=analyze)
+        except Exception as e:
+            return Response({"error": str(e)}, status=500)
+
+        return Response(stats)
+
+
+class TablePartitionsAPIView(APIView):
+    def get(self, request, table_name):
+
+        # Check if table exist
+        with metrics.phase("metadata"):
+            table = registry.get_table_schema(table_name)
+
+        if not table:
+            return Response(
+                {"error": f"A table with the name '{table_name}' does not exist."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        if not table.partition:
+            return Response({"partition": None, "partitions": []})
+
+        with connections["default"].cursor() as cursor:
+            partitions = list_partitions(cursor, table.db_table)
+
+        return Response({"partition": table.partition, "partitions": partitions})
+
+
+class TablePartitionAPIView(APIView):
+    def delete(self, request, table_name, partition_name):
+
+        # Check if table exist
+        with metrics.phase("metadata"):
+            table = registry.get_table_schema(table_name)
+
+        if not table:
+            return Response(
+                {"error": f"A table with the name '{table_name}' does not exist."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        connection = connections["default"]
+        quote_name = connection.ops.quote_name
+        # With ?detach=true the partition is kept as a standalone table, either way its rows leave this one
+        detach = request.query_params.get("detach", "").lower() in ("1", "true", "yes")
+
+        partition = None
+        if table.partition:
+            with connection.cursor() as cursor:
+                partitions = list_partitions(cursor, table.db_table)
+            partition = next((item for item in partitions if item["name"] == partition_name), None)
+
+        if not partition:
+            return Response(
+                {"error": f"The table '{table_name}' has no partition named '{partition_name}'."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        try:
+            with metrics.phase("schema_editor"), connection.schema_editor() as schema_editor:
+                locks.lock_table(connection, table_name, exclusive=True)
+                with connection.cursor() as cursor:
+                    cursor.execute(f"SELECT COUNT(*) FROM {quote_name(partition_name)}")
+                    removed = cursor.fetchone()[0]
+                if detach:
+                    schema_editor.execute(
+                        f"ALTER TABLE {quote_name(table.db_table)} DETACH PARTITION {quote_name(partition_name)}"
+                    )
+                else:
+                    schema_editor.execute(f"DROP TABLE {quote_name(partition_name)}")
+                caching.bump_data_version(table_name, row_delta=-removed)
+                # Other processes cache the partition bounds with the schema, a new version makes them reload
+                DynamicModel.objects.filter(name=table_name).update(version=F("version") + 1)
+        except Exception as e:
+            if locks.is_lock_timeout(e):
+                return table_busy(table_name)
+            return Response({"error": str(e), "description": "problem with removing partition"}, status=500)
+
+        registry.invalidate(table_name)
+
+        return Response({"detached" if detach else "dropped": partition_name, "rows": removed})
+
+
+class MetricsAPIView(APIView):
+    def get(self, request):
+        # The metrics are opt-in, like the middleware recording them
+        if not metrics.is_enabled():
+            return Response({"error": "Metrics are not enabled."}, status=status.HTTP_404_NOT_FOUND)
+        return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
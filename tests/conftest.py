@@ -0,0 +1,19 @@
+import pytest
+from django.core.cache import caches
+
+from table_builder_app import registry
+
+
+@pytest.fixture(autouse=True)
+def clear_table_registry():
+    # Test databases are rolled back between tests, cached table metadata must not outlive them
+    registry.clear()
+    yield
+    registry.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    yield
+    for cache in caches.all(initialized_only=True):
+        cache.clear()
@@ -0,0 +1,83 @@
+from django.db import connection
+from django.test import Client, TransactionTestCase
+from django.urls import reverse
+
+from table_builder_app import async_views
+
+
+class AsyncRowsViewTests(TransactionTestCase):
+    """
+    The async views use their own connections, so the table has to be committed.
+    """
+
+    def setUp(self):
+        data = {"table_name": "test_table", "field_types": ["string", "number"], "field_titles": ["Name", "Age"]}
+        Client().post(reverse("table-create"), data, content_type="application/json")
+
+    def tearDown(self):
+        with connection.schema_editor() as schema_editor:
+            schema_editor.execute("DROP TABLE IF EXISTS table_builder_app_test_table")
+
+    async def test_insert_and_list_rows(self):
+        try:
+            for age in range(3):
+                response = await self.async_client.post(
+                    reverse("async-row-create", args=["test_table"]),
+                    {"name": "John", "age": age},
+                    content_type="application/json",
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), {"success": "Row inserted"})
+
+            response = await self.async_client.get(reverse("async-rows-list", args=["test_table"]), {"limit": 2})
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            self.assertEqual([row["age"] for row in page["results"]], [0, 1])
+            self.assertEqual(page["results"][0]["name"], "John")
+
+            response = await self.async_client.get(
+                reverse("async-rows-list", args=["test_table"]), {"after": page["next"], "fields": "age"}
+            )
+            self.assertEqual(response.json(), {"results": [{"id": page["next"] + 1, "age": 2}], "next": None})
+        finally:
+            await async_views.close_pool()
+
+    async def test_retried_insert(self):
+        url = reverse("async-row-create", args=["test_table"])
+        try:
+            for _ in range(2):
+                response = await self.async_client.post(
+                    url, {"name": "John", "age": 1}, content_type="application/json", headers={"Idempotency-Key": "key"}
+                )
+                self.assertEqual(response.json(), {"success": "Row inserted"})
+            self.assertEqual(response.headers["Idempotent-Replayed"], "true")
+
+            response = await self.async_client.get(reverse("async-rows-list", args=["test_table"]))
+            self.assertEqual(len(response.json()), 1)
+        finally:
+            await async_views.close_pool()
+
+    async def test_key_reused_for_a_different_request(self):
+        url = reverse("async-row-create", args=["test_table"])
+        headers = {"Idempotency-Key": "key"}
+        try:
+            await self.async_client.post(
+                url, {"name": "John", "age": 1}, content_type="application/json", headers=headers
+            )
+            response = await self.async_client.post(
+                url, {"name": "Jim", "age": 2}, content_type="application/json", headers=headers
+            )
+            self.assertEqual(response.status_code, 422)
+        finally:
+            await async_views.close_pool()
+
+    async def test_invalid_row(self):
+        response = await self.async_client.post(
+            reverse("async-row-create", args=["test_table"]), {"name": "John"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"age": ["This field is required."]})
+
+    async def test_table_not_found(self):
+        response = await self.async_client.get(reverse("async-rows-list", args=["missing"]))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,92 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from table_builder_app.models import DynamicModel
+
+
+class BatchAPITests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("batch")
+
+        tables = [
+            {"table_name": "people", "field_types": ["string", "number"], "field_titles": ["Name", "Age"]},
+            {
+                "table_name": "events",
+                "field_types": ["string", "string"],
+                "field_titles": ["Kind", "Who"],
+                "indexes": [{"columns": ["kind"], "unique": True}],
+            },
+        ]
+        for data in tables:
+            self.client.post(reverse("table-create"), data, format="json")
+
+        rows = [{"name": "Alice", "age": 30}, {"name": "Bob", "age": 25}, {"name": "Carol", "age": 41}]
+        self.client.post(reverse("rows-bulk-create", args=["people"]), rows, format="json")
+        self.ids = {row["name"]: row["id"] for row in self.list_rows("people")}
+
+    def list_rows(self, table_name):
+        return self.client.get(reverse("rows-list", args=[table_name])).json()
+
+    def test_batch(self):
+        operations = [
+            {"op": "insert", "table": "people", "values": {"name": "Dave", "age": 19}},
+            {"op": "insert", "table": "events", "values": {"kind": "signup", "who": "Dave"}},
+            {"op": "insert", "table": "people", "values": {"name": "Eve", "age": 22}},
+            {"op": "update", "table": "people", "id": self.ids["Alice"], "values": {"age": 31}},
+            {"op": "update", "table": "people", "id": self.ids["Bob"], "values": {"age": 26}},
+            {"op": "update", "table": "people", "id": self.ids["Alice"], "values": {"name": "Alicia"}},
+            {"op": "delete", "table": "people", "ids": [self.ids["Carol"]]},
+        ]
+        response = self.client.post(self.url, {"operations": operations}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual((response.data["inserted"], response.data["updated"], response.data["deleted"]), (3, 2, 1))
+        self.assertEqual(response.data["tables"]["events"], {"inserted": 1, "updated": 0, "deleted": 0})
+
+        people = {row["name"]: row["age"] for row in self.list_rows("people")}
+        self.assertEqual(people, {"Alicia": 31, "Bob": 26, "Dave": 19, "Eve": 22})
+        self.assertEqual([row["who"] for row in self.list_rows("events")], ["Dave"])
+
+        self.assertEqual(DynamicModel.objects.get(name="people").row_count, 4)
+        self.assertEqual(DynamicModel.objects.get(name="events").row_count, 1)
+
+    def test_inserts_are_batched(self):
+        operations = [{"op": "insert", "table": "people", "values": {"name": f"P{i}", "age": i}} for i in range(50)]
+
+        # The table lock, one INSERT and the row counter update, between the savepoint statements
+        # of the transaction
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url, {"operations": operations}, format="json")
+        self.assertEqual(response.data["inserted"], 50)
+
+    def test_invalid_operations(self):
+        operations = [
+            {"op": "insert", "table": "people", "values": {"name": "Dave", "age": 19}},
+            {"op": "insert", "table": "people", "values": {"name": "Eve", "age": "old"}},
+            {"op": "update", "table": "people", "id": self.ids["Bob"], "values": {"height": 180}},
+            {"op": "delete", "table": "missing", "ids": [1]},
+        ]
+        response = self.client.post(self.url, {"operations": operations}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data["operations"]), {1, 2, 3})
+        self.assertEqual(len(self.list_rows("people")), 3)
+
+        response = self.client.post(self.url, {"operations": [{"op": "update", "table": "people"}]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_failed_batch_is_rolled_back(self):
+        operations = [
+            {"op": "delete", "table": "people", "ids": [self.ids["Alice"]]},
+            {"op": "insert", "table": "events", "values": {"kind": "signup", "who": "Dave"}},
+            {"op": "insert", "table": "events", "values": {"kind": "signup", "who": "Eve"}},
+        ]
+        response = self.client.post(self.url, {"operations": operations}, format="json")
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(len(self.list_rows("people")), 3)
+        self.assertEqual(self.list_rows("events"), [])
+        self.assertEqual(DynamicModel.objects.get(name="people").row_count, 3)
@@ -0,0 +1,74 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from django.db import connection
+
+
+class BulkCreateRowsAPIViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("rows-bulk-create", args=["test_table"])
+
+    def create_table(self):
+        data = {
+            "table_name": "test_table",
+            "field_types": ["string", "number", "boolean"],
+            "field_titles": ["Name", "Age", "Active"],
+        }
+        response = self.client.post(reverse("table-create"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def count_rows(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM table_builder_app_test_table;")
+            return cursor.fetchone()[0]
+
+    def test_successful_bulk_insert(self):
+        self.create_table()
+
+        rows = [{"name": f"John {i}", "age": i, "active": i % 2 == 0} for i in range(25)]
+        response = self.client.post(f"{self.url}?chunk_size=10", rows, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["inserted"], 25)
+        self.assertEqual([chunk["inserted"] for chunk in response.data["chunks"]], [10, 10, 5])
+        self.assertEqual(self.count_rows(), 25)
+
+    def test_bulk_insert_ndjson(self):
+        self.create_table()
+
+        body = "\n".join(json.dumps({"name": "O'Brien", "age": i, "active": True}) for i in range(3))
+        response = self.client.post(self.url, body, content_type="application/x-ndjson")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["inserted"], 3)
+        self.assertEqual(self.count_rows(), 3)
+
+    def test_bulk_insert_reports_invalid_chunks(self):
+        self.create_table()
+
+        rows = [
+            {"name": "John", "age": 1, "active": True},
+            {"name": "Jane", "age": 2, "active": True},
+            {"name": "Jack", "active": True},
+        ]
+        response = self.client.post(f"{self.url}?chunk_size=2", rows, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data["inserted"], 2)
+        self.assertEqual(response.data["chunks"][1]["errors"], {2: {"age": ["This field is required."]}})
+        self.assertEqual(self.count_rows(), 2)
+
+    def test_bulk_insert_table_not_found(self):
+        response = self.client.post(self.url, [], format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bulk_insert_requires_list(self):
+        self.create_table()
+
+        response = self.client.post(self.url, {"name": "John", "age": 30, "active": True}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
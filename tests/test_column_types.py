@@ -0,0 +1,154 @@
+import json
+import unittest
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from table_builder_app import registry
+from table_builder_app.models import DynamicModel
+from table_builder_app.renderers import ORJSONRenderer, orjson
+
+
+class ColumnTypesTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.columns = {
+            "title": "string",
+            "body": "text",
+            "small": "number",
+            "big": "bigint",
+            "ratio": "double",
+            "price": "decimal",
+            "flag": "boolean",
+            "day": "date",
+            "created": "timestamp",
+            "payload": "json",
+        }
+        data = {
+            "table_name": "test_table",
+            "field_titles": list(self.columns),
+            "field_types": list(self.columns.values()),
+        }
+        self.client.post(reverse("table-create"), data, format="json")
+
+        self.row = {
+            "title": "Row",
+            "body": "x" * 1000,
+            "small": 7,
+            "big": 2**40,
+            "ratio": 0.25,
+            "price": "12.5",
+            "flag": True,
+            "day": "2024-02-29",
+            "created": "2024-02-29T10:30:00Z",
+            "payload": {"tags": ["a", "b"], "nested": {"n": 1}},
+        }
+
+    def test_native_column_types(self):
+        with connection.cursor() as cursor:
+            description = connection.introspection.get_table_description(cursor, "table_builder_app_test_table")
+        introspection = connection.introspection
+        db_types = {column.name: introspection.get_field_type(column.type_code, column) for column in description}
+
+        self.assertEqual(db_types["big"], "BigIntegerField")
+        self.assertEqual(db_types["ratio"], "FloatField")
+        self.assertEqual(db_types["price"], "DecimalField")
+        self.assertEqual(db_types["day"], "DateField")
+        self.assertEqual(db_types["created"], "DateTimeField")
+        self.assertEqual(db_types["body"], "TextField")
+        self.assertEqual(db_types["payload"], "JSONField")
+        self.assertEqual(DynamicModel.objects.get(name="test_table").columns, self.columns)
+
+    def test_round_trip(self):
+        response = self.client.post(reverse("row-create", args=["test_table"]), self.row, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        row = self.client.get(reverse("rows-list", args=["test_table"])).data[0]
+
+        self.assertEqual(row["body"], self.row["body"])
+        self.assertEqual(row["big"], 2**40)
+        self.assertEqual(row["ratio"], 0.25)
+        self.assertEqual(row["price"], "12.5000000000")
+        self.assertEqual(row["day"], "2024-02-29")
+        self.assertEqual(row["created"], "2024-02-29T10:30:00Z")
+        self.assertEqual(row["payload"], self.row["payload"])
+
+    def test_row_encoder_matches_serializer(self):
+        self.client.post(reverse("row-create", args=["test_table"]), self.row, format="json")
+        schema = registry.get_table_schema("test_table")
+        fields = list(self.columns)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT id, {', '.join(fields)} FROM {schema.db_table}")
+            row = cursor.fetchone()
+
+        serializer = schema.serializer(data=dict(zip(fields, schema.from_db(["id", *fields], [row])[0][1:])))
+        serializer.is_valid(raise_exception=True)
+        self.assertEqual(schema.get_row_encoder(fields)(row), {"id": row[0], **serializer.data})
+
+    def test_rendered_rows(self):
+        self.client.post(reverse("row-create", args=["test_table"]), self.row, format="json")
+        response = self.client.get(reverse("rows-list", args=["test_table"]))
+
+        self.assertEqual(json.loads(response.content), response.data)
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    def test_orjson_renderer(self):
+        self.client.post(reverse("row-create", args=["test_table"]), self.row, format="json")
+        response = self.client.get(reverse("rows-list", args=["test_table"]))
+
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        self.assertEqual(json.loads(response.content)[0]["payload"], self.row["payload"])
+
+    def test_values_are_not_coerced(self):
+        url = reverse("row-create", args=["test_table"])
+
+        for column, value in [("small", 1.5), ("small", 2**31), ("title", "x" * 256), ("day", "tomorrow")]:
+            response = self.client.post(url, {**self.row, column: value}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, column)
+            self.assertIn(column, response.data)
+
+    def test_range_query_on_timestamp(self):
+        rows = [{**self.row, "created": f"2024-03-{day:02d}T00:00:00Z", "small": day} for day in range(1, 11)]
+        self.client.post(reverse("rows-bulk-create", args=["test_table"]), rows, format="json")
+
+        query = {
+            "fields": ["small", "payload"],
+            "filters": [
+                {"column": "created", "op": "gte", "value": "2024-03-04T00:00:00Z"},
+                {"column": "created", "op": "lt", "value": "2024-03-07T00:00:00Z"},
+            ],
+        }
+        response = self.client.post(reverse("rows-query", args=["test_table"]), query, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["small"] for row in response.data["results"]], [4, 5, 6])
+        self.assertEqual(response.data["results"][0]["payload"], self.row["payload"])
+
+    def test_update_typed_rows(self):
+        self.client.post(reverse("rows-bulk-create", args=["test_table"]), [self.row, self.row], format="json")
+        url = reverse("rows-list", args=["test_table"])
+        ids = [row["id"] for row in self.client.get(url).data]
+
+        data = {
+            "rows": [
+                {"id": ids[0], "payload": [1, 2], "price": "1.25", "created": "2025-01-01T00:00:00Z"},
+                {"id": ids[1], "payload": {}, "price": "3", "created": "2025-01-02T00:00:00Z"},
+            ]
+        }
+        response = self.client.patch(url, data, format="json")
+        self.assertEqual(response.data, {"updated": 2})
+
+        rows = {row["id"]: row for row in self.client.get(url).data}
+        self.assertEqual((rows[ids[0]]["payload"], rows[ids[0]]["price"]), ([1, 2], "1.2500000000"))
+        self.assertEqual((rows[ids[1]]["payload"], rows[ids[1]]["created"]), ({}, "2025-01-02T00:00:00Z"))
+
+    def test_invalid_field_type(self):
+        data = {"table_name": "other_table", "field_titles": ["a"], "field_types": ["float128"]}
+        response = self.client.post(reverse("table-create"), data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("timestamp", str(response.data["field_types"]))
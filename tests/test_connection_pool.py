@@ -0,0 +1,40 @@
+from django.db import connection
+from django.test import TransactionTestCase
+
+from table_builder_app import metrics
+from table_builder_app.backends.postgresql_pool.base import DatabaseWrapper, close_pools, pool_stats
+
+
+class PooledDatabaseWrapperTests(TransactionTestCase):
+    def setUp(self):
+        settings_dict = {
+            **connection.settings_dict,
+            "ENGINE": "table_builder_app.backends.postgresql_pool",
+            "CONN_MAX_AGE": 0,
+            "OPTIONS": {"pool": {"min_size": 1, "max_size": 1}},
+        }
+        self.wrapper = DatabaseWrapper(settings_dict, alias="pooled")
+
+    def tearDown(self):
+        self.wrapper.close()
+        close_pools()
+
+    def fetch_backend_pid(self):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            return cursor.fetchone()[0]
+
+    def test_connections_are_reused(self):
+        first_pid = self.fetch_backend_pid()
+        self.wrapper.close()
+        self.assertIsNone(self.wrapper.connection)
+
+        self.assertEqual(self.fetch_backend_pid(), first_pid)
+
+        stats = pool_stats()[f"pooled:{connection.settings_dict['NAME']}"]
+        self.assertEqual(stats["pool_max"], 1)
+        self.assertEqual(stats["requests_num"], 2)
+
+    def test_pool_stats_are_exposed(self):
+        self.fetch_backend_pid()
+        self.assertIn('table_builder_db_pool_pool_size{kind="sync",pool="pooled:', metrics.render())
@@ -43,6 +43,14 @@ class TableCreateAPIViewTests(APITestCase):
         response = self.client.post(self.url, data)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_invalid_table_name(self):
+        for table_name in ["x; DROP TABLE table_builder_app_dynamicmodel", "my-table", "1table", "t" * 46]:
+            data = {"field_types": ["string"], "field_titles": ["Name"], "table_name": table_name}
+            response = self.client.post(self.url, data)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("table_name", response.data)
+        self.assertFalse(DynamicModel.objects.exists())
+
     def test_duplicate_table_name(self):
         # Create a dynamic model instance with the same table name
         DynamicModel.objects.create(name="existing_table", columns={})
@@ -1,12 +1,17 @@
+import gc
+import weakref
+
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 from unittest.mock import patch, MagicMock
 
+from table_builder_app import registry
 from table_builder_app.models import DynamicModel
+from table_builder_app.statements import generate_insert_query, get_statement_name
 from table_builder_app.views import CreateRowAPIView
-from django.db import connection
+from django.db import connection, connections
 
 
 class CreateRowAPIViewTests(TestCase):
@@ -75,3 +80,54 @@ class CreateRowAPIViewTests(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(response.json(), {"name": ["This field is required."]})
+
+    def test_row_creation_uses_parameterized_insert(self):
+        create_url = reverse("table-create")
+        data = {
+            "table_name": "test_table",
+            "field_types": ["string", "number", "boolean"],
+            "field_titles": ["Name", "Age", "Active"],
+        }
+        self.client.post(create_url, data, format="json")
+
+        for age in range(3):
+            data = {"name": "O'Brien; DROP TABLE x; --", "age": age, "active": True}
+            response = self.client.post(self.url, data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT DISTINCT name FROM table_builder_app_test_table;")
+            self.assertEqual(cursor.fetchall(), [("O'Brien; DROP TABLE x; --",)])
+
+            table = registry.get_table_schema("test_table")
+            statement_name = get_statement_name(table, tuple(table.columns))
+            cursor.execute("SELECT COUNT(*) FROM pg_prepared_statements WHERE name = %s;", [statement_name])
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+    def test_insert_query_cache_does_not_keep_connections(self):
+        # Like the connection of a thread that ended
+        other = connections.create_connection("default")
+        query = generate_insert_query(other, "table_builder_app_test_table", ("name", "age"))
+        self.assertEqual(query, 'INSERT INTO "table_builder_app_test_table" ("name", "age") VALUES (%s, %s)')
+
+        reference = weakref.ref(other)
+        del other
+        gc.collect()
+        self.assertIsNone(reference())
+
+    def test_row_creation_mixed_case_table_name(self):
+        data = {
+            "table_name": "MyTable",
+            "field_types": ["string", "number"],
+            "field_titles": ["Name", "Age"],
+            "search": {"columns": ["Name"]},
+        }
+        self.client.post(reverse("table-create"), data, format="json")
+
+        response = self.client.post(reverse("row-create", args=["MyTable"]), {"name": "John", "age": 30}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        rows_url = reverse("rows-list", args=["MyTable"])
+        self.assertEqual(self.client.get(rows_url).json(), [{"id": 1, "name": "John", "age": 30}])
+        self.assertEqual(len(self.client.get(rows_url, {"q": "john"}).json()["results"]), 1)
+        self.assertEqual(len(self.client.get(rows_url, {"format": "ndjson"}).getvalue().splitlines()), 1)
@@ -0,0 +1,170 @@
+import csv
+import datetime
+import io
+import json
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from table_builder_app.renderers import ArrowRenderer
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class ExportRowsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("rows-list", args=["test_table"])
+
+        data = {
+            "table_name": "test_table",
+            "field_types": ["string", "number", "boolean"],
+            "field_titles": ["Name", "Age", "Active"],
+        }
+        self.client.post(reverse("table-create"), data, format="json")
+
+        rows = [{"name": f"John, {i}", "age": i, "active": i % 2 == 0} for i in range(3)]
+        self.client.post(reverse("rows-bulk-create", args=["test_table"]), rows, format="json")
+
+    def test_ndjson_export(self):
+        response = self.client.get(self.url, {"format": "ndjson", "fields": "name,age"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row["name"] for row in rows], ["John, 0", "John, 1", "John, 2"])
+        self.assertEqual(set(rows[0]), {"id", "name", "age"})
+
+    def test_csv_export(self):
+        response = self.client.get(self.url, {"format": "csv"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        rows = list(csv.DictReader(lines))
+        self.assertEqual(set(rows[0]), {"id", "name", "age", "active"})
+        self.assertEqual(len(rows), 3)
+        self.assertEqual((rows[0]["name"], rows[0]["age"], rows[0]["active"]), ("John, 0", "0", "True"))
+
+    def test_csv_export_of_json_columns(self):
+        data = {"table_name": "json_table", "field_types": ["json"], "field_titles": ["Extra"]}
+        self.client.post(reverse("table-create"), data, format="json")
+        url = reverse("rows-list", args=["json_table"])
+        row = {"extra": {"a": "x", "b": [1, None]}}
+        self.client.post(reverse("row-create", args=["json_table"]), row, format="json")
+
+        response = self.client.get(url, {"format": "csv"})
+        rows = list(csv.DictReader(b"".join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(json.loads(rows[0]["extra"]), {"a": "x", "b": [1, None]})
+
+    def test_export_table_not_found(self):
+        response = self.client.get(reverse("rows-list", args=["missing"]), {"format": "csv"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@skipUnless(pyarrow, "pyarrow is not installed")
+class ColumnarExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("rows-list", args=["test_table"])
+
+        data = {
+            "table_name": "test_table",
+            "field_types": ["string", "bigint", "double", "decimal", "boolean", "date", "timestamp", "json"],
+            "field_titles": ["Name", "Views", "Score", "Price", "Active", "Day", "Seen", "Extra"],
+        }
+        self.client.post(reverse("table-create"), data, format="json")
+
+        rows = [
+            {
+                "name": f"Row {i}",
+                "views": 2**40 + i,
+                "score": i / 2,
+                "price": "1.25",
+                "active": i % 2 == 0,
+                "day": "2023-07-01",
+                "seen": "2023-07-01T12:00:00Z",
+                "extra": {"tags": ["a"]},
+            }
+            for i in range(3)
+        ]
+        response = self.client.post(reverse("rows-bulk-create", args=["test_table"]), rows, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content)
+
+    def assert_rows(self, table):
+        self.assertEqual(table.schema.field("views").type, pyarrow.int64())
+        self.assertEqual(table.schema.field("price").type, pyarrow.decimal128(38, 10))
+        self.assertEqual(table.schema.field("seen").type, pyarrow.timestamp("us", tz="UTC"))
+
+        rows = table.sort_by("id").to_pylist()
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1]["views"], 2**40 + 1)
+        self.assertEqual(rows[1]["score"], 0.5)
+        self.assertEqual(rows[0]["price"], Decimal("1.25"))
+        self.assertEqual((rows[0]["active"], rows[1]["active"]), (True, False))
+        self.assertEqual(rows[0]["day"], datetime.date(2023, 7, 1))
+        self.assertEqual(rows[0]["seen"], datetime.datetime(2023, 7, 1, 12, tzinfo=datetime.timezone.utc))
+        self.assertEqual(json.loads(rows[0]["extra"]), {"tags": ["a"]})
+
+    def test_arrow_export(self):
+        response, content = self.export(format="arrow", compression="zstd")
+        self.assertEqual(response["Content-Type"], "application/vnd.apache.arrow.stream")
+        self.assert_rows(pyarrow.ipc.open_stream(content).read_all())
+
+    def test_parquet_export(self):
+        response, content = self.export(format="parquet")
+        self.assertEqual(response["Content-Type"], "application/vnd.apache.parquet")
+        self.assert_rows(pyarrow.parquet.read_table(io.BytesIO(content)))
+
+        _, content = self.export(format="parquet", fields="name", compression="none")
+        self.assertEqual(pyarrow.parquet.read_table(io.BytesIO(content)).column_names, ["id", "name"])
+
+    def test_invalid_compression(self):
+        response = self.client.get(self.url, {"format": "arrow", "compression": "snappy"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        error = pyarrow.ipc.open_stream(response.content).read_all().to_pylist()
+        self.assertEqual(error, [{"error": "compression must be one of: none, lz4, zstd."}])
+
+
+@skipUnless(pyarrow, "pyarrow is not installed")
+class ColumnarConversionTests(SimpleTestCase):
+    """
+    Raw values as SQLite returns them, which Arrow does not take as they are.
+    """
+
+    def render(self, field_type, values):
+        batches = [[(index, value) for index, value in enumerate(values)]]
+        content = b"".join(ArrowRenderer().render_rows(["id", "value"], batches, types=["bigint", field_type]))
+        return pyarrow.ipc.open_stream(content).read_all().column("value").to_pylist()
+
+    def test_dates(self):
+        values = self.render("date", ["2023-07-01", datetime.date(2023, 7, 2), None])
+        self.assertEqual(values, [datetime.date(2023, 7, 1), datetime.date(2023, 7, 2), None])
+
+    def test_timestamps(self):
+        noon = datetime.datetime(2023, 7, 1, 12)
+        values = self.render("timestamp", ["2023-07-01 12:00:00.5", noon, None])
+        utc_noon = noon.replace(tzinfo=datetime.timezone.utc)
+        self.assertEqual(values, [utc_noon.replace(microsecond=500000), utc_noon, None])
+
+    def test_decimals(self):
+        values = self.render("decimal", [1.25, 0.1 + 0.2, 3, None])
+        self.assertEqual(values, [Decimal("1.25"), Decimal("0.3"), Decimal(3), None])
+
+    def test_booleans(self):
+        self.assertEqual(self.render("boolean", [1, 0, None]), [True, False, None])
@@ -0,0 +1,113 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from table_builder_app.models import DynamicModel, IdempotencyKey
+
+
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        data = {"table_name": "test_table", "field_types": ["string", "number"], "field_titles": ["Name", "Age"]}
+        self.client.post(reverse("table-create"), data, format="json")
+
+    def count_rows(self):
+        return len(self.client.get(reverse("rows-list", args=["test_table"])).data)
+
+    def test_retried_row_insert(self):
+        url = reverse("row-create", args=["test_table"])
+        row = {"name": "John", "age": 30}
+
+        response = self.client.post(url, row, format="json", HTTP_IDEMPOTENCY_KEY="request-1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Idempotent-Replayed", response.headers)
+
+        # The claim and the lookup of the stored response, in a savepoint of the test transaction
+        with self.assertNumQueries(4):
+            response = self.client.post(url, row, format="json", HTTP_IDEMPOTENCY_KEY="request-1")
+        self.assertEqual(response.data, {"success": "Row inserted"})
+        self.assertEqual(response.headers["Idempotent-Replayed"], "true")
+
+        self.client.post(url, row, format="json", HTTP_IDEMPOTENCY_KEY="request-2")
+        self.client.post(url, row, format="json")
+
+        self.assertEqual(self.count_rows(), 3)
+        self.assertEqual(DynamicModel.objects.get(name="test_table").row_count, 3)
+
+    def test_invalid_row_does_not_claim_key(self):
+        url = reverse("row-create", args=["test_table"])
+
+        response = self.client.post(url, {"name": "John"}, format="json", HTTP_IDEMPOTENCY_KEY="request-1")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(url, {"name": "John", "age": 1}, format="json", HTTP_IDEMPOTENCY_KEY="request-1")
+        self.assertNotIn("Idempotent-Replayed", response.headers)
+        self.assertEqual(self.count_rows(), 1)
+
+    def test_retried_bulk_insert(self):
+        url = reverse("rows-bulk-create", args=["test_table"]) + "?chunk_size=2"
+        rows = [{"name": "John", "age": 1}, {"name": "Jim", "age": 2}, {"name": "Jane", "age": "x"}]
+
+        response = self.client.post(url, rows, format="json", HTTP_IDEMPOTENCY_KEY="bulk-1")
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+
+        # The client fixes the failed row and resends the whole request
+        rows[2]["age"] = 3
+        response = self.client.post(url, rows, format="json", HTTP_IDEMPOTENCY_KEY="bulk-1")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["inserted"], 3)
+        self.assertEqual(response.data["chunks"][0], {"chunk": 0, "rows": 2, "inserted": 2, "replayed": True})
+        self.assertEqual(response.data["chunks"][1], {"chunk": 1, "rows": 1, "inserted": 1})
+        self.assertEqual(self.count_rows(), 3)
+
+    def test_key_reused_for_a_different_request(self):
+        url = reverse("row-create", args=["test_table"])
+        self.client.post(url, {"name": "John", "age": 30}, format="json", HTTP_IDEMPOTENCY_KEY="request-1")
+
+        response = self.client.post(url, {"name": "Jim", "age": 31}, format="json", HTTP_IDEMPOTENCY_KEY="request-1")
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(self.count_rows(), 1)
+
+    def test_bulk_key_reused_with_a_different_chunk_size(self):
+        url = reverse("rows-bulk-create", args=["test_table"])
+        rows = [{"name": "John", "age": 1}, {"name": "Jim", "age": 2}, {"name": "Jane", "age": 3}]
+        self.client.post(f"{url}?chunk_size=2", rows, format="json", HTTP_IDEMPOTENCY_KEY="bulk-1")
+
+        response = self.client.post(f"{url}?chunk_size=1", rows, format="json", HTTP_IDEMPOTENCY_KEY="bulk-1")
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(self.count_rows(), 3)
+
+    def test_keys_are_scoped_by_table(self):
+        data = {"table_name": "other_table", "field_types": ["string"], "field_titles": ["Name"]}
+        self.client.post(reverse("table-create"), data, format="json")
+
+        for table_name in ["test_table", "other_table"]:
+            response = self.client.post(
+                reverse("row-create", args=[table_name]), {"name": "John", "age": 1}, HTTP_IDEMPOTENCY_KEY="same"
+            )
+            self.assertNotIn("Idempotent-Replayed", response.headers)
+
+    def test_invalid_key(self):
+        url = reverse("row-create", args=["test_table"])
+        response = self.client.post(url, {"name": "John", "age": 1}, HTTP_IDEMPOTENCY_KEY="x" * 300)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_purge_expired_keys(self):
+        IdempotencyKey.objects.create(table_name="test_table", key="new", response={})
+        IdempotencyKey.objects.create(
+            table_name="test_table", key="old", response={}, created_at=timezone.now() - timedelta(days=2)
+        )
+
+        out = StringIO()
+        call_command("purge_idempotency_keys", stdout=out)
+
+        self.assertEqual(out.getvalue().strip(), "Deleted 1 idempotency keys.")
+        self.assertEqual(list(IdempotencyKey.objects.values_list("key", flat=True)), ["new"])
@@ -0,0 +1,144 @@
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from table_builder_app.models import DynamicModel
+
+
+def get_indexes(table_name):
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, f"table_builder_app_{table_name}")
+    return {name: (info["columns"], info["unique"]) for name, info in constraints.items() if info["index"]}
+
+
+class TableCreateIndexTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_create_table_with_indexes(self):
+        data = {
+            "table_name": "test_table",
+            "field_types": ["string", "number", "boolean"],
+            "field_titles": ["Name", "Age", "Active"],
+            "indexes": [
+                {"columns": ["Age"]},
+                {"columns": ["name", "active"], "unique": True, "name": "test_table_name_active"},
+            ],
+        }
+        response = self.client.post(reverse("table-create"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        indexes = get_indexes("test_table")
+        self.assertEqual(indexes["table_builder_app_test_table_age_idx"], (["age"], False))
+        self.assertEqual(indexes["test_table_name_active"], (["name", "active"], True))
+        self.assertEqual(len(DynamicModel.objects.get(name="test_table").indexes), 2)
+
+    def test_index_name_clash(self):
+        for table_name in ("a", "b"):
+            data = {
+                "table_name": table_name,
+                "field_types": ["string"],
+                "field_titles": ["Name"],
+                "indexes": [{"columns": ["name"], "unique": True, "name": "name_uniq"}],
+            }
+            response = self.client.post(reverse("table-create"), data, format="json")
+
+        # Index names are shared by all tables of the schema
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(get_indexes("a")["name_uniq"], (["name"], True))
+        self.assertFalse(DynamicModel.objects.filter(name="b").exists())
+
+    def test_index_on_unknown_column(self):
+        data = {
+            "table_name": "test_table",
+            "field_types": ["string"],
+            "field_titles": ["Name"],
+            "indexes": [{"columns": ["age"]}],
+        }
+        response = self.client.post(reverse("table-create"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(DynamicModel.objects.filter(name="test_table").exists())
+
+
+class TableUpdateIndexTests(TransactionTestCase):
+    """
+    Runs outside of a transaction so indexes are built with CREATE INDEX CONCURRENTLY.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("table-update", args=["test_table"])
+
+        data = {"table_name": "test_table", "field_types": ["string"], "field_titles": ["Name"]}
+        self.client.post(reverse("table-create"), data, format="json")
+
+        rows = [{"name": "John"}, {"name": "John"}]
+        self.client.post(reverse("rows-bulk-create", args=["test_table"]), rows, format="json")
+
+    def tearDown(self):
+        with connection.schema_editor() as schema_editor:
+            schema_editor.execute("DROP TABLE IF EXISTS table_builder_app_test_table")
+            schema_editor.execute("DROP TABLE IF EXISTS table_builder_app_other_table")
+
+    def test_update_adds_index(self):
+        data = {"field_types": ["number"], "field_titles": ["Age"], "indexes": [{"columns": ["age", "name"]}]}
+        response = self.client.put(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        indexes = get_indexes("test_table")
+        self.assertEqual(indexes["table_builder_app_test_table_age_name_idx"], (["age", "name"], False))
+        self.assertEqual(DynamicModel.objects.get(name="test_table").indexes[0]["columns"], ["age", "name"])
+
+    def test_failed_unique_index_is_dropped(self):
+        data = {"field_types": [], "field_titles": [], "indexes": [{"columns": ["name"], "unique": True}]}
+        response = self.client.put(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        self.assertNotIn("table_builder_app_test_table_name_uniq", get_indexes("test_table"))
+        self.assertEqual(DynamicModel.objects.get(name="test_table").indexes, [])
+
+    def test_index_name_clash(self):
+        data = {
+            "table_name": "other_table",
+            "field_types": ["string"],
+            "field_titles": ["Name"],
+            "indexes": [{"columns": ["name"], "name": "name_idx"}],
+        }
+        self.client.post(reverse("table-create"), data, format="json")
+
+        data = {"field_types": [], "field_titles": [], "indexes": [{"columns": ["name"], "name": "name_idx"}]}
+        response = self.client.put(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(get_indexes("other_table")["name_idx"], (["name"], False))
+        self.assertNotIn("name_idx", get_indexes("test_table"))
+        self.assertEqual(DynamicModel.objects.get(name="test_table").indexes, [])
+
+    def test_index_name_reused_with_other_columns(self):
+        data = {
+            "field_types": ["number"],
+            "field_titles": ["Age"],
+            "indexes": [{"columns": ["name"], "name": "name_idx"}],
+        }
+        self.client.put(self.url, data, format="json")
+
+        data["indexes"] = [{"columns": ["age"], "name": "name_idx"}]
+        response = self.client.put(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(get_indexes("test_table")["name_idx"], (["name"], False))
+
+        # Repeating the same index is accepted
+        data["indexes"] = [{"columns": ["name"], "name": "name_idx"}]
+        response = self.client.put(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_update_records_index_of_interrupted_run(self):
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE INDEX table_builder_app_test_table_name_idx ON table_builder_app_test_table (name)")
+
+        data = {"field_types": [], "field_titles": [], "indexes": [{"columns": ["name"]}]}
+        response = self.client.put(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(DynamicModel.objects.get(name="test_table").indexes[0]["columns"], ["name"])
@@ -57,3 +57,50 @@ class ListRowsAPIViewTests(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual(response.data["error"], f"A table with the name '{table_name}' does not exist.")
+
+    def create_table_with_rows(self, count):
+        data = {
+            "table_name": "test_table",
+            "field_types": ["string", "number", "boolean"],
+            "field_titles": ["Name", "Age", "Active"],
+        }
+        self.client.post(reverse("table-create"), data, format="json")
+
+        rows = [{"name": f"John {i}", "age": i, "active": True} for i in range(count)]
+        response = self.client.post(reverse("rows-bulk-create", args=["test_table"]), rows, format="json")
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_keyset_pagination(self):
+        self.create_table_with_rows(5)
+
+        response = self.client.get(self.url, {"limit": 2})
+        assert response.status_code == status.HTTP_200_OK
+        assert [row["name"] for row in response.data["results"]] == ["John 0", "John 1"]
+
+        seen = [row["id"] for row in response.data["results"]]
+        while response.data["next"] is not None:
+            response = self.client.get(self.url, {"limit": 2, "after": response.data["next"]})
+            seen.extend(row["id"] for row in response.data["results"])
+
+        assert len(seen) == 5
+        assert seen == sorted(seen)
+
+    def test_column_projection(self):
+        self.create_table_with_rows(1)
+
+        response = self.client.get(self.url, {"fields": "name,active"})
+        assert response.status_code == status.HTTP_200_OK
+        assert set(response.data[0]) == {"id", "name", "active"}
+
+        response = self.client.get(self.url, {"fields": "name,active,name"})
+        assert response.status_code == status.HTTP_200_OK
+        assert list(response.data[0]) == ["id", "name", "active"]
+
+    def test_invalid_list_params(self):
+        self.create_table_with_rows(1)
+
+        response = self.client.get(self.url, {"fields": "name,unknown"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.url, {"limit": 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,54 @@
+from django.test import TestCase, modify_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from table_builder_app import metrics
+
+
+def get_sample(exposition, prefix):
+    for line in exposition.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+@modify_settings(MIDDLEWARE={"prepend": "table_builder_app.middleware.MetricsMiddleware"})
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        data = {"table_name": "test_table", "field_types": ["string"], "field_titles": ["Name"]}
+        self.client.post(reverse("table-create"), data, format="json")
+
+    def test_request_metrics_are_exposed(self):
+        before = metrics.render()
+        rows_written = 'table_builder_rows_total{endpoint="row-create",direction="written"}'
+        rows_read = 'table_builder_rows_total{endpoint="rows-list",direction="read"}'
+        list_requests = 'table_builder_requests_total{endpoint="rows-list",method="GET",status="200"}'
+
+        self.client.post(reverse("row-create", args=["test_table"]), {"name": "John"}, format="json")
+        self.client.get(reverse("rows-list", args=["test_table"]))
+
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+
+        exposition = response.content.decode()
+        self.assertEqual(get_sample(exposition, rows_written) - get_sample(before, rows_written), 1)
+        self.assertEqual(get_sample(exposition, rows_read) - get_sample(before, rows_read), 1)
+        self.assertEqual(get_sample(exposition, list_requests) - get_sample(before, list_requests), 1)
+        self.assertIn('table_builder_phase_duration_seconds_count{endpoint="rows-list",phase="render"}', exposition)
+        self.assertIn('table_builder_sql_queries_per_request_count{endpoint="row-create"}', exposition)
+        self.assertIn(
+            'table_builder_request_duration_seconds_bucket{endpoint="rows-list",method="GET",le="+Inf"}', exposition
+        )
+
+    @modify_settings(MIDDLEWARE={"remove": metrics.MIDDLEWARE})
+    def test_not_exposed_without_middleware(self):
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_hooks_without_middleware_do_nothing(self):
+        with metrics.phase("metadata"):
+            metrics.record_rows("read", 10)
@@ -0,0 +1,133 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from table_builder_app import registry
+from table_builder_app.models import DynamicModel
+
+
+class PartitionedTableTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def create_table(self, partition):
+        data = {
+            "table_name": "test_table",
+            "field_types": ["string", "timestamp"],
+            "field_titles": ["Name", "Created"],
+            "partition": partition,
+        }
+        return self.client.post(reverse("table-create"), data, format="json")
+
+    def get_partitions(self):
+        return self.client.get(reverse("table-partitions", args=["test_table"])).data["partitions"]
+
+    def test_id_partitions(self):
+        self.assertEqual(self.create_table({"column": "id", "interval": 10}).status_code, status.HTTP_201_CREATED)
+
+        rows = [{"name": f"John {i}", "created": "2024-03-01T00:00:00Z"} for i in range(25)]
+        response = self.client.post(reverse("rows-bulk-create", args=["test_table"]), rows, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        partitions = self.get_partitions()
+        self.assertEqual([(item["from"], item["to"]) for item in partitions[:3]], [(0, 10), (10, 20), (20, 30)])
+        # One block of headroom above the last id
+        self.assertGreaterEqual(partitions[-1]["to"], 40)
+
+        rows_url = reverse("rows-list", args=["test_table"])
+        ids = [row["id"] for row in self.client.get(rows_url).data]
+        first = [item for item in partitions if item["from"] <= ids[0] < item["to"]][0]
+
+        response = self.client.delete(reverse("table-partition", args=["test_table", first["name"]]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        removed = response.data["rows"]
+        self.assertGreater(removed, 0)
+        self.assertEqual(len(self.client.get(rows_url).data), 25 - removed)
+        self.assertEqual(DynamicModel.objects.get(name="test_table").row_count, 25 - removed)
+
+        # Later writes do not bring the dropped partition back
+        self.client.post(reverse("row-create", args=["test_table"]), rows[0], format="json")
+        self.assertNotIn(first["name"], [item["name"] for item in self.get_partitions()])
+
+    def test_timestamp_partitions(self):
+        self.assertEqual(
+            self.create_table({"column": "created", "interval": "month"}).status_code, status.HTTP_201_CREATED
+        )
+
+        url = reverse("row-create", args=["test_table"])
+        for created in ["2024-01-31T23:59:59Z", "2024-02-01T00:00:00Z", "2024-12-15T10:00:00+02:00"]:
+            response = self.client.post(url, {"name": "John", "created": created}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        partitions = self.get_partitions()
+        self.assertEqual(
+            [(item["from"].isoformat(), item["to"].isoformat()) for item in partitions],
+            [
+                ("2024-01-01T00:00:00+00:00", "2024-02-01T00:00:00+00:00"),
+                ("2024-02-01T00:00:00+00:00", "2024-03-01T00:00:00+00:00"),
+                ("2024-12-01T00:00:00+00:00", "2025-01-01T00:00:00+00:00"),
+            ],
+        )
+
+        # Filters on the partition column only scan the matching partitions
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "EXPLAIN SELECT * FROM table_builder_app_test_table WHERE created >= %s",
+                ["2024-12-01T00:00:00Z"],
+            )
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        self.assertIn(partitions[2]["name"], plan)
+        self.assertNotIn(partitions[0]["name"], plan)
+
+        rows_url = reverse("rows-list", args=["test_table"])
+        row_id = self.client.get(rows_url).data[0]["id"]
+        response = self.client.patch(
+            rows_url, {"ids": [row_id], "values": {"created": "2023-06-01T00:00:00Z"}}, format="json"
+        )
+        self.assertEqual(response.data, {"updated": 1})
+
+        url = reverse("table-partition", args=["test_table", partitions[1]["name"]])
+        response = self.client.delete(f"{url}?detach=true")
+        self.assertEqual(response.data, {"detached": partitions[1]["name"], "rows": 1})
+        self.assertEqual(len(self.get_partitions()), 3)
+        self.assertEqual(len(self.client.get(rows_url).data), 2)
+
+    @override_settings(TABLE_BUILDER_REGISTRY_CHECK_INTERVAL=0)
+    def test_partition_removed_by_another_worker(self):
+        self.create_table({"column": "created", "interval": "month"})
+        url = reverse("row-create", args=["test_table"])
+        row = {"name": "John", "created": "2024-01-15T00:00:00Z"}
+        self.assertEqual(self.client.post(url, row, format="json").status_code, status.HTTP_200_OK)
+
+        # Another worker caches the table with the bounds of its partitions
+        stale = registry.get_table_schema("test_table")
+        bounds = set(stale.partition_bounds)
+        partition = self.get_partitions()[0]
+        response = self.client.delete(reverse("table-partition", args=["test_table", partition["name"]]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stale.partition_bounds = bounds
+        registry._tables["test_table"] = stale
+
+        # It notices the new version and creates the partition again
+        self.assertEqual(self.client.post(url, row, format="json").status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get_partitions()[0]["name"], partition["name"])
+
+    def test_invalid_partition(self):
+        for partition in [
+            {"column": "id", "interval": 0},
+            {"column": "created", "interval": 5},
+            {"column": "name", "interval": "day"},
+        ]:
+            response = self.create_table(partition)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("partition", response.data)
+
+    def test_unpartitioned_table(self):
+        data = {"table_name": "test_table", "field_types": ["string"], "field_titles": ["Name"]}
+        self.client.post(reverse("table-create"), data, format="json")
+
+        self.assertEqual(self.get_partitions(), [])
+        response = self.client.delete(reverse("table-partition", args=["test_table", "anything"]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
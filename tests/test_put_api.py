@@ -113,3 +113,52 @@ class TableUpdateAPIViewTests(TestCase):
         self.assertEqual(
             response.json(), {"non_field_errors": ["field_types and field_titles must have the same length"]}
         )
+
+    def test_table_update_keeps_existing_rows(self):
+        create_url = reverse("table-create")
+        table_name = "test_table"
+
+        data = {
+            "table_name": table_name,
+            "field_types": ["string", "number"],
+            "field_titles": ["Name", "Age"],
+        }
+        response = self.client.post(create_url, data, format="json")
+
+        response = self.client.post(
+            reverse("row-create", args=[table_name]), {"name": "John", "age": 30}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        update_data = {
+            "field_types": ["boolean", "string"],
+            "field_titles": ["Active", "Age"],
+        }
+        response = self.client.put(self.url, update_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT name, age, active FROM table_builder_app_{table_name};")
+            rows = cursor.fetchall()
+
+        self.assertEqual(rows, [("John", "30", None)])
+
+    def test_table_update_opens_no_outer_transaction(self):
+        # SQLite's schema editor cannot be used inside an atomic block, it runs its own transaction
+        data = {"table_name": "test_table", "field_types": ["string"], "field_titles": ["Name"]}
+        self.client.post(reverse("table-create"), data, format="json")
+
+        depth = len(connection.atomic_blocks)
+        depths = []
+        schema_editor = connection.schema_editor
+
+        def record_depth(*args, **kwargs):
+            depths.append(len(connection.atomic_blocks))
+            return schema_editor(*args, **kwargs)
+
+        update_data = {"field_types": ["number"], "field_titles": ["Age"]}
+        with patch.object(connection, "schema_editor", side_effect=record_depth):
+            response = self.client.put(self.url, update_data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(depths), {depth})
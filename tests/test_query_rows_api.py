@@ -0,0 +1,97 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class QueryRowsAPIViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("rows-query", args=["test_table"])
+
+        data = {
+            "table_name": "test_table",
+            "field_types": ["string", "number", "boolean"],
+            "field_titles": ["Name", "Age", "Active"],
+        }
+        self.client.post(reverse("table-create"), data, format="json")
+
+        rows = [{"name": f"John {i}", "age": i * 10, "active": i % 2 == 0} for i in range(6)]
+        self.client.post(reverse("rows-bulk-create", args=["test_table"]), rows, format="json")
+
+    def test_filters_and_order(self):
+        query = {
+            "fields": ["name", "age"],
+            "filters": [
+                {"column": "age", "op": "gte", "value": 20},
+                {"column": "active", "value": True},
+            ],
+            "order_by": ["-age"],
+        }
+        response = self.client.post(self.url, query, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["name"] for row in response.data["results"]], ["John 4", "John 2"])
+        self.assertEqual(set(response.data["results"][0]), {"id", "name", "age"})
+
+    def test_in_filter_and_limit(self):
+        query = {"filters": [{"column": "name", "op": "in", "value": ["John 1", "John 3", "Jane"]}], "limit": 1}
+        response = self.client.post(self.url, query, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["name"] for row in response.data["results"]], ["John 1"])
+
+    def test_group_by_with_aggregates(self):
+        query = {
+            "group_by": ["active"],
+            "aggregates": [
+                {"function": "count"},
+                {"function": "sum", "column": "age"},
+                {"function": "max", "column": "age"},
+            ],
+            "order_by": ["active"],
+        }
+        response = self.client.post(self.url, query, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"],
+            [
+                {"active": False, "count": 3, "sum_age": 90, "max_age": 50},
+                {"active": True, "count": 3, "sum_age": 60, "max_age": 40},
+            ],
+        )
+
+    def test_invalid_queries(self):
+        invalid_queries = [
+            {"filters": [{"column": "unknown", "value": 1}]},
+            {"filters": [{"column": "age", "op": "gt", "value": "old"}]},
+            {"aggregates": [{"function": "sum", "column": "name"}]},
+            {"aggregates": [{"function": "avg"}]},
+            {"group_by": ["active"], "order_by": ["age"]},
+        ]
+        for query in invalid_queries:
+            response = self.client.post(self.url, query, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+    def test_query_table_not_found(self):
+        response = self.client.post(reverse("rows-query", args=["missing"]), {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_decimal_results_are_exact(self):
+        data = {"table_name": "prices", "field_types": ["decimal", "bigint"], "field_titles": ["Price", "Views"]}
+        self.client.post(reverse("table-create"), data, format="json")
+        rows = [{"price": "12345678901234567890.0123456789", "views": 2**62}, {"price": "1", "views": 2**62}]
+        self.client.post(reverse("rows-bulk-create", args=["prices"]), rows, format="json")
+
+        url = reverse("rows-query", args=["prices"])
+        response = self.client.post(url, {"fields": ["price"], "limit": 1}, format="json")
+        listed = self.client.get(reverse("rows-list", args=["prices"])).json()
+        self.assertEqual(response.json()["results"], [{"id": listed[0]["id"], "price": listed[0]["price"]}])
+        self.assertEqual(listed[0]["price"], "12345678901234567890.0123456789")
+
+        query = {"aggregates": [{"function": "sum", "column": "price"}, {"function": "sum", "column": "views"}]}
+        response = self.client.post(url, query, format="json")
+        self.assertEqual(
+            response.json()["results"], [{"sum_price": "12345678901234567891.0123456789", "sum_views": 2**63}]
+        )
@@ -0,0 +1,117 @@
+import time
+from unittest.mock import patch
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from table_builder_app import registry
+from table_builder_app.models import DynamicModel
+
+
+class TableRegistryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+        data = {
+            "table_name": "test_table",
+            "field_types": ["string", "number"],
+            "field_titles": ["Name", "Age"],
+        }
+        self.client.post(reverse("table-create"), data, format="json")
+
+    def test_schema_is_cached(self):
+        schema = registry.get_table_schema("test_table")
+        self.assertEqual(schema.columns, {"name": "string", "age": "number"})
+
+        with self.assertNumQueries(0):
+            self.assertIs(registry.get_table_schema("test_table"), schema)
+            self.assertIs(schema.get_row_encoder(["name"]), schema.get_row_encoder(["name"]))
+
+    def test_row_encoders_are_bounded(self):
+        schema = registry.get_table_schema("test_table")
+        with patch.object(registry, "MAX_ROW_ENCODERS", 1):
+            schema.get_row_encoder(["name"])
+            encoder = schema.get_row_encoder(["age", "name"])
+
+        self.assertEqual(list(schema._row_encoders), [("name",)])
+        self.assertEqual(encoder((1, 30, "Alice")), {"id": 1, "age": 30, "name": "Alice"})
+
+    def test_missing_table(self):
+        self.assertIsNone(registry.get_table_schema("missing"))
+
+    def test_schema_change_invalidates_entry(self):
+        schema = registry.get_table_schema("test_table")
+
+        update_data = {"field_types": ["boolean"], "field_titles": ["Active"]}
+        response = self.client.put(reverse("table-update", args=["test_table"]), update_data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        updated = registry.get_table_schema("test_table")
+        self.assertIsNot(updated, schema)
+        self.assertEqual(updated.version, schema.version + 1)
+        self.assertIn("active", updated.columns)
+
+    @override_settings(TABLE_BUILDER_REGISTRY_CHECK_INTERVAL=0)
+    def test_change_from_another_worker_is_detected(self):
+        schema = registry.get_table_schema("test_table")
+
+        # Simulate a schema change committed by another process
+        DynamicModel.objects.filter(name="test_table").update(
+            columns={"name": "string", "age": "number", "active": "boolean"}, version=schema.version + 1
+        )
+
+        self.assertIn("active", registry.get_table_schema("test_table").columns)
+
+
+@override_settings(TABLE_BUILDER_REGISTRY_LISTEN=False)
+class TableRegistrySnapshotTests(TestCase):
+    def setUp(self):
+        DynamicModel.objects.create(name="test_table", columns={"name": "string"})
+        registry.load_snapshot()
+
+    def test_lookups_are_answered_from_memory(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(registry.get_table_schema("test_table").columns, {"name": "string"})
+            self.assertIsNone(registry.get_table_schema("missing"))
+
+    def test_invalidated_entry_is_read_again(self):
+        DynamicModel.objects.filter(name="test_table").update(columns={"title": "text"}, version=2)
+        registry.invalidate("test_table")
+
+        self.assertEqual(registry.get_table_schema("test_table").columns, {"title": "text"})
+
+    @override_settings(TABLE_BUILDER_REGISTRY_CHECK_INTERVAL=0)
+    def test_table_created_by_another_worker_is_found(self):
+        self.assertIsNone(registry.get_table_schema("other_table"))
+
+        DynamicModel.objects.create(name="other_table", columns={"age": "number"})
+
+        self.assertEqual(registry.get_table_schema("other_table").columns, {"age": "number"})
+
+
+@override_settings(TABLE_BUILDER_REGISTRY_CHECK_INTERVAL=3600)
+class TableRegistryListenerTests(TransactionTestCase):
+    def setUp(self):
+        DynamicModel.objects.create(name="test_table", columns={"name": "string"})
+        registry.load_snapshot()
+        self.addCleanup(registry.stop_listener)
+
+    def wait_for(self, condition):
+        deadline = time.monotonic() + 5
+        while not condition():
+            self.assertLess(time.monotonic(), deadline, "timed out")
+            time.sleep(0.05)
+
+    def test_change_notification(self):
+        schema = registry.get_table_schema("test_table")
+        self.wait_for(lambda: registry.get_table_schema("test_table") and registry._listener["connected"])
+
+        # Committed by another process, which notifies all listeners
+        DynamicModel.objects.filter(name="test_table").update(columns={"title": "text"}, version=schema.version + 1)
+        self.wait_for(lambda: registry.get_table_schema("test_table").version == schema.version + 1)
+        self.assertEqual(registry.get_table_schema("test_table").columns, {"title": "text"})
+
+        DynamicModel.objects.filter(name="test_table").delete()
+        self.wait_for(lambda: registry.get_table_schema("test_table") is None)
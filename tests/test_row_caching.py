@@ -0,0 +1,85 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from table_builder_app.models import DynamicModel
+
+
+class RowListingCachingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("rows-list", args=["test_table"])
+
+        data = {"table_name": "test_table", "field_types": ["string", "number"], "field_titles": ["Name", "Age"]}
+        self.client.post(reverse("table-create"), data, format="json")
+        self.client.post(reverse("row-create", args=["test_table"]), {"name": "John", "age": 30}, format="json")
+
+    def test_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", response.headers)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response.headers["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+    def test_etag_depends_on_query(self):
+        etag = self.client.get(self.url).headers["ETag"]
+
+        self.assertNotEqual(self.client.get(self.url, {"fields": "name"}).headers["ETag"], etag)
+        self.assertNotEqual(self.client.get(self.url, {"format": "csv"}).headers["ETag"], etag)
+
+    def test_writes_change_etag(self):
+        ids = [row["id"] for row in self.client.get(self.url).data]
+        writes = [
+            lambda: self.client.post(reverse("row-create", args=["test_table"]), {"name": "Jim", "age": 1}),
+            lambda: self.client.post(reverse("rows-bulk-create", args=["test_table"]), [{"name": "J", "age": 2}]),
+            lambda: self.client.patch(self.url, {"ids": ids, "values": {"age": 31}}),
+            lambda: self.client.delete(self.url, {"ids": ids}),
+            lambda: self.client.put(
+                reverse("table-update", args=["test_table"]), {"field_types": ["boolean"], "field_titles": ["Active"]}
+            ),
+        ]
+
+        self.client.default_format = "json"
+        etags = [self.client.get(self.url).headers["ETag"]]
+        for write in writes:
+            self.assertEqual(write().status_code, status.HTTP_200_OK)
+            etags.append(self.client.get(self.url).headers["ETag"])
+
+        self.assertEqual(len(set(etags)), len(etags))
+        self.assertEqual(DynamicModel.objects.get(name="test_table").data_version, 7)
+
+    def test_result_cache(self):
+        self.client.get(self.url, {"limit": 10})
+
+        # Only the data version is read
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"limit": 10})
+        self.assertEqual([row["name"] for row in response.data["results"]], ["John"])
+
+        self.client.post(reverse("row-create", args=["test_table"]), {"name": "Jim", "age": 1}, format="json")
+
+        response = self.client.get(self.url, {"limit": 10})
+        self.assertEqual([row["name"] for row in response.data["results"]], ["John", "Jim"])
+
+    @override_settings(TABLE_BUILDER_RESULT_CACHE=None)
+    def test_without_result_cache(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 1)
+
+    @override_settings(TABLE_BUILDER_RESULT_CACHE_MAX_ROWS=1)
+    def test_large_listings_are_not_cached(self):
+        self.client.post(reverse("row-create", args=["test_table"]), {"name": "Jim", "age": 1}, format="json")
+        self.client.get(self.url)
+        self.client.get(self.url, {"limit": 1})
+
+        # The full listing is read again, the page of one row comes from the cache
+        with self.assertNumQueries(2):
+            self.assertEqual(len(self.client.get(self.url).data), 2)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.client.get(self.url, {"limit": 1}).data["results"]), 1)
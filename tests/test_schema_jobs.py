@@ -0,0 +1,153 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from table_builder_app.jobs import claim_job, run_job
+from table_builder_app.models import DynamicModel, SchemaJob
+from table_builder_app.schema import update_table
+from tests.test_indexes import get_indexes
+
+
+def run_worker():
+    call_command("table_builder_worker", "--once", stdout=StringIO())
+
+
+class SchemaJobTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.create_url = reverse("table-create") + "?async=true"
+        self.update_url = reverse("table-update", args=["test_table"]) + "?async=true"
+
+    def create_table(self, field_types, field_titles, **extra):
+        data = {"table_name": "test_table", "field_types": field_types, "field_titles": field_titles, **extra}
+        response = self.client.post(self.create_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        run_worker()
+        return response
+
+    def get_job(self, response):
+        return self.client.get(response.data["status_url"]).data
+
+    def test_create_table_job(self):
+        data = {"table_name": "test_table", "field_types": ["string"], "field_titles": ["Name"]}
+        response = self.client.post(self.create_url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response["Location"], response.data["status_url"])
+        self.assertEqual(self.get_job(response)["status"], "pending")
+        self.assertFalse(DynamicModel.objects.filter(name="test_table").exists())
+
+        # The name stays taken while the job is queued
+        response_again = self.client.post(self.create_url, data, format="json")
+        self.assertEqual(response_again.status_code, status.HTTP_400_BAD_REQUEST)
+
+        run_worker()
+
+        job = self.get_job(response)
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["result"], {"success": "Dynamic model created and applied"})
+        self.assertEqual(job["attempts"], 1)
+        self.assertEqual(DynamicModel.objects.get(name="test_table").columns, {"name": "string"})
+
+    def test_online_column_type_change(self):
+        self.create_table(["string", "string"], ["Name", "Age"], indexes=[{"columns": ["age"]}])
+        for name, age in [("Alice", "30"), ("Bob", "25")]:
+            self.client.post(reverse("row-create", args=["test_table"]), {"name": name, "age": age}, format="json")
+
+        data = {"field_types": ["number", "string"], "field_titles": ["Age", "Email"]}
+        response = self.client.put(self.update_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        run_worker()
+
+        self.assertEqual(self.get_job(response)["status"], "succeeded")
+        table = DynamicModel.objects.get(name="test_table")
+        self.assertEqual(table.columns, {"name": "string", "age": "number", "email": "string"})
+        self.assertEqual([index["columns"] for index in table.indexes], [["age"]])
+        self.assertEqual(get_indexes("test_table")["table_builder_app_test_table_age_idx"], (["age"], False))
+
+        rows = self.client.get(reverse("rows-list", args=["test_table"])).json()
+        self.assertEqual(sorted(row["age"] for row in rows), [25, 30])
+
+    def test_online_change_keeps_concurrent_row_counts(self):
+        self.create_table(["string"], ["Age"])
+        self.client.post(reverse("row-create", args=["test_table"]), {"age": "30"}, format="json")
+
+        # Loaded when the job starts, rows are written while it runs
+        table = DynamicModel.objects.get(name="test_table")
+        self.client.post(reverse("row-create", args=["test_table"]), {"age": "25"}, format="json")
+
+        update_table(connection, table, {"field_types": ["number"], "field_titles": ["Age"]}, online=True)
+        table = DynamicModel.objects.get(name="test_table")
+        self.assertEqual((table.columns, table.row_count), ({"age": "number"}, 2))
+
+    def test_running_job_heartbeat(self):
+        self.create_table(["string"], ["Age"], indexes=[{"columns": ["age"]}])
+        self.client.post(reverse("row-create", args=["test_table"]), {"age": "30"}, format="json")
+
+        data = {"field_types": ["number"], "field_titles": ["Age"]}
+        self.client.put(self.update_url, data, format="json")
+        job = claim_job()
+        started_at = timezone.now() - timedelta(hours=2)
+        SchemaJob.objects.filter(pk=job.pk).update(started_at=started_at)
+
+        job = run_job(job)
+        self.assertEqual(job.status, "succeeded")
+        self.assertGreater(SchemaJob.objects.get(pk=job.pk).started_at, started_at + timedelta(hours=1))
+
+    def test_jobs_of_a_table_run_one_at_a_time(self):
+        self.create_table(["string"], ["Name"])
+        first = self.client.put(self.update_url, {"field_types": ["string"], "field_titles": ["Age"]}, format="json")
+        self.client.put(self.update_url, {"field_types": ["string"], "field_titles": ["Email"]}, format="json")
+        data = {"table_name": "other_table", "field_types": ["string"], "field_titles": ["Name"]}
+        other = self.client.post(self.create_url, data, format="json")
+
+        self.assertEqual(claim_job().id, first.data["job"])
+        self.assertEqual(claim_job().id, other.data["job"])
+        self.assertIsNone(claim_job())
+
+    def test_update_from_stale_metadata(self):
+        self.create_table(["string"], ["Name"])
+        stale = DynamicModel.objects.get(name="test_table")
+
+        # Committed by another worker after the table was read
+        data = {"field_types": ["string"], "field_titles": ["Age"], "indexes": [{"columns": ["age"], "unique": False}]}
+        update_table(connection, DynamicModel.objects.get(name="test_table"), data)
+        update_table(connection, stale, {"field_types": ["string"], "field_titles": ["Email"]})
+
+        table = DynamicModel.objects.get(name="test_table")
+        self.assertEqual(table.columns, {"name": "string", "age": "string", "email": "string"})
+        self.assertEqual([index["columns"] for index in table.indexes], [["age"]])
+
+    def test_failed_job(self):
+        self.create_table(["string"], ["Age"])
+        self.client.post(reverse("row-create", args=["test_table"]), {"age": "thirty"}, format="json")
+
+        data = {"field_types": ["number"], "field_titles": ["Age"]}
+        response = self.client.put(self.update_url, data, format="json")
+        run_worker()
+
+        job = self.get_job(response)
+        self.assertEqual(job["status"], "failed")
+        self.assertEqual(job["result"]["description"], "problem with altering dynamic model")
+        self.assertEqual(DynamicModel.objects.get(name="test_table").columns, {"age": "string"})
+
+        with connection.cursor() as cursor:
+            description = connection.introspection.get_table_description(cursor, "table_builder_app_test_table")
+        self.assertEqual([column.name for column in description], ["id", "age"])
+
+    def test_job_not_found(self):
+        response = self.client.get(reverse("schema-job", args=[1]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_update_unknown_table(self):
+        data = {"field_types": ["number"], "field_titles": ["Age"]}
+        response = self.client.put(self.update_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(SchemaJob.objects.exists())
@@ -0,0 +1,87 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from table_builder_app.models import DynamicModel
+from tests.test_indexes import get_indexes
+
+
+ROWS = [
+    {"title": "Red fox", "body": "The quick brown fox jumps over the lazy dog", "year": 2001},
+    {"title": "Dogs", "body": "Dogs are loyal, a dog is a good friend", "year": 2002},
+    {"title": "Cats", "body": "Cats sleep most of the day", "year": 2003},
+]
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("rows-list", args=["test_table"])
+
+    def create_table(self, **extra):
+        data = {
+            "table_name": "test_table",
+            "field_types": ["string", "text", "number"],
+            "field_titles": ["Title", "Body", "Year"],
+            **extra,
+        }
+        response = self.client.post(reverse("table-create"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        for row in ROWS:
+            self.client.post(reverse("row-create", args=["test_table"]), row, format="json")
+
+    def search(self, q, **params):
+        response = self.client.get(self.url, {"q": q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_search(self):
+        self.create_table(search={"columns": ["Title", "Body"], "config": "english"})
+        self.assertIn("table_builder_app_test_table_search_idx", get_indexes("test_table"))
+
+        data = self.search("dog")
+        # Stemming matches "Dogs", the row mentioning dogs twice ranks first
+        self.assertEqual([row["title"] for row in data["results"]], ["Dogs", "Red fox"])
+        self.assertEqual(set(data["results"][0]), {"id", "title", "body", "year"})
+        self.assertIsNone(data["next"])
+
+        self.assertEqual([row["title"] for row in self.search('dog -"brown fox"')["results"]], ["Dogs"])
+        self.assertEqual(self.search("horse")["results"], [])
+
+    def test_search_pagination(self):
+        self.create_table(search={"columns": ["Body"], "config": "english"})
+
+        first = self.search("dog", limit=1, fields="title")
+        self.assertEqual(first, {"results": [{"id": first["results"][0]["id"], "title": "Dogs"}], "next": 1})
+
+        second = self.search("dog", limit=1, offset=first["next"], fields="title")
+        self.assertEqual([row["title"] for row in second["results"]], ["Red fox"])
+        self.assertIsNone(second["next"])
+
+    def test_enable_search_on_existing_table(self):
+        self.create_table()
+
+        response = self.client.get(self.url, {"q": "dog"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        update = {"field_types": [], "field_titles": [], "search": {"columns": ["title"]}}
+        response = self.client.put(reverse("table-update", args=["test_table"]), update, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(DynamicModel.objects.get(name="test_table").search, {"columns": ["title"], "config": "simple"})
+
+        # The "simple" configuration does not stem
+        self.assertEqual([row["title"] for row in self.search("dogs")["results"]], ["Dogs"])
+        self.assertEqual(self.search("dog")["results"], [])
+
+    def test_search_column_types(self):
+        data = {
+            "table_name": "test_table",
+            "field_types": ["string", "number"],
+            "field_titles": ["Title", "Year"],
+            "search": {"columns": ["year"]},
+        }
+        response = self.client.post(reverse("table-create"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("search", response.data)
+        self.assertFalse(DynamicModel.objects.filter(name="test_table").exists())
@@ -0,0 +1,81 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from table_builder_app.models import DynamicModel
+
+
+class TableStatsAPIViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("table-stats", args=["test_table"])
+
+        data = {
+            "table_name": "test_table",
+            "field_types": ["string", "number", "boolean"],
+            "field_titles": ["Name", "Age", "Active"],
+        }
+        self.client.post(reverse("table-create"), data, format="json")
+
+        rows = [{"name": f"John {i % 10}", "age": i, "active": i % 2 == 0} for i in range(100)]
+        self.client.post(reverse("rows-bulk-create", args=["test_table"]), rows, format="json")
+        self.client.post(reverse("row-create", args=["test_table"]), {"name": "Jim", "age": 500, "active": True})
+
+    def test_row_count_is_maintained(self):
+        self.assertEqual(self.client.get(self.url).data["row_count"], 101)
+
+        rows_url = reverse("rows-list", args=["test_table"])
+        self.client.delete(rows_url, {"filters": [{"column": "age", "op": "lt", "value": 10}]}, format="json")
+
+        with self.assertNumQueries(3 if connection.vendor == "postgresql" else 1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["row_count"], 91)
+        self.assertEqual(DynamicModel.objects.get(name="test_table").row_count, 91)
+
+    def test_migration_counts_mixed_case_tables(self):
+        data = {"table_name": "MixedCase", "field_types": ["string"], "field_titles": ["Name"]}
+        self.client.post(reverse("table-create"), data, format="json")
+        self.client.post(reverse("row-create", args=["MixedCase"]), {"name": "Jim"}, format="json")
+        DynamicModel.objects.update(row_count=0)
+
+        migration = import_module("table_builder_app.migrations.0005_dynamicmodel_row_count")
+        with connection.schema_editor() as schema_editor:
+            migration.count_rows(apps, schema_editor)
+
+        self.assertEqual(DynamicModel.objects.get(name="MixedCase").row_count, 1)
+        self.assertEqual(DynamicModel.objects.get(name="test_table").row_count, 101)
+
+    def test_drifted_row_count(self):
+        # Rows written around the views are not counted
+        DynamicModel.objects.filter(name="test_table").update(row_count=0)
+
+        rows_url = reverse("rows-list", args=["test_table"])
+        selection = {"filters": [{"column": "age", "op": "lt", "value": 10}]}
+        response = self.client.delete(rows_url, selection, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.url).data["row_count"], -10)
+
+    def test_column_statistics(self):
+        response = self.client.get(self.url, {"analyze": "true"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["columns"]["age"]["type"], "number")
+        if connection.vendor != "postgresql":
+            return
+
+        self.assertEqual(response.data["estimated_row_count"], 101)
+        self.assertGreater(response.data["total_bytes"], 0)
+        self.assertEqual(response.data["columns"]["name"]["distinct"], 11)
+        self.assertEqual(response.data["columns"]["active"]["distinct"], 2)
+        self.assertEqual(response.data["columns"]["age"]["null_fraction"], 0)
+        self.assertEqual((response.data["columns"]["age"]["min"], response.data["columns"]["age"]["max"]), (0, 500))
+        self.assertIsNone(response.data["columns"]["active"]["min"])
+
+    def test_non_existing_table(self):
+        response = self.client.get(reverse("table-stats", args=["non_existing_table"]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,164 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import psycopg
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from table_builder_app import locks
+from table_builder_app.models import DynamicModel
+from table_builder_app.throttling import ClientRateThrottle
+
+
+class TableMixin:
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("row-create", args=["test_table"])
+        data = {"table_name": "test_table", "field_types": ["string"], "field_titles": ["Name"]}
+        self.client.post(reverse("table-create"), data, format="json")
+
+
+@override_settings(TABLE_BUILDER_THROTTLE_RATES={"client": {"rate": 0.01, "burst": 2}})
+class ClientRateThrottleTests(TableMixin, TestCase):
+    def test_writes_are_throttled(self):
+        for name in ("Alice", "Bob"):
+            response = self.client.post(self.url, {"name": name}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.post(self.url, {"name": "Carol"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreater(int(response["Retry-After"]), 0)
+
+        # Reads and other clients are not throttled
+        self.assertEqual(self.client.get(reverse("rows-list", args=["test_table"])).status_code, status.HTTP_200_OK)
+        response = self.client.post(self.url, {"name": "Carol"}, format="json", REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+@override_settings(TABLE_BUILDER_THROTTLE_RATES={"client": {"rate": 0.01, "burst": 20}})
+class ConcurrentThrottleTests(SimpleTestCase):
+    def test_concurrent_requests_share_the_tokens(self):
+        request = RequestFactory().post("/", REMOTE_ADDR="10.0.0.1")
+        view = SimpleNamespace(kwargs={})
+
+        def allow_request(_):
+            return ClientRateThrottle().allow_request(request, view)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            allowed = list(executor.map(allow_request, range(100)))
+        self.assertEqual(allowed.count(True), 20)
+
+
+class RefillRateTests(SimpleTestCase):
+    def allowed(self, now, count):
+        request = RequestFactory().post("/", REMOTE_ADDR="10.0.0.3")
+        view = SimpleNamespace(kwargs={})
+        with patch("table_builder_app.throttling.time.time", return_value=now):
+            return sum(ClientRateThrottle().allow_request(request, view) for _ in range(count))
+
+    def test_refills_follow_the_rate(self):
+        # Rates whose tokens per 0.1 second are not a whole number
+        for rate in (14, 15, 25):
+            with self.subTest(rate=rate), self.settings(
+                TABLE_BUILDER_THROTTLE_RATES={"client": {"rate": rate, "burst": 1000}}
+            ):
+                caches["default"].clear()
+                self.assertEqual(self.allowed(1000.0, 1100), 1000)
+                # Ten seconds of requests every 50 ms, each refill comes with a request
+                allowed = sum(self.allowed(1000.0 + step * 0.05, 10) for step in range(1, 201))
+                self.assertAlmostEqual(allowed, rate * 10, delta=3)
+
+
+@override_settings(TABLE_BUILDER_THROTTLE_RATES={"table": {"rate": 0.01, "burst": 2}})
+class TableRateThrottleTests(TableMixin, TestCase):
+    def test_writes_are_throttled_per_table(self):
+        for address in ("10.0.0.1", "10.0.0.2"):
+            response = self.client.post(self.url, {"name": address}, format="json", REMOTE_ADDR=address)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.post(self.url, {"name": "Carol"}, format="json", REMOTE_ADDR="10.0.0.3")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        data = {"table_name": "other_table", "field_types": ["string"], "field_titles": ["Name"]}
+        self.client.post(reverse("table-create"), data, format="json")
+        response = self.client.post(reverse("row-create", args=["other_table"]), {"name": "Carol"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Batches take a token of every table they write
+        operations = [
+            {"op": "insert", "table": "other_table", "values": {"name": "Dave"}},
+            {"op": "insert", "table": "test_table", "values": {"name": "Dave"}},
+        ]
+        response = self.client.post(reverse("batch"), {"operations": operations}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        response = self.client.post(reverse("batch"), {"operations": operations[:1]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    async def test_async_writes_are_throttled(self):
+        url = reverse("async-row-create", args=["test_table"])
+        for address in ("10.0.0.1", "10.0.0.2"):
+            await sync_to_async(self.client.post)(self.url, {"name": address}, format="json", REMOTE_ADDR=address)
+
+        response = await self.async_client.post(url, {"name": "Carol"}, content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreater(int(response["Retry-After"]), 0)
+
+
+@override_settings(TABLE_BUILDER_WRITE_LOCK_TIMEOUT=0.1, TABLE_BUILDER_SCHEMA_LOCK_TIMEOUT=0.1)
+class TableLockTests(TableMixin, TransactionTestCase):
+    # Transaction-level advisory locks are only released on commit, e.g. the one of the table creation
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(self.drop_table)
+
+    def drop_table(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS table_builder_app_test_table")
+
+    def hold_lock(self, exclusive):
+        """
+        Take the advisory lock of the table from another connection, like a concurrent request.
+        """
+        other = psycopg.connect(**connection.get_connection_params(), autocommit=True)
+        self.addCleanup(other.close)
+        function = "pg_advisory_lock" if exclusive else "pg_advisory_lock_shared"
+        other.execute(f"SELECT {function}(%s, hashtext(%s))", [locks.LOCK_NAMESPACE, "test_table"])
+        return other
+
+    def test_writes_wait_for_schema_changes(self):
+        other = self.hold_lock(exclusive=True)
+
+        response = self.client.post(self.url, {"name": "Alice"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], str(locks.RETRY_AFTER))
+
+        response = self.client.post(reverse("rows-bulk-create", args=["test_table"]), [{"name": "Bob"}], format="json")
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(DynamicModel.objects.get(name="test_table").row_count, 0)
+
+        other.execute("SELECT pg_advisory_unlock_all()")
+        response = self.client.post(self.url, {"name": "Alice"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_schema_changes_wait_for_writes(self):
+        other = self.hold_lock(exclusive=False)
+
+        update = {"field_types": ["number"], "field_titles": ["Age"]}
+        response = self.client.put(reverse("table-update", args=["test_table"]), update, format="json")
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(DynamicModel.objects.get(name="test_table").version, 1)
+
+        # Writers share the lock
+        response = self.client.post(self.url, {"name": "Alice"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        other.execute("SELECT pg_advisory_unlock_all()")
+        response = self.client.put(reverse("table-update", args=["test_table"]), update, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,123 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+class UpdateDeleteRowsAPIViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("rows-list", args=["test_table"])
+
+        data = {
+            "table_name": "test_table",
+            "field_types": ["string", "number", "boolean"],
+            "field_titles": ["Name", "Age", "Active"],
+        }
+        self.client.post(reverse("table-create"), data, format="json")
+
+        rows = [{"name": f"John {i}", "age": i * 10, "active": i % 2 == 0} for i in range(6)]
+        self.client.post(reverse("rows-bulk-create", args=["test_table"]), rows, format="json")
+        self.ids = [row["id"] for row in self.client.get(self.url).data]
+
+    def get_rows(self):
+        return {row["id"]: row for row in self.client.get(self.url).data}
+
+    def test_update_rows_by_filter(self):
+        data = {"filters": [{"column": "age", "op": "gte", "value": 30}], "values": {"active": False}}
+        response = self.client.patch(self.url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"updated": 3})
+        rows = self.get_rows()
+        self.assertEqual([rows[row_id]["active"] for row_id in self.ids], [True, False, True, False, False, False])
+
+    def test_update_rows_by_ids(self):
+        data = {"ids": self.ids[:2], "values": {"name": "Jane"}}
+        response = self.client.patch(self.url, data, format="json")
+
+        self.assertEqual(response.data, {"updated": 2})
+        self.assertEqual([row["name"] for row in self.get_rows().values()].count("Jane"), 2)
+
+    def test_update_rows_with_own_values(self):
+        data = {
+            "rows": [
+                {"id": self.ids[0], "name": "Jane", "age": 1},
+                {"id": self.ids[1], "name": "Jim", "age": 2},
+                {"id": self.ids[2], "active": False},
+            ]
+        }
+        response = self.client.patch(self.url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"updated": 3})
+        rows = self.get_rows()
+        self.assertEqual((rows[self.ids[0]]["name"], rows[self.ids[0]]["age"]), ("Jane", 1))
+        self.assertEqual((rows[self.ids[1]]["name"], rows[self.ids[1]]["age"]), ("Jim", 2))
+        self.assertEqual(rows[self.ids[2]]["active"], False)
+
+    def test_update_with_invalid_values(self):
+        response = self.client.patch(self.url, {"ids": self.ids, "values": {"age": "old"}}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.patch(self.url, {"ids": self.ids, "values": {"unknown": 1}}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_update_requires_selection(self):
+        response = self.client.patch(self.url, {"values": {"active": False}}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(all(row["active"] == (index % 2 == 0) for index, row in enumerate(self.get_rows().values())))
+
+    def test_delete_rows_by_filter(self):
+        data = {"filters": [{"column": "active", "value": True}]}
+        response = self.client.delete(self.url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"deleted": 3})
+        self.assertEqual(sorted(self.get_rows()), self.ids[1::2])
+
+    def test_delete_rows_by_ids(self):
+        response = self.client.delete(self.url, {"ids": self.ids[:4]}, format="json")
+
+        self.assertEqual(response.data, {"deleted": 4})
+        self.assertEqual(sorted(self.get_rows()), self.ids[4:])
+
+    @patch("table_builder_app.query.SELECTION_CHUNK_SIZE", 2)
+    def test_large_id_selections_are_split(self):
+        # No backend parameter limit on PostgreSQL, the chunk size applies
+        ids = [*self.ids[:4], 10**6]
+        db_table = connection.ops.quote_name("table_builder_app_test_table")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, {"ids": ids, "values": {"name": "Jane"}}, format="json")
+        self.assertEqual(response.data, {"updated": 4})
+        self.assertEqual(sum(query["sql"].startswith(f"UPDATE {db_table}") for query in queries), 3)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(self.url, {"ids": ids}, format="json")
+        self.assertEqual(response.data, {"deleted": 4})
+        self.assertEqual(sum(query["sql"].startswith(f"DELETE FROM {db_table}") for query in queries), 3)
+        self.assertEqual(sorted(self.get_rows()), self.ids[4:])
+
+    def test_update_rows_need_integer_ids(self):
+        response = self.client.patch(self.url, {"rows": [{"id": True, "name": "Jane"}]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn("Jane", [row["name"] for row in self.get_rows().values()])
+
+    def test_delete_requires_selection(self):
+        response = self.client.delete(self.url, {}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(self.get_rows()), 6)
+
+    def test_non_existing_table(self):
+        url = reverse("rows-list", args=["non_existing_table"])
+        response = self.client.delete(url, {"ids": [1]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)